@@ -11,7 +11,8 @@
 // Space-optimized mandelbrot computation engine
 module mandelbrot_engine #(
     parameter COORD_WIDTH = 11,      // 11 bits for coordinates (optimized for 1x2 tile)
-    parameter FRAC_BITS = 8         // 8 bits for fractional part (optimized for 1x2 tile)
+    parameter FRAC_BITS = 8,        // 8 bits for fractional part (optimized for 1x2 tile)
+    parameter INTERIOR_CHECK = 1    // finish cardioid / period-2 bulb points without iterating
 ) (
     input  logic clk,
     input  logic rst_n,
@@ -74,6 +75,30 @@ module mandelbrot_engine #(
         c_imag = center_y + signed'(temp_imag >> FRAC_BITS);
     end
     
+    // interior test on c: main cardioid q*(q + x - 1/4) <= y^2/4 with
+    // q = (x - 1/4)^2 + y^2, and period-2 bulb (x + 1)^2 + y^2 <= 1/16.
+    // squares are truncated to FRAC_BITS like the iteration; the margin keeps
+    // every flagged c inside the set of the quantized iteration, so the
+    // result is the same as running to max_iter_limit (exhaustive check in
+    // test/model/interior.py)
+    localparam int INTERIOR_MARGIN = 2;
+    localparam int IW = 4*COORD_WIDTH - 2*FRAC_BITS + 8;
+    logic c_interior;
+    always_comb begin
+        logic signed [IW-1:0] x_card, x_bulb, y_sq, q, card, bulb;
+
+        x_card = IW'(c_real) - (IW'(1) <<< (FRAC_BITS - 2));
+        x_bulb = IW'(c_real) + (IW'(1) <<< FRAC_BITS);
+        y_sq = (IW'(c_imag) * IW'(c_imag)) >>> FRAC_BITS;
+        q = ((x_card * x_card) >>> FRAC_BITS) + y_sq;
+        card = (q * (q + x_card)) >>> FRAC_BITS;
+        bulb = ((x_bulb * x_bulb) >>> FRAC_BITS) + y_sq;
+
+        c_interior = (INTERIOR_CHECK != 0) && (
+            (card + INTERIOR_MARGIN <= (y_sq >>> 2)) ||
+            (bulb + INTERIOR_MARGIN <= (IW'(1) <<< (FRAC_BITS - 4))));
+    end
+
     // single-cycle iteration with combined escape check
     always_ff @(posedge clk or negedge rst_n) begin
         if (!rst_n) begin
@@ -115,6 +140,10 @@ module mandelbrot_engine #(
                     // 4.0 in Q3.8 is 4 * 2^8 = 1024 (0x400)
                     if (magnitude_sq_full > 11'd1024 || iter_count >= max_iter_limit) begin
                         state <= DONE;
+                    end else if (iter_count == 6'd0 && c_interior) begin
+                        // never escapes: report the cap on the first cycle
+                        iter_count <= max_iter_limit;
+                        state <= DONE;
                     end else begin
                         // Continue iterating
                         z_real <= z_real_new;
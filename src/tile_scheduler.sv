@@ -0,0 +1,196 @@
+/*
+ * Copyright (c) 2024 ECE298A Team
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+`default_nettype none
+
+// multi-engine tile scheduler prototype (not part of tt_um_fractal; see
+// test/model/scheduler.py for the architecture and the stride benchmark).
+//
+// tile jobs arrive in order on a valid/ready stream and are dispatched, one
+// per clk, to K mandelbrot_engine lanes. POLICY 0 (earliest-free) takes the
+// lowest free lane; POLICY 1 (round-robin) sends job j to lane j % K and
+// stalls until that lane is free. each lane latches the job's pixel
+// coordinates and tile index for the whole computation, and parks finished
+// results in its own ROB_DEPTH-entry buffer. one result per clk leaves on the
+// write port (rotating priority over non-empty buffers), so results can be
+// written into a tile line in any order; colour mapping is left to the
+// consumer.
+module tile_scheduler #(
+    parameter int K = 4,
+    parameter int POLICY = 0,
+    parameter int ROB_DEPTH = 4,
+    parameter int TILE_BITS = 10,
+    parameter int COORD_WIDTH = 9,
+    parameter int FRAC_BITS = 6
+) (
+    input  wire        clk,
+    input  wire        rst_n,
+
+    // tile jobs, in order
+    input  wire        job_valid,
+    output logic       job_ready,
+    input  wire  [TILE_BITS-1:0] job_tile,
+    input  wire  [9:0] job_x,
+    input  wire  [9:0] job_y,
+
+    // view, shared by all lanes
+    input  wire signed [COORD_WIDTH-1:0] center_x,
+    input  wire signed [COORD_WIDTH-1:0] center_y,
+    input  wire  [7:0] zoom_level,
+    input  wire  [5:0] max_iter_limit,
+
+    // tile line write port
+    output logic       wr_valid,
+    output logic [TILE_BITS-1:0] wr_tile,
+    output logic [5:0] wr_iterations,
+
+    // lanes with a computation in flight
+    output logic [K-1:0] busy
+);
+
+    localparam int LANE_BITS = (K > 1) ? $clog2(K) : 1;
+    localparam int PTR_BITS = (ROB_DEPTH > 1) ? $clog2(ROB_DEPTH) : 1;
+
+    logic [K-1:0] lane_free, lane_dispatch, lane_pop, result_valid, rob_empty;
+    logic [5:0] lane_iterations [0:K-1];
+    logic [TILE_BITS-1:0] rob_tile_head [0:K-1];
+    logic [5:0] rob_iter_head [0:K-1];
+
+    // dispatch: pick a lane for the job at the head of the stream
+    logic [LANE_BITS-1:0] rr_lane, dispatch_lane;
+    always_comb begin
+        dispatch_lane = '0;
+        job_ready = 1'b0;
+        if (POLICY == 1) begin
+            dispatch_lane = rr_lane;
+            job_ready = lane_free[rr_lane];
+        end else begin
+            for (int i = K - 1; i >= 0; i = i - 1) begin
+                if (lane_free[i]) begin
+                    dispatch_lane = LANE_BITS'(i);
+                    job_ready = 1'b1;
+                end
+            end
+        end
+    end
+
+    wire dispatch = job_valid && job_ready;
+
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            rr_lane <= '0;
+        end else if (dispatch) begin
+            rr_lane <= (rr_lane == LANE_BITS'(K - 1)) ? '0 : rr_lane + 1'b1;
+        end
+    end
+
+    // write port: rotating priority over lanes with buffered results
+    logic [LANE_BITS-1:0] wr_ptr, wr_lane;
+    always_comb begin
+        int lane;
+        wr_valid = 1'b0;
+        wr_lane = '0;
+        for (int n = K - 1; n >= 0; n = n - 1) begin
+            lane = (int'(wr_ptr) + n) % K;
+            if (!rob_empty[lane]) begin
+                wr_valid = 1'b1;
+                wr_lane = LANE_BITS'(lane);
+            end
+        end
+        wr_tile = rob_tile_head[wr_lane];
+        wr_iterations = rob_iter_head[wr_lane];
+    end
+
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            wr_ptr <= '0;
+        end else if (wr_valid) begin
+            wr_ptr <= (wr_lane == LANE_BITS'(K - 1)) ? '0 : wr_lane + 1'b1;
+        end
+    end
+
+    genvar g;
+    generate
+        for (g = 0; g < K; g = g + 1) begin : lane
+            logic       start;
+            logic [9:0] pixel_x, pixel_y;
+            logic [TILE_BITS-1:0] tile;
+            logic       engine_busy;
+
+            logic [TILE_BITS-1:0] rob_tile [0:ROB_DEPTH-1];
+            logic [5:0] rob_iter [0:ROB_DEPTH-1];
+            logic [PTR_BITS-1:0] rob_head, rob_tail;
+            logic [PTR_BITS:0] rob_count;
+
+            assign lane_dispatch[g] = dispatch && (dispatch_lane == LANE_BITS'(g));
+            assign lane_pop[g] = wr_valid && (wr_lane == LANE_BITS'(g));
+            assign rob_empty[g] = (rob_count == 0);
+            assign rob_tile_head[g] = rob_tile[rob_head];
+            assign rob_iter_head[g] = rob_iter[rob_head];
+            assign busy[g] = start || engine_busy;
+
+            // free once the engine is idle or about to leave DONE, and the
+            // buffer can take this result plus the next one
+            assign lane_free[g] = !start && (!engine_busy || result_valid[g])
+                                  && (rob_count + result_valid[g] < ROB_DEPTH);
+
+            // hold the job for the whole computation (the engine maps c
+            // combinationally from pixel_x/pixel_y)
+            always_ff @(posedge clk or negedge rst_n) begin
+                if (!rst_n) begin
+                    start <= 1'b0;
+                    pixel_x <= '0;
+                    pixel_y <= '0;
+                    tile <= '0;
+                end else begin
+                    start <= lane_dispatch[g];
+                    if (lane_dispatch[g]) begin
+                        pixel_x <= job_x;
+                        pixel_y <= job_y;
+                        tile <= job_tile;
+                    end
+                end
+            end
+
+            mandelbrot_engine #(
+                .COORD_WIDTH(COORD_WIDTH),
+                .FRAC_BITS(FRAC_BITS)
+            ) engine (
+                .clk(clk),
+                .rst_n(rst_n),
+                .pixel_x(pixel_x),
+                .pixel_y(pixel_y),
+                .pixel_valid(start),
+                .center_x(center_x),
+                .center_y(center_y),
+                .zoom_level(zoom_level),
+                .max_iter_limit(max_iter_limit),
+                .enable(1'b1),
+                .iteration_count(lane_iterations[g]),
+                .result_valid(result_valid[g]),
+                .busy(engine_busy)
+            );
+
+            // result buffer; DONE lasts one clk, so the result is pushed then
+            always_ff @(posedge clk or negedge rst_n) begin
+                if (!rst_n) begin
+                    rob_head <= '0;
+                    rob_tail <= '0;
+                    rob_count <= '0;
+                end else begin
+                    if (result_valid[g]) begin
+                        rob_tile[rob_tail] <= tile;
+                        rob_iter[rob_tail] <= lane_iterations[g];
+                        rob_tail <= (rob_tail == PTR_BITS'(ROB_DEPTH - 1)) ? '0 : rob_tail + 1'b1;
+                    end
+                    if (lane_pop[g])
+                        rob_head <= (rob_head == PTR_BITS'(ROB_DEPTH - 1)) ? '0 : rob_head + 1'b1;
+                    rob_count <= rob_count + result_valid[g] - lane_pop[g];
+                end
+            end
+        end
+    endgenerate
+
+endmodule
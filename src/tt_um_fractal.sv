@@ -119,6 +119,41 @@ module tt_um_fractal (
         .zoom_level(zoom_level_8bit)
     );
     
+`ifdef REFINE
+    // progressive refinement (uio_in[4]): while the view is static, each
+    // frame samples every tile at a different sub-tile position, stepping
+    // through a stratified 4x4 pattern with the coarse positions first, so
+    // successive frames average towards a supersampled image at the same
+    // compute per frame. a view control at v_begin (or refine off) restarts
+    // the pattern at the tile's top-left pixel. launches keep their beam
+    // timing; only the pixel the engine maps to c is offset.
+    wire refine = uio_in[4];
+    logic [3:0] refine_step;
+    logic refine_prev_frame;
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            refine_step <= 4'd0;
+            refine_prev_frame <= 1'b1;  // frame_start is already high out of reset
+        end else begin
+            refine_prev_frame <= frame_start;
+            if (frame_start && !refine_prev_frame)
+                refine_step <= (refine && ui_in[6:0] == 7'd0) ? refine_step + 1'b1 : 4'd0;
+        end
+    end
+
+    // sub-tile offset in quarter tiles: x from step bits 0 and 2, y from
+    // bits 1 and 3 (first step bit is the offset msb)
+    wire [1:0] refine_sx = {refine_step[0], refine_step[2]};
+    wire [1:0] refine_sy = {refine_step[1], refine_step[3]};
+    wire [9:0] sample_x = pixel_x + (10'(refine_sx) << (h_stride_shift - 4'd2));
+    wire [9:0] sample_y = pixel_y + (10'(refine_sy) << (v_stride_shift - 4'd2));
+`else
+    // built without REFINE (the shipped top): the engine maps the beam
+    // position and uio_in[4] is unused
+    wire [9:0] sample_x = pixel_x;
+    wire [9:0] sample_y = pixel_y;
+`endif
+
     // start a computation only at the top-left of a tile on the first line of
     // a macroblock row. engine runs on 50 mhz for extra headroom.
     assign start_computation = vga_active && enable && is_first_col && is_first_line;
@@ -137,12 +172,13 @@ module tt_um_fractal (
     // mandelbrot computation engine
     mandelbrot_engine #(
         .COORD_WIDTH(9),
-        .FRAC_BITS(6)
+        .FRAC_BITS(6),
+        .INTERIOR_CHECK(0)  // the interior test roughly doubles the engine's area
     ) mandel (
         .clk(clk),
         .rst_n(rst_n),
-        .pixel_x(pixel_x),
-        .pixel_y(pixel_y),
+        .pixel_x(sample_x),
+        .pixel_y(sample_y),
         .pixel_valid(start_computation),
         .center_x(centre_x),
         .center_y(centre_y),
@@ -181,7 +217,78 @@ module tt_um_fractal (
             tile_blue_line[launched_tile_x]  <= blue;
         end
     end
-    
+
+`ifdef PERF_COUNTERS
+    // simulation-only throughput counters (the testbenches define
+    // PERF_COUNTERS; synthesis never sees this block). perf_* count the
+    // current frame; on the edge after frame_start rises they are copied to
+    // perf_*_frame and restarted from that edge's own events (tile (0,0)
+    // launches on it), and perf_frames advances. a deadline miss is a launch
+    // while the engine is not IDLE, still computing or holding a result in
+    // DONE: the launch is dropped and the old result lands on the new
+    // launched_tile_x.
+    logic        perf_prev_start, perf_prev_done, perf_prev_frame;
+    logic [15:0] perf_frames;
+    logic [19:0] perf_busy_cycles, perf_busy_cycles_frame;
+    logic [15:0] perf_launched, perf_launched_frame;
+    logic [15:0] perf_completed, perf_completed_frame;
+    logic [15:0] perf_deadline_misses, perf_deadline_misses_frame;
+    logic [7:0]  perf_latency;  // clk edges since the engine left IDLE
+    logic [7:0]  perf_max_latency, perf_max_latency_frame;
+
+    always_ff @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            perf_prev_start <= 1'b0;
+            perf_prev_done <= 1'b0;
+            perf_prev_frame <= 1'b1;  // frame_start is already high out of reset
+            perf_frames <= '0;
+            perf_busy_cycles <= '0;
+            perf_launched <= '0;
+            perf_completed <= '0;
+            perf_deadline_misses <= '0;
+            perf_latency <= '0;
+            perf_max_latency <= '0;
+            perf_busy_cycles_frame <= '0;
+            perf_launched_frame <= '0;
+            perf_completed_frame <= '0;
+            perf_deadline_misses_frame <= '0;
+            perf_max_latency_frame <= '0;
+        end else begin
+            perf_prev_start <= start_computation;
+            perf_prev_done <= computation_done;
+            perf_prev_frame <= frame_start;
+            perf_latency <= mandel.busy ? perf_latency + 1'b1 : 8'd0;
+
+            if (frame_start && !perf_prev_frame) begin
+                perf_frames <= perf_frames + 1'b1;
+                perf_busy_cycles_frame <= perf_busy_cycles;
+                perf_launched_frame <= perf_launched;
+                perf_completed_frame <= perf_completed;
+                perf_deadline_misses_frame <= perf_deadline_misses;
+                perf_max_latency_frame <= perf_max_latency;
+                perf_busy_cycles <= mandel.busy ? 20'd1 : 20'd0;
+                perf_launched <= (start_computation && !perf_prev_start) ? 16'd1 : 16'd0;
+                perf_completed <= (computation_done && !perf_prev_done) ? 16'd1 : 16'd0;
+                perf_deadline_misses <= (start_computation && !perf_prev_start && mandel.busy) ? 16'd1 : 16'd0;
+                perf_max_latency <= (computation_done && !perf_prev_done) ? perf_latency : 8'd0;
+            end else begin
+                if (mandel.busy)
+                    perf_busy_cycles <= perf_busy_cycles + 1'b1;
+                if (start_computation && !perf_prev_start) begin
+                    perf_launched <= perf_launched + 1'b1;
+                    if (mandel.busy)
+                        perf_deadline_misses <= perf_deadline_misses + 1'b1;
+                end
+                if (computation_done && !perf_prev_done) begin
+                    perf_completed <= perf_completed + 1'b1;
+                    if (perf_latency > perf_max_latency)
+                        perf_max_latency <= perf_latency;
+                end
+            end
+        end
+    end
+`endif
+
     // register rgb outputs for stable vga (25 mhz). read tile colour for
     // current x tile; hold across all lines in the macroblock.
     always_ff @(posedge clk_25mhz or negedge rst_n) begin
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# bench table shared by the python-side launchers. mirrors the tb-* targets in
+# the Makefile so a bench can be compiled once with the cocotb runner api and
+# then run many times (shards, test cases) against the same build.
+
+import os
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+SRC_DIR = TEST_DIR.parent / "src"
+MODEL_DIR = TEST_DIR / "model"
+
+# keep in sync with PROJECT_SOURCES in the Makefile
+PROJECT_SOURCES = [
+    "mandelbrot_engine.sv",
+    "mandelbrot_colour_mapper.sv",
+    "vga.sv",
+    "param_controller.sv",
+    "tt_um_fractal.sv",
+]
+
+BENCHES = {
+    "engine": {
+        "toplevel": "tb_engine",
+        "wrapper": "engine/tb_engine.sv",
+        "sources": PROJECT_SOURCES,
+    },
+    "engine_batch": {
+        "toplevel": "tb_engine_batch",
+        "wrapper": "engine/tb_engine_batch.sv",
+        "sources": PROJECT_SOURCES,
+        "dir": "engine",
+    },
+    "vga": {
+        "toplevel": "tb_vga",
+        "wrapper": "vga/tb_vga.sv",
+        "sources": ["vga.sv"],
+    },
+    "mandelbrot": {
+        "toplevel": "tb_mandelbrot",
+        "wrapper": "mandelbrot/tb_mandelbrot.v",
+        "sources": PROJECT_SOURCES,
+    },
+    "png": {
+        "toplevel": "tb_png",
+        "wrapper": "png/tb_png.sv",
+        "sources": PROJECT_SOURCES,
+    },
+    "png_refine": {
+        "toplevel": "tb_png",
+        "wrapper": "png/tb_png.sv",
+        "sources": PROJECT_SOURCES,
+        "dir": "png",
+        # progressive refinement is left out of the shipped top
+        "defines": {"REFINE": 1},
+    },
+    # prototype only; tile_scheduler.sv is not part of PROJECT_SOURCES
+    "tile_scheduler": {
+        "toplevel": "tb_scheduler",
+        "wrapper": "scheduler/tb_scheduler.sv",
+        "sources": ["mandelbrot_engine.sv", "tile_scheduler.sv"],
+        "dir": "scheduler",
+    },
+}
+
+
+# per-simulator build arguments. the wrappers use # delays, which verilator
+# only accepts with --timing, and its lint warnings stay warnings
+SIM_BUILD_ARGS = {"verilator": ["--timing", "-Wno-fatal"]}
+
+
+def bench_dir(name):
+    """directory holding the bench's cocotb module (goes on PYTHONPATH)."""
+    return TEST_DIR / BENCHES[name].get("dir", name)
+
+
+def use_bench(name):
+    """make the bench module and the shared models importable; the runner
+    forwards sys.path to the simulator."""
+    for path in (str(MODEL_DIR), str(bench_dir(name))):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def build_bench(name, build_dir, sim=None, defines=None, parameters=None):
+    """compile a bench once into build_dir and return the cocotb runner."""
+    from cocotb.runner import get_runner
+
+    bench = BENCHES[name]
+    use_bench(name)
+    sim = sim or os.getenv("SIM", "icarus")
+    runner = get_runner(sim)
+    runner.build(
+        verilog_sources=[TEST_DIR / bench["wrapper"]]
+        + [SRC_DIR / src for src in bench["sources"]],
+        includes=[SRC_DIR],
+        # rtl builds get the simulation-only perf counters, as in the Makefile
+        defines={"PERF_COUNTERS": 1, **bench.get("defines", {}), **(defines or {})},
+        parameters=parameters or {},
+        hdl_toplevel=bench["toplevel"],
+        build_dir=build_dir,
+        build_args=SIM_BUILD_ARGS.get(sim, []),
+        timescale=("1ns", "1ps"),
+    )
+    return runner
+
+
+def run_bench(name, build_dir, test_dir, sim=None, testcase=None, extra_env=None, results_xml=None):
+    """run (a subset of) a bench's tests against an existing build.
+
+    a fresh runner is created so this can be called from worker processes;
+    only the build step needs the source list.
+    """
+    from cocotb.runner import get_runner
+
+    use_bench(name)
+    runner = get_runner(sim or os.getenv("SIM", "icarus"))
+    return runner.test(
+        test_module=name,
+        hdl_toplevel=BENCHES[name]["toplevel"],
+        hdl_toplevel_lang="verilog",
+        testcase=testcase,
+        extra_env=extra_env or {},
+        build_dir=build_dir,
+        test_dir=test_dir,
+        results_xml=results_xml,
+    )
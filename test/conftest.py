@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# pytest options and shared fixtures for test_benches.py: one build per bench
+# per pytest run, shared by every xdist worker, and a junit file per worker.
+
+import fcntl
+import functools
+import os
+import shutil
+import uuid
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from benches import BENCHES, TEST_DIR, build_bench
+
+# executable that has to be on PATH for each SIM
+SIM_TOOLS = {"icarus": "iverilog", "verilator": "verilator"}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benches", "cocotb benches (test_benches.py)")
+    group.addoption("--bench", action="append", choices=sorted(BENCHES),
+                    help="bench to run; repeat for several (default: all)")
+    group.addoption("--sim", default=os.getenv("SIM", "icarus"))
+    group.addoption("--waves", action="store_true", help="keep the vcd dumps (off by default)")
+    group.addoption("--build-root", type=Path, default=TEST_DIR / "sim_build" / "pytest")
+
+
+def build_root(config):
+    return config.getoption("--build-root").resolve() / config.getoption("--sim")
+
+
+def merge_junit(paths, out):
+    """one junit file from the testsuites of several cocotb results files."""
+    merged = ET.Element("testsuites", name="cocotb")
+    for path in paths:
+        if Path(path).is_file():
+            merged.extend(ET.parse(path).getroot().iter("testsuite"))
+    out.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(merged).write(out, encoding="utf-8", xml_declaration=True)
+
+
+@pytest.fixture(scope="session")
+def bench_build(pytestconfig):
+    """build(name) -> build_dir, compiling each toplevel once per pytest run.
+
+    xdist workers are separate processes, so the first one to need a build
+    compiles it under a file lock and stamps it with the run id; the others
+    wait on the lock and reuse it. builds are keyed by toplevel and bench
+    defines, so png_refine (REFINE) gets its own tb_png build.
+    """
+    sim = pytestconfig.getoption("--sim")
+    if shutil.which(SIM_TOOLS.get(sim, sim)) is None:
+        pytest.skip(f"{sim} is not installed")
+    run_id = os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+    # waves off: every test case would otherwise write its own vcd
+    defines = {} if pytestconfig.getoption("--waves") else {"NO_WAVES": 1}
+    root = build_root(pytestconfig)
+
+    @functools.cache
+    def build(name):
+        bench = BENCHES[name]
+        build_dir = root / "_".join([bench["toplevel"], *sorted(bench.get("defines", {}))]).lower()
+        build_dir.mkdir(parents=True, exist_ok=True)
+        stamp = build_dir / "pytest_run"
+        with open(build_dir / "pytest.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not stamp.exists() or stamp.read_text() != run_id:
+                stamp.unlink(missing_ok=True)
+                build_bench(name, build_dir, sim=sim, defines=defines)
+                stamp.write_text(run_id)
+        return build_dir
+
+    return build
+
+
+@pytest.fixture(scope="session")
+def worker_results(pytestconfig):
+    """cocotb results files written by this worker; merged into
+    <build root>/junit/<worker>.xml when the worker finishes."""
+    paths = []
+    yield paths
+    if paths:
+        worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+        merge_junit(paths, build_root(pytestconfig) / "junit" / f"{worker}.xml")
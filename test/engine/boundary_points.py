@@ -0,0 +1,172 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# boundary-sensitivity point selector. most quantization trouble lives near
+# the set boundary, where a one-lsb change in c or the float reference moves
+# the escape count a lot. this sweeps large grids of views through the
+# vectorized models, scores every distinct c by how sensitive its iteration
+# count is, and keeps the top of the ranking for the dut to spend time on.
+#
+# the ranked corpus is cached under test/.cache/boundary/ and rebuilt only
+# when the fixed-point parameters, the model code or the sweep settings change.
+#
+# run from test/:
+#   python engine/boundary_points.py --show 20
+
+import argparse
+import hashlib
+import inspect
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+TEST_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TEST_DIR / "model"))
+from fixed_point import (  # noqa: E402
+    COORD_WIDTH,
+    FRAC_BITS,
+    calculate_complex_c_grid,
+    engine_model_grid,
+    float_model_grid,
+    wrap,
+)
+
+CACHE_DIR = TEST_DIR / ".cache" / "boundary"
+
+# default sweep: every zoom level, a handful of centres each, every 8th pixel
+DEFAULT_SWEEP = {
+    "seed": 298,
+    "centres_per_zoom": 8,
+    "pixel_stride": 8,
+    "max_iter_limit": 63,
+    "keep": 4096,
+}
+
+FIELDS = ("pixel_x", "pixel_y", "center_x", "center_y", "zoom_level")
+
+
+def cache_key(sweep):
+    """hash of everything the ranking depends on."""
+    model_src = "".join(
+        inspect.getsource(fn) for fn in (calculate_complex_c_grid, engine_model_grid, float_model_grid, wrap)
+    )
+    blob = json.dumps(
+        {"COORD_WIDTH": COORD_WIDTH, "FRAC_BITS": FRAC_BITS, "model": model_src, "sweep": sweep},
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def sweep_candidates(sweep):
+    """pixel grid x centres x zoom levels, as flat arrays of bench inputs."""
+    rng = np.random.default_rng(sweep["seed"])
+    xs = np.arange(0, 640, sweep["pixel_stride"])
+    ys = np.arange(0, 480, sweep["pixel_stride"])
+    px, py = (a.ravel() for a in np.meshgrid(xs, ys))
+
+    cols = {field: [] for field in FIELDS}
+    for zoom in range(16):
+        # same centre distribution as the fuzz test: Q11 range passed as 16-bit
+        centres = rng.integers(-1024, 1024, size=(sweep["centres_per_zoom"], 2))
+        for cx, cy in centres:
+            cols["pixel_x"].append(px)
+            cols["pixel_y"].append(py)
+            cols["center_x"].append(np.full(px.size, cx & 0xFFFF))
+            cols["center_y"].append(np.full(px.size, cy & 0xFFFF))
+            cols["zoom_level"].append(np.full(px.size, zoom))
+    return {field: np.concatenate(parts) for field, parts in cols.items()}
+
+
+def rank_points(sweep):
+    """score every distinct fixed-point c in the sweep; most sensitive first."""
+    cols = sweep_candidates(sweep)
+    c_real, c_imag = calculate_complex_c_grid(*(cols[field] for field in FIELDS))
+
+    # many inputs share a c (high zoom collapses the view); rank each c once
+    _, first = np.unique(c_real * (1 << COORD_WIDTH) + c_imag, return_index=True)
+    cols = {field: values[first] for field, values in cols.items()}
+    c_real, c_imag = c_real[first], c_imag[first]
+
+    limit = sweep["max_iter_limit"]
+    fixed = engine_model_grid(c_real, c_imag, limit)
+    flt = float_model_grid((c_real + 1j * c_imag) / (1 << FRAC_BITS), limit)
+
+    # one-lsb neighbours in each direction
+    spread = np.zeros_like(fixed)
+    for dr, di in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        nb = engine_model_grid(wrap(c_real + dr, COORD_WIDTH), wrap(c_imag + di, COORD_WIDTH), limit)
+        spread = np.maximum(spread, np.abs(nb - fixed))
+
+    score = np.maximum(np.abs(fixed - flt), spread)
+    # most sensitive first; among equals prefer longer orbits
+    order = np.lexsort((-fixed, -score))[: sweep["keep"]]
+
+    ranked = {field: values[order] for field, values in cols.items()}
+    ranked.update(
+        c_real=c_real[order],
+        c_imag=c_imag[order],
+        fixed=fixed[order],
+        float=flt[order],
+        spread=spread[order],
+        score=score[order],
+    )
+    return ranked
+
+
+def load_ranked(sweep=None, refresh=False):
+    """ranked corpus for the sweep, from cache when it is still valid."""
+    sweep = dict(DEFAULT_SWEEP, **(sweep or {}))
+    key = cache_key(sweep)
+    path = CACHE_DIR / f"boundary_{key}.npz"
+
+    if path.exists() and not refresh:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    ranked = rank_points(sweep)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in CACHE_DIR.glob("boundary_*.npz"):
+        stale.unlink()
+    np.savez_compressed(path, **ranked)
+    return ranked
+
+
+def ranked_params(count, sweep=None):
+    """top `count` points as engine bench params dicts."""
+    ranked = load_ranked(sweep)
+    limit = dict(DEFAULT_SWEEP, **(sweep or {}))["max_iter_limit"]
+    return [
+        dict(
+            {field: int(ranked[field][i]) for field in FIELDS},
+            name=f"boundary_{i}",
+            max_iter_limit=limit,
+        )
+        for i in range(min(count, ranked["score"].size))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rank boundary-sensitive engine test points")
+    parser.add_argument("--refresh", action="store_true", help="rebuild even if the cache is valid")
+    parser.add_argument("--show", type=int, default=10, help="print the top N points")
+    for name, default in DEFAULT_SWEEP.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    args = parser.parse_args()
+
+    sweep = {name: getattr(args, name) for name in DEFAULT_SWEEP}
+    ranked = load_ranked(sweep, refresh=args.refresh)
+    print(f"[boundary] {ranked['score'].size} points, cache key {cache_key(sweep)}")
+    print(f"[boundary] score histogram: {np.bincount(ranked['score']).tolist()}")
+    for i in range(min(args.show, ranked["score"].size)):
+        c = complex(ranked["c_real"][i], ranked["c_imag"][i]) / (1 << FRAC_BITS)
+        print(
+            f"  #{i:<4} c={c:.4f} fixed={ranked['fixed'][i]:2} float={ranked['float'][i]:2} "
+            f"spread={ranked['spread'][i]:2} score={ranked['score'][i]:2} "
+            + " ".join(f"{field}={ranked[field][i]}" for field in FIELDS)
+        )
+
+
+if __name__ == "__main__":
+    main()
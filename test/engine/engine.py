@@ -2,20 +2,27 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import ClockCycles, RisingEdge, ReadOnly
 import os
+import json
 
 import random
 import functools
+from pathlib import Path
 
-def to_signed(n, bit_width): # int -> 2s complement
-    mask = (1 << bit_width) - 1
-    if n < 0:
-        n = (1 << bit_width) + n
-    return n & mask
+from fixed_point import COORD_WIDTH, FRAC_BITS
+from fixed_point import to_signed, calculate_complex_c, engine_model, float_model, iteration_tolerance
+from watchdog import Watchdog
 
-def from_signed(n, bit_width): # 2s comp -> int
-    if n & (1 << (bit_width - 1)):
-        return n - (1 << bit_width)
-    return n
+# failing fuzz params are appended here and replayed as regular tests
+CORPUS_PATH = Path(os.getenv("ENGINE_CORPUS", Path(__file__).resolve().parent / "fuzz_corpus.jsonl"))
+
+# watchdog floor for the long transaction loops (fuzz, coverage campaign)
+MIN_TRANSACTION_RATE = 5
+# wall budget per transaction of those loops, 5x the time the floor allows
+TRANSACTION_WALL_S = 1
+
+# ENGINE_TRACE=<dir> records every engine transaction for offline replay (replay.py)
+TRACE_DIR = os.getenv("ENGINE_TRACE")
+_trace_writer = None
 
 test_cases = [
     # basic functionality tests
@@ -149,88 +156,6 @@ test_cases = [
     }
 ]
 
-def calculate_complex_c(params):
-    COORD_WIDTH = 11  # Updated for 1x2 tile optimization
-    FRAC_BITS = 8     # Updated for 1x2 tile optimization
-    SCREEN_CENTER_X = 320
-    SCREEN_CENTER_Y = 240
-    
-    zoom_shift = min(params['zoom_level'], 15)
-    base_scale = 1 << FRAC_BITS  # 1.0, Q3.8 -> 256
-    scale_factor = base_scale >> zoom_shift
-    
-    temp_real = (params['pixel_x'] - SCREEN_CENTER_X) * scale_factor
-    temp_imag = (params['pixel_y'] - SCREEN_CENTER_Y) * scale_factor
-    
-    # c_real = center_x[15:5] + temp_real[16:5]; (Q3.8 format)
-    c_r = from_signed(params['center_x'], 16) >> 5
-    c_i = from_signed(params['center_y'], 16) >> 5
-
-    # temp_real -> signed 22 bit
-    c_r += from_signed(to_signed(temp_real, 22), 22) >> 5
-    c_i += from_signed(to_signed(temp_imag, 22), 22) >> 5
-
-    # truncate to fixed-point representation
-    c_real_fixed = from_signed(to_signed(c_r, COORD_WIDTH), COORD_WIDTH)
-    c_imag_fixed = from_signed(to_signed(c_i, COORD_WIDTH), COORD_WIDTH)
-    
-    # convert to floating-point representation
-    c_real_float = c_real_fixed / (1 << FRAC_BITS)
-    c_imag_float = c_imag_fixed / (1 << FRAC_BITS)
-    c_complex = complex(c_real_float, c_imag_float)
-    
-    return c_real_fixed, c_imag_fixed, c_complex
-
-def engine_model(params):
-    COORD_WIDTH = 11  
-    FRAC_BITS = 8     
-    
-    c_real, c_imag, _ = calculate_complex_c(params)
-
-    # *** main loop
-    z_real, z_imag = 0, 0
-    
-    for i in range(params['max_iter_limit'] + 1):
-        # Q6.16
-        z_real_sq = z_real * z_real
-        z_imag_sq = z_imag * z_imag
-        
-        # magnitude_sq = z_real_sq[18:8] + z_imag_sq[18:8] (Q3.8 format)
-        mag_sq = (z_real_sq >> FRAC_BITS) + (z_imag_sq >> FRAC_BITS)
-        
-        # Q3.8, 4.0 -> 1024
-        if mag_sq > 1024 or i >= params['max_iter_limit']:
-            return i
-
-        # z_new = z^2 + c
-        z_cross = z_real * z_imag
-
-        # z_real_new = (z_real^2 - z_imag^2) + c_real
-        zrs_shifted = from_signed(to_signed(z_real_sq, 22), 22) >> FRAC_BITS
-        zis_shifted = from_signed(to_signed(z_imag_sq, 22), 22) >> FRAC_BITS
-        z_real_new = from_signed(to_signed(zrs_shifted - zis_shifted, 12), 12) + c_real
-        z_real_new = from_signed(to_signed(z_real_new, COORD_WIDTH), COORD_WIDTH)
-        
-        # z_imag_new = 2*z_real*z_imag + c_imag
-        z_cross_shifted = from_signed(to_signed(z_cross << 1, 22), 22) >> FRAC_BITS
-        z_imag_new = from_signed(to_signed(z_cross_shifted, 12), 12) + c_imag
-        z_imag_new = from_signed(to_signed(z_imag_new, COORD_WIDTH), COORD_WIDTH)
-
-        z_real, z_imag = z_real_new, z_imag_new
-        
-    return params['max_iter_limit']
-
-def float_model(params): # floating point model for comparison
-    _, _, c = calculate_complex_c(params)
-
-    z = complex(0, 0)
-    for i in range(params['max_iter_limit']):
-        if abs(z) > 2.0:
-            return i
-        z = z*z + c
-        
-    return params['max_iter_limit']
-
 
 async def reset_dut(dut):
     dut.rst_n.value = 0
@@ -247,6 +172,20 @@ async def reset_dut(dut):
     dut.enable.value = 1
     await ClockCycles(dut.clk, 1)
     assert dut.busy.value == 0, "DUT idle after reset"
+    if TRACE_DIR:
+        start_trace(dut)
+
+def start_trace(dut):
+    """attach a transaction recorder for the current test; one file per simulator process."""
+    global _trace_writer
+    from transactions import TraceWriter, EngineRecorder
+
+    if _trace_writer is None:
+        _trace_writer = TraceWriter(
+            Path(TRACE_DIR) / f"tb_engine_{os.getpid()}",
+            {"source": "tb_engine", "coord_width": COORD_WIDTH, "frac_bits": FRAC_BITS},
+        )
+    EngineRecorder(dut, dut.clk, _trace_writer).start()
 
 async def run_calculation(dut, params):
     dut.pixel_x.value = params['pixel_x']
@@ -303,7 +242,7 @@ async def run_single_test_case(dut, params):
         )
     else:
         # Normal tolerance for other tests
-        tolerance = 2 if abs(c_complex) > 2.0 else 0
+        tolerance = int(iteration_tolerance(c_complex))
         assert abs(dut_iterations - expected_iterations) <= tolerance, f"DUT={dut_iterations}, Expected={expected_iterations}, Tolerance={tolerance}"
 
 # cooked cocotb hacks to make the output look nice:
@@ -313,7 +252,34 @@ def create_test_runner(params):
 
     return actual_test
 
-for params in test_cases:
+def load_corpus(path=CORPUS_PATH):
+    """read replay params (one json object per line) written by the fuzz test."""
+    if not Path(path).exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def append_corpus(path, entries):
+    """append failures to the replay corpus, skipping any (seed, shard, trial,
+    params) already in it, as fuzz_campaign.merge_corpus does."""
+    if not entries:
+        return
+    seen = {json.dumps(entry, sort_keys=True) for entry in load_corpus(path)}
+    with open(path, "a") as f:
+        for entry in entries:
+            line = json.dumps(entry, sort_keys=True)
+            if line not in seen:
+                seen.add(line)
+                f.write(line + "\n")
+
+# every recorded fuzz failure becomes its own test, named after where it came from
+replay_cases = []
+for entry in load_corpus():
+    case = dict(entry)
+    case["name"] = f"replay seed{entry['seed']} shard{entry['shard']} trial{entry['trial']}"
+    replay_cases.append(case)
+
+for params in test_cases + replay_cases:
     test_name = f"test_{params['name'].lower().replace(' ', '_')}"
 
     test_coroutine = create_test_runner(params)
@@ -323,16 +289,15 @@ for params in test_cases:
 
     globals()[test_name] = cocotb.test(test_coroutine)
 
-def _random_params():
-    import random
+def _random_params(rng=random):
     # pixel range and center/zoom distributions chosen to hit diverse regions
-    pixel_x = random.randint(0, 639)
-    pixel_y = random.randint(0, 479)
+    pixel_x = rng.randint(0, 639)
+    pixel_y = rng.randint(0, 479)
     # generate center in Q11 signed range but pass as 16-bit; engine truncates internally
-    center_x = to_signed(random.randint(-1024, 1023), 16)  # ~[-4.0, 4.0) in Q3.8 after >>5
-    center_y = to_signed(random.randint(-1024, 1023), 16)
-    zoom_level = random.randint(0, 15)
-    max_iter_limit = random.choice([8, 16, 32, 50, 63])
+    center_x = to_signed(rng.randint(-1024, 1023), 16)  # ~[-4.0, 4.0) in Q3.8 after >>5
+    center_y = to_signed(rng.randint(-1024, 1023), 16)
+    zoom_level = rng.randint(0, 15)
+    max_iter_limit = rng.choice([8, 16, 32, 50, 63])
     return {
         "name": "fuzz",
         "pixel_x": pixel_x,
@@ -344,6 +309,23 @@ def _random_params():
     }
 
 
+def transaction_watchdog(dut, name, count, snapshot=None):
+    """cycle and wall budgets for `count` computations at the iteration cap,
+    and a transactions/s floor; ticked once per transaction."""
+    return Watchdog(dut, name, 20, unit="transactions", max_cycles=count * (63 + 8) + 1000,
+                    max_wall_s=count * TRANSACTION_WALL_S + 60, min_rate=MIN_TRANSACTION_RATE,
+                    snapshot=snapshot).start()
+
+
+def shard_rng(master_seed, shard):
+    """independent, reproducible stream for one shard of a fuzz campaign.
+
+    string seeds go through sha512 in `random`, so the stream does not depend
+    on PYTHONHASHSEED or on how many shards run alongside it.
+    """
+    return random.Random(f"engine-fuzz/{master_seed}/{shard}")
+
+
 if os.getenv("ENGINE_FUZZ", "0") == "1":
     @cocotb.test()
     async def test_engine_randomized_fuzz(dut):
@@ -352,27 +334,71 @@ if os.getenv("ENGINE_FUZZ", "0") == "1":
         cocotb.start_soon(clock.start())
         await reset_dut(dut)
 
-        trials = 200
-        failures = 0
-        for _ in range(trials):
-            params = _random_params()
+        # ENGINE_FUZZ_SEED / ENGINE_FUZZ_SHARD pin the stream; an unseeded run
+        # picks a seed and logs it so any failure can be re-run exactly
+        master_seed = int(os.getenv("ENGINE_FUZZ_SEED", random.SystemRandom().randrange(1 << 32)))
+        shard = int(os.getenv("ENGINE_FUZZ_SHARD", "0"))
+        trials = int(os.getenv("ENGINE_FUZZ_TRIALS", "200"))
+        corpus = Path(os.getenv("ENGINE_FUZZ_CORPUS", CORPUS_PATH))
+        rng = shard_rng(master_seed, shard)
+        dut._log.info(f"fuzz seed={master_seed} shard={shard} trials={trials}")
+
+        failures = []
+        trial, params = 0, None
+        watchdog = transaction_watchdog(dut, f"fuzz seed={master_seed} shard={shard}", trials,
+                                        snapshot=lambda: f"trial {trial}: {params}, {len(failures)} failure(s)")
+        for trial in range(trials):
+            watchdog.tick()
+            params = _random_params(rng)
             _, _, c_complex = calculate_complex_c(params)
             expected_iterations = engine_model(params)
             dut_iterations = await run_calculation(dut, params)
 
             # quantization tolerance: allow small drift when |c| > 2.0
-            tolerance = 2 if abs(c_complex) > 2.0 else 0
-            try:
-                assert abs(dut_iterations - expected_iterations) <= tolerance
-            except AssertionError:
-                failures += 1
+            tolerance = int(iteration_tolerance(c_complex))
+            if abs(dut_iterations - expected_iterations) > tolerance:
+                params.update(seed=master_seed, shard=shard, trial=trial)
+                failures.append(params)
                 # keep going to collect multiple samples; cap failures to avoid long logs
-                if failures <= 5:
+                if len(failures) <= 5:
                     dut._log.warning(
                         f"Fuzz mismatch: DUT={dut_iterations}, Model={expected_iterations}, tol={tolerance}, params={params}"
                     )
 
-        assert failures == 0, f"Fuzz test had {failures} mismatches out of {trials}"
+        watchdog.stop()
+        append_corpus(corpus, failures)
+        assert not failures, (
+            f"Fuzz test had {len(failures)} mismatches out of {trials} (seed={master_seed}, shard={shard}), "
+            f"params appended to {corpus}"
+        )
+
+
+if int(os.getenv("ENGINE_BOUNDARY", "0")) > 0:
+    @cocotb.test()
+    async def test_engine_boundary_points(dut):
+        """dut vs fixed-point model on the most quantization-sensitive points of a large sweep."""
+        from boundary_points import ranked_params
+
+        clock = Clock(dut.clk, 20, units="ns")
+        cocotb.start_soon(clock.start())
+        await reset_dut(dut)
+
+        points = ranked_params(int(os.getenv("ENGINE_BOUNDARY")))
+        failures = 0
+        for params in points:
+            _, _, c_complex = calculate_complex_c(params)
+            expected_iterations = engine_model(params)
+            dut_iterations = await run_calculation(dut, params)
+
+            tolerance = int(iteration_tolerance(c_complex))
+            if abs(dut_iterations - expected_iterations) > tolerance:
+                failures += 1
+                if failures <= 5:
+                    dut._log.warning(
+                        f"Boundary mismatch: DUT={dut_iterations}, Model={expected_iterations}, tol={tolerance}, params={params}"
+                    )
+
+        assert failures == 0, f"Boundary test had {failures} mismatches out of {len(points)}"
 
 
 @cocotb.test()
@@ -411,3 +437,198 @@ async def test_engine_handshake_latency_bounds(dut):
         assert latency <= params['max_iter_limit'] + overhead, (
             f"Latency {latency} exceeds bound max_iter+{overhead} for params {params}"
         )
+
+
+def interior_params(count, seed=37):
+    """pixels whose c the engine's interior test flags, and unflagged pixels
+    right next to them, on a zoom-0 view of the cardioid and period-2 bulb.
+    c is mapped the way the rtl does (chip.top_c at the bench's widths)."""
+    import numpy as np
+    from chip import top_c
+    from interior import interior
+
+    xs, ys = np.meshgrid(np.arange(640), np.arange(480))
+    center_x = to_signed(-(1 << (FRAC_BITS - 2)), 16)  # c = -0.25 + pixel offset / 256
+    c_real, c_imag = top_c(xs, ys, center_x, 0, 0, COORD_WIDTH, FRAC_BITS)
+    flagged = interior(c_real, c_imag, FRAC_BITS)
+    # unflagged points with a flagged neighbour: where a wrong test would show
+    edge = ~flagged & (np.roll(flagged, 1, 0) | np.roll(flagged, -1, 0) | np.roll(flagged, 1, 1) | np.roll(flagged, -1, 1))
+
+    rng = np.random.default_rng(seed)
+    params = []
+    for name, mask in (("interior", flagged), ("interior edge", edge)):
+        for i in rng.choice(np.flatnonzero(mask), count, replace=False):
+            params.append({
+                "name": name,
+                "pixel_x": int(xs.flat[i]),
+                "pixel_y": int(ys.flat[i]),
+                "center_x": center_x,
+                "center_y": 0,
+                "zoom_level": 0,
+                "max_iter_limit": int(rng.choice([8, 16, 63])),
+            })
+    return params
+
+
+@cocotb.test()
+async def test_interior_bailout_matches_model(dut):
+    """interior bailout: counts equal to the full iteration, COMPUTE cut to one cycle."""
+    from chip import top_c, top_engine_grid
+    from interior import compute_edges, interior
+
+    clock = Clock(dut.clk, 20, units="ns")
+    cocotb.start_soon(clock.start())
+    await reset_dut(dut)
+
+    points = interior_params(int(os.getenv("ENGINE_INTERIOR", "40")))
+    failures = 0
+    saved = 0
+    for params in points:
+        # the rtl c mapping and iteration, which calculate_complex_c / engine_model only approximate
+        c_real, c_imag = top_c(params['pixel_x'], params['pixel_y'], params['center_x'], params['center_y'],
+                               params['zoom_level'], COORD_WIDTH, FRAC_BITS)
+        expected_iterations = int(top_engine_grid(c_real, c_imag, params['max_iter_limit'], COORD_WIDTH, FRAC_BITS))
+        expected_latency = int(compute_edges(expected_iterations, interior(c_real, c_imag, FRAC_BITS)))
+
+        dut.pixel_x.value = params['pixel_x']
+        dut.pixel_y.value = params['pixel_y']
+        dut.center_x.value = params['center_x']
+        dut.center_y.value = params['center_y']
+        dut.zoom_level.value = params['zoom_level']
+        dut.max_iter_limit.value = params['max_iter_limit']
+        await ClockCycles(dut.clk, 1)
+
+        # edges from busy rising to result_valid, as in the latency bound test
+        dut.pixel_valid.value = 1
+        await RisingEdge(dut.busy)
+        dut.pixel_valid.value = 0
+        latency = 0
+        while True:
+            await ClockCycles(dut.clk, 1)
+            # after this edge's updates, so a one-cycle bailout counts as 1
+            await ReadOnly()
+            latency += 1
+            if dut.result_valid.value.integer == 1:
+                break
+        dut_iterations = dut.iteration_count.value.integer
+        await ClockCycles(dut.clk, 2)
+
+        saved += expected_iterations + 1 - latency
+        if (dut_iterations, latency) != (expected_iterations, expected_latency):
+            failures += 1
+            if failures <= 5:
+                dut._log.warning(
+                    f"Interior mismatch: DUT={dut_iterations} in {latency} cycles, "
+                    f"Model={expected_iterations} in {expected_latency} cycles, params={params}"
+                )
+
+    dut._log.info(f"{len(points)} interior/edge points, {saved} COMPUTE cycles saved by the bailout")
+    assert failures == 0, f"Interior test had {failures} mismatches out of {len(points)}"
+
+
+# coverage-minimized vector set for gate-level runs (vector_set.py): the rtl
+# campaign records every vector's result and engine register samples, the
+# gate-level bench replays only the stored set
+VECTOR_SET_PATH = Path(os.getenv("ENGINE_VECTOR_SET", Path(__file__).resolve().parent / "gl_vectors.jsonl"))
+
+
+async def run_sampled(dut, params, engine=None):
+    """one computation; returns (iteration_count, latency, samples). latency
+    counts edges from busy rising to result_valid. with the engine instance
+    handle (rtl only), samples holds [z_real, z_imag, iter_count] as unsigned
+    register bits after every edge from entering COMPUTE to DONE."""
+    dut.pixel_x.value = params['pixel_x']
+    dut.pixel_y.value = params['pixel_y']
+    dut.center_x.value = params['center_x']
+    dut.center_y.value = params['center_y']
+    dut.zoom_level.value = params['zoom_level']
+    dut.max_iter_limit.value = params['max_iter_limit']
+    await ClockCycles(dut.clk, 1)
+
+    dut.pixel_valid.value = 1
+    await RisingEdge(dut.busy)
+    dut.pixel_valid.value = 0
+    samples = []
+    latency = 0
+    await ReadOnly()
+    while True:
+        if engine is not None:
+            samples.append([engine.z_real.value.integer, engine.z_imag.value.integer, engine.iter_count.value.integer])
+        if dut.result_valid.value.integer == 1:
+            break
+        await RisingEdge(dut.clk)
+        await ReadOnly()
+        latency += 1
+    result = dut.iteration_count.value.integer
+    await ClockCycles(dut.clk, 2)
+    return result, latency, samples
+
+
+if os.getenv("ENGINE_COVERAGE"):
+    @cocotb.test()
+    async def test_engine_coverage_campaign(dut):
+        """rtl only: random and interior vectors with register samples, written to ENGINE_COVERAGE."""
+        from chip import top_c, top_engine_grid
+
+        clock = Clock(dut.clk, 20, units="ns")
+        cocotb.start_soon(clock.start())
+        await reset_dut(dut)
+
+        seed = int(os.getenv("ENGINE_COVERAGE_SEED", "1"))
+        trials = int(os.getenv("ENGINE_COVERAGE_TRIALS", "500"))
+        rng = random.Random(f"engine-coverage/{seed}")
+        vectors = [_random_params(rng) for _ in range(trials)]
+        vectors += interior_params(int(os.getenv("ENGINE_COVERAGE_INTERIOR", "20")), seed=seed)
+
+        failures = 0
+        watchdog = transaction_watchdog(dut, f"coverage seed={seed}", len(vectors))
+        with open(os.getenv("ENGINE_COVERAGE"), "w") as out:
+            for trial, params in enumerate(vectors):
+                watchdog.tick()
+                # exact rtl mapping and iteration, which engine_model only approximates
+                c_real, c_imag = top_c(params['pixel_x'], params['pixel_y'], params['center_x'],
+                                       params['center_y'], params['zoom_level'], COORD_WIDTH, FRAC_BITS)
+                expected_iterations = int(top_engine_grid(c_real, c_imag, params['max_iter_limit'], COORD_WIDTH, FRAC_BITS))
+                dut_iterations, latency, samples = await run_sampled(dut, params, dut.dut)
+                if dut_iterations != expected_iterations:
+                    # only vectors the rtl gets right can be a gate-level reference
+                    failures += 1
+                    dut._log.warning(f"Coverage vector mismatch: DUT={dut_iterations}, Model={expected_iterations}, params={params}")
+                    continue
+                out.write(json.dumps({
+                    "params": dict(params, seed=seed, trial=trial),
+                    "iteration_count": dut_iterations,
+                    "latency": latency,
+                    "samples": samples,
+                }, sort_keys=True) + "\n")
+
+        watchdog.stop()
+        dut._log.info(f"coverage campaign: {len(vectors)} vectors (seed {seed}) recorded")
+        assert failures == 0, f"{failures} campaign vectors disagree with the model"
+
+
+# rtl runs skip it until a set is generated; a gate-level run without one fails
+@cocotb.test(skip=not VECTOR_SET_PATH.exists() and os.getenv("GATES") != "yes")
+async def test_engine_vector_set(dut):
+    """the stored coverage-minimized set: counts and latencies exactly as recorded from rtl."""
+    assert VECTOR_SET_PATH.exists(), (
+        f"no vector set at {VECTOR_SET_PATH}; generate one from rtl with python engine/vector_set.py"
+    )
+    clock = Clock(dut.clk, 20, units="ns")
+    cocotb.start_soon(clock.start())
+    await reset_dut(dut)
+
+    vectors = load_corpus(VECTOR_SET_PATH)
+    failures = 0
+    for vector in vectors:
+        dut_iterations, latency, _ = await run_sampled(dut, vector)
+        if (dut_iterations, latency) != (vector["iteration_count"], vector["latency"]):
+            failures += 1
+            if failures <= 5:
+                dut._log.warning(
+                    f"Vector set mismatch: DUT={dut_iterations} in {latency} edges, "
+                    f"rtl={vector['iteration_count']} in {vector['latency']} edges, params={vector}"
+                )
+
+    dut._log.info(f"{len(vectors)} vectors from {VECTOR_SET_PATH.name}")
+    assert failures == 0, f"Vector set had {failures} mismatches out of {len(vectors)}"
@@ -0,0 +1,192 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# batch engine bench on tb_engine_batch: N_ENGINES independent engines on
+# packed buses. EngineBatch keeps every lane busy with its own job, refills
+# lanes as they finish and decodes all lanes of a bus in one numpy call, so
+# large campaigns pay the python/simulator handoff once per group of results
+# instead of several times per result. results are checked as a whole with
+# replay.replay (same model, tolerance and latency rules as tb_engine).
+#
+# run from test/:
+#   make tb-engine-batch ENGINES=16
+#   ENGINE_BATCH_TRIALS=100000 ENGINE_BATCH_SEED=7 make tb-engine-batch ENGINES=32
+
+import os
+import random
+
+import numpy as np
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Edge, FallingEdge
+from cocotb.utils import get_sim_time
+
+from fixed_point import COORD_WIDTH, FRAC_BITS
+from lanes import pack_lanes, unpack_lanes
+from transactions import TRACE_DTYPE, TraceWriter
+from replay import replay
+from engine import CORPUS_PATH, TRACE_DIR, append_corpus
+
+CLK_PERIOD_NS = 20
+
+# packed job inputs: (port, lane width); names match TRACE_DTYPE fields
+INPUT_PORTS = (
+    ("pixel_x", 10),
+    ("pixel_y", 10),
+    ("center_x", 16),
+    ("center_y", 16),
+    ("zoom_level", 8),
+    ("max_iter_limit", 6),
+)
+
+
+def random_jobs(rng, count):
+    """engine._random_params distributions, drawn as one TRACE_DTYPE array."""
+    jobs = np.zeros(count, dtype=TRACE_DTYPE)
+    jobs["pixel_x"] = rng.integers(0, 640, count)
+    jobs["pixel_y"] = rng.integers(0, 480, count)
+    # center in Q11 signed range, passed as 16-bit like the fuzz test
+    jobs["center_x"] = rng.integers(-1024, 1024, count) & 0xFFFF
+    jobs["center_y"] = rng.integers(-1024, 1024, count) & 0xFFFF
+    jobs["zoom_level"] = rng.integers(0, 16, count)
+    jobs["max_iter_limit"] = rng.choice([8, 16, 32, 50, 63], count)
+    return jobs
+
+
+class EngineBatch:
+    """driver for tb_engine_batch. run() fills in iteration_count and latency
+    (edges from busy rising to result_valid rising) of a job array."""
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.lanes = len(dut.busy)
+        self.inputs = {name: np.zeros(self.lanes, dtype=np.int64) for name, _ in INPUT_PORTS}
+        self.valid = np.zeros(self.lanes, dtype=bool)
+        self.wakeups = 0
+
+    def _drive(self):
+        for name, width in INPUT_PORTS:
+            getattr(self.dut, name).value = pack_lanes(self.inputs[name], width)
+        self.dut.pixel_valid.value = pack_lanes(self.valid, 1)
+
+    async def reset(self):
+        self.valid[:] = False
+        for values in self.inputs.values():
+            values[:] = 0
+        self.dut.rst_n.value = 0
+        self.dut.enable.value = 0
+        self._drive()
+        await ClockCycles(self.dut.clk, 5)
+        self.dut.rst_n.value = 1
+        self.dut.enable.value = 1
+        await ClockCycles(self.dut.clk, 1)
+        assert self.dut.busy.value.integer == 0, "engines idle after reset"
+
+    async def run(self, jobs):
+        dut = self.dut
+        job_of = np.full(self.lanes, -1)
+        busy_from = np.zeros(self.lanes, dtype=np.int64)  # ns, edge where busy rises
+        next_job = finished = 0
+
+        # every decision is made at a falling edge, where all ports are stable
+        await FallingEdge(dut.clk)
+        while finished < len(jobs):
+            self.wakeups += 1
+            now = get_sim_time(units="ns")
+
+            ready = self.valid & unpack_lanes(dut.result_valid.value.integer, self.lanes, 1).astype(bool)
+            if ready.any():
+                lanes = np.flatnonzero(ready)
+                counts = unpack_lanes(dut.iteration_count.value.integer, self.lanes, 6)
+                jobs["iteration_count"][job_of[lanes]] = counts[lanes]
+                # result_valid rose on the rising edge half a period ago
+                jobs["latency"][job_of[lanes]] = (now - CLK_PERIOD_NS // 2 - busy_from[lanes]) // CLK_PERIOD_NS
+                self.valid[lanes] = False
+                job_of[lanes] = -1
+                finished += lanes.size
+
+            # lanes finishing now leave DONE on the next edge; refill them after it
+            free = np.flatnonzero((job_of < 0) & ~ready)[: len(jobs) - next_job]
+            if free.size:
+                picked = np.arange(next_job, next_job + free.size)
+                for name, _ in INPUT_PORTS:
+                    self.inputs[name][free] = jobs[name][picked]
+                job_of[free] = picked
+                busy_from[free] = now + CLK_PERIOD_NS // 2
+                self.valid[free] = True
+                next_job += free.size
+            if ready.any() or free.size:
+                self._drive()
+
+            if finished == len(jobs):
+                break
+            if not ready.any():
+                # nothing to refill until some lane finishes
+                await Edge(dut.result_valid)
+            await FallingEdge(dut.clk)
+        return jobs
+
+
+def check_batch(dut, jobs, batch, elapsed_ns):
+    """shared verdict: model/tolerance/latency via replay, corpus on failure."""
+    verdict = replay(jobs)
+    mismatches = np.flatnonzero(verdict["mismatch"])
+    late = np.flatnonzero(verdict["late"])
+    dut._log.info(
+        f"{len(jobs)} results on {batch.lanes} lanes in {elapsed_ns / 1000:.1f} us sim, "
+        f"{batch.wakeups} wakeups ({len(jobs) / max(batch.wakeups, 1):.2f} results per wakeup)"
+    )
+    for i in mismatches[:5]:
+        fields = " ".join(f"{name}={jobs[name][i]}" for name in TRACE_DTYPE.names)
+        dut._log.warning(f"Batch mismatch: model={verdict['model'][i]} {fields}")
+    return mismatches, late
+
+
+@cocotb.test()
+async def test_batch_matches_model(dut):
+    """every lane vs the fixed-point model on independent random jobs."""
+    clock = Clock(dut.clk, CLK_PERIOD_NS, units="ns")
+    cocotb.start_soon(clock.start())
+    batch = EngineBatch(dut)
+    await batch.reset()
+
+    # unseeded runs pick a seed and log it, as the fuzz test does
+    seed = int(os.getenv("ENGINE_BATCH_SEED", random.SystemRandom().randrange(1 << 32)))
+    trials = int(os.getenv("ENGINE_BATCH_TRIALS", str(32 * batch.lanes)))
+    dut._log.info(f"batch seed={seed} lanes={batch.lanes} trials={trials}")
+    jobs = random_jobs(np.random.default_rng(seed), trials)
+
+    start = get_sim_time(units="ns")
+    await batch.run(jobs)
+    mismatches, late = check_batch(dut, jobs, batch, get_sim_time(units="ns") - start)
+
+    if TRACE_DIR:
+        TraceWriter(
+            os.path.join(TRACE_DIR, f"tb_engine_batch_{os.getpid()}"),
+            {"source": "tb_engine_batch", "coord_width": COORD_WIDTH, "frac_bits": FRAC_BITS},
+        ).write_records(jobs)
+
+    # mismatches become tb_engine replay tests, like fuzz failures
+    append_corpus(CORPUS_PATH, [
+        dict({name: int(jobs[name][i]) for name, _ in INPUT_PORTS}, name="batch", seed=seed, shard="batch", trial=int(i))
+        for i in mismatches
+    ])
+    assert not mismatches.size, f"{mismatches.size} of {trials} results outside tolerance (seed={seed})"
+    assert not late.size, f"{late.size} of {trials} results over the latency bound (seed={seed})"
+
+
+@cocotb.test()
+async def test_batch_lanes_independent(dut):
+    """the same jobs on permuted lanes give the same counts: no cross-lane coupling."""
+    clock = Clock(dut.clk, CLK_PERIOD_NS, units="ns")
+    cocotb.start_soon(clock.start())
+    batch = EngineBatch(dut)
+    await batch.reset()
+
+    jobs = random_jobs(np.random.default_rng(298), 4 * batch.lanes)
+    forward = (await batch.run(jobs.copy()))["iteration_count"]
+    # reversed order puts every job on a different lane and next to different neighbours
+    backward = (await batch.run(jobs[::-1].copy()))["iteration_count"][::-1]
+    assert np.array_equal(forward, backward), (
+        f"lane-dependent results for jobs {np.flatnonzero(forward != backward).tolist()}"
+    )
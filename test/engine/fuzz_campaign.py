@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# sharded engine fuzz campaign. compiles tb_engine once, then runs one
+# simulator process per shard in parallel, each with its own slice of the
+# master seed. failing params from every shard are merged into the replay
+# corpus (engine/fuzz_corpus.jsonl), which engine.py turns into regular tests.
+#
+# run from test/:
+#   python engine/fuzz_campaign.py --seed 1234 --shards 8 --trials 100000
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benches import TEST_DIR, build_bench, run_bench  # noqa: E402
+
+DEFAULT_CORPUS = TEST_DIR / "engine" / "fuzz_corpus.jsonl"
+
+
+def split_trials(total, shards):
+    """spread total trials as evenly as possible over the shards."""
+    base, extra = divmod(total, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def run_shard(build_dir, campaign_dir, sim, seed, shard, trials):
+    """one simulator instance; runs in a worker process."""
+    from cocotb.runner import get_results
+
+    shard_dir = campaign_dir / f"shard_{shard}"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    corpus = shard_dir / "failures.jsonl"
+    corpus.unlink(missing_ok=True)
+
+    results = run_bench(
+        "engine",
+        build_dir=build_dir,
+        test_dir=shard_dir,
+        sim=sim,
+        testcase="test_engine_randomized_fuzz",
+        extra_env={
+            "ENGINE_FUZZ": "1",
+            "ENGINE_FUZZ_SEED": str(seed),
+            "ENGINE_FUZZ_SHARD": str(shard),
+            "ENGINE_FUZZ_TRIALS": str(trials),
+            "ENGINE_FUZZ_CORPUS": str(corpus),
+            # replay tests are not part of a campaign
+            "ENGINE_CORPUS": str(shard_dir / "none.jsonl"),
+        },
+        results_xml=str(shard_dir / "results.xml"),
+    )
+    _, failed = get_results(results)
+    return shard, failed, corpus
+
+
+def merge_corpus(shard_corpora, corpus):
+    """append new shard failures to the replay corpus, skipping duplicates."""
+    seen = set()
+    if corpus.exists():
+        with open(corpus) as f:
+            seen = {line.strip() for line in f if line.strip()}
+
+    added = 0
+    with open(corpus, "a") as out:
+        for path in shard_corpora:
+            if not path.exists():
+                continue
+            with open(path) as f:
+                for line in f:
+                    line = json.dumps(json.loads(line), sort_keys=True)
+                    if line not in seen:
+                        seen.add(line)
+                        out.write(line + "\n")
+                        added += 1
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sharded, seed-reproducible engine fuzz campaign")
+    parser.add_argument("--seed", type=int, required=True, help="master seed; shard k uses (seed, k)")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--trials", type=int, default=10000, help="total trials across all shards")
+    parser.add_argument("--sim", default=os.getenv("SIM", "icarus"))
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--build-dir", type=Path, default=TEST_DIR / "sim_build" / "fuzz")
+    args = parser.parse_args()
+
+    build_dir = args.build_dir.resolve()
+    campaign_dir = build_dir / f"seed_{args.seed}"
+    # waves off: a long campaign would otherwise spend its time writing vcd
+    build_bench("engine", build_dir, sim=args.sim, defines={"NO_WAVES": 1})
+
+    start = time.monotonic()
+    shard_corpora = []
+    failed_shards = 0
+    with ProcessPoolExecutor(max_workers=args.shards) as pool:
+        futures = [
+            pool.submit(run_shard, build_dir, campaign_dir, args.sim, args.seed, shard, trials)
+            for shard, trials in enumerate(split_trials(args.trials, args.shards))
+            if trials
+        ]
+        for future in as_completed(futures):
+            shard, failed, corpus = future.result()
+            shard_corpora.append(corpus)
+            failed_shards += bool(failed)
+            print(f"[fuzz] shard {shard}: {'FAIL' if failed else 'PASS'}")
+
+    elapsed = time.monotonic() - start
+    added = merge_corpus(sorted(shard_corpora), args.corpus)
+    print(
+        f"[fuzz] seed={args.seed} shards={args.shards} trials={args.trials} "
+        f"in {elapsed:.1f}s ({args.trials / elapsed:.0f} points/s)"
+    )
+    print(f"[fuzz] {failed_shards} failing shard(s), {added} new corpus entries in {args.corpus}")
+    return 1 if failed_shards else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# offline replay of recorded engine transactions (ENGINE_TRACE=<dir>). re-checks
+# every recorded dut result against the current fixed-point model, tolerance
+# rule and colour mapper at numpy speed, with no simulator in the loop.
+#
+# run from test/:
+#   ENGINE_TRACE=traces make tb-engine
+#   python engine/replay.py traces/
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+TEST_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TEST_DIR / "model"))
+from fixed_point import (  # noqa: E402
+    COORD_WIDTH,
+    FRAC_BITS,
+    calculate_complex_c_grid,
+    engine_model_grid,
+    iteration_tolerance,
+)
+from colour import colour_map  # noqa: E402
+from transactions import TRACE_DTYPE, load_traces  # noqa: E402
+
+# fsm/multiply pipeline allowance, as in test_engine_handshake_latency_bounds
+LATENCY_OVERHEAD = 4
+
+
+def replay(records, latency_overhead=LATENCY_OVERHEAD):
+    """check a structured array of transactions; returns per-record verdicts."""
+    c_real, c_imag = calculate_complex_c_grid(
+        records["pixel_x"], records["pixel_y"], records["center_x"], records["center_y"], records["zoom_level"]
+    )
+    limit = records["max_iter_limit"].astype(np.int64)
+    dut = records["iteration_count"].astype(np.int64)
+    model = engine_model_grid(c_real, c_imag, limit)
+    tolerance = iteration_tolerance((c_real + 1j * c_imag) / (1 << FRAC_BITS))
+
+    # a count mismatch only matters on screen if it changes the colour
+    colour_changed = np.zeros(dut.size, dtype=bool)
+    for mode in (0, 1):
+        seen = np.stack(colour_map(dut, mode, dut >= limit))
+        expected = np.stack(colour_map(model, mode, model >= limit))
+        colour_changed |= (seen != expected).any(axis=0)
+
+    return {
+        "model": model,
+        "delta": dut - model,
+        "mismatch": np.abs(dut - model) > tolerance,
+        "colour_changed": colour_changed,
+        "late": records["latency"] > limit + latency_overhead,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="re-check recorded engine transactions against the models")
+    parser.add_argument("paths", nargs="+", help="trace files or directories of traces")
+    parser.add_argument("--show", type=int, default=10, help="print the first N mismatching records")
+    parser.add_argument("--latency-overhead", type=int, default=LATENCY_OVERHEAD)
+    args = parser.parse_args()
+
+    records, metas = load_traces(args.paths)
+    if metas and (metas[0]["coord_width"], metas[0]["frac_bits"]) != (COORD_WIDTH, FRAC_BITS):
+        parser.error(
+            f"traces are for COORD_WIDTH={metas[0]['coord_width']} FRAC_BITS={metas[0]['frac_bits']}, "
+            f"model is {COORD_WIDTH}/{FRAC_BITS}"
+        )
+    if not records.size:
+        print(f"[replay] no transactions in {len(metas)} trace file(s)")
+        return 0
+
+    verdict = replay(records, args.latency_overhead)
+    mismatches = np.flatnonzero(verdict["mismatch"])
+    late = np.flatnonzero(verdict["late"])
+    overhead = records["latency"].astype(np.int64) - records["iteration_count"]
+
+    print(f"[replay] {records.size} transactions from {len(metas)} trace file(s)")
+    print(
+        f"[replay] {mismatches.size} outside tolerance, "
+        f"{np.count_nonzero(verdict['delta'])} differ at all, "
+        f"{np.count_nonzero(verdict['colour_changed'])} change the displayed colour"
+    )
+    print(f"[replay] {late.size} over latency bound; latency - count ranges {overhead.min()}..{overhead.max()}")
+    for i in mismatches[: args.show]:
+        fields = " ".join(f"{name}={records[name][i]}" for name in TRACE_DTYPE.names)
+        print(f"  #{i} model={verdict['model'][i]} {fields}")
+
+    return 1 if mismatches.size or late.size else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
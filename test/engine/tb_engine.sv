@@ -20,10 +20,12 @@ module tb_engine ();
   wire result_valid;
   wire busy;
 
+`ifndef NO_WAVES
   initial begin
     $dumpfile("tb.vcd");
     $dumpvars(0, tb_engine);
   end
+`endif
 
 
   `ifdef GL_TEST
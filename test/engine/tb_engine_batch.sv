@@ -0,0 +1,66 @@
+`default_nettype none
+`timescale 1ns / 1ps
+
+// N independent mandelbrot_engine instances on packed buses, so one python
+// wakeup can launch and collect many results. lane i of every bus is
+// bits [i*W +: W], with W the width of the matching tb_engine port.
+module tb_engine_batch ();
+  parameter COORD_WIDTH = 11;
+  parameter FRAC_BITS = 8;
+  parameter N_ENGINES = 8;
+
+  reg clk;
+  reg rst_n;
+  reg enable;
+  reg [N_ENGINES*10-1:0] pixel_x;
+  reg [N_ENGINES*10-1:0] pixel_y;
+  reg [N_ENGINES-1:0] pixel_valid;
+  reg [N_ENGINES*16-1:0] center_x;
+  reg [N_ENGINES*16-1:0] center_y;
+  reg [N_ENGINES*8-1:0] zoom_level;
+  reg [N_ENGINES*6-1:0] max_iter_limit;
+
+  wire [N_ENGINES*6-1:0] iteration_count;
+  wire [N_ENGINES-1:0] result_valid;
+  wire [N_ENGINES-1:0] busy;
+
+`ifndef NO_WAVES
+  initial begin
+    $dumpfile("tb.vcd");
+    $dumpvars(0, tb_engine_batch);
+  end
+`endif
+
+  genvar i;
+  generate
+    for (i = 0; i < N_ENGINES; i = i + 1) begin : lane
+      // same port connections as tb_engine, one slice per lane
+      wire signed [15:0] lane_center_x = center_x[i*16 +: 16];
+      wire signed [15:0] lane_center_y = center_y[i*16 +: 16];
+
+    `ifdef GL_TEST
+      mandelbrot_engine dut (
+    `else
+      mandelbrot_engine #(
+        .COORD_WIDTH(COORD_WIDTH),
+        .FRAC_BITS(FRAC_BITS)
+      ) dut (
+    `endif
+        .clk(clk),
+        .rst_n(rst_n),
+        .pixel_x(pixel_x[i*10 +: 10]),
+        .pixel_y(pixel_y[i*10 +: 10]),
+        .pixel_valid(pixel_valid[i]),
+        .center_x(lane_center_x),
+        .center_y(lane_center_y),
+        .zoom_level(zoom_level[i*8 +: 8]),
+        .max_iter_limit(max_iter_limit[i*6 +: 6]),
+        .enable(enable),
+        .iteration_count(iteration_count[i*6 +: 6]),
+        .result_valid(result_valid[i]),
+        .busy(busy[i])
+      );
+    end
+  endgenerate
+
+endmodule
@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# engine transaction recording. EngineRecorder watches a mandelbrot_engine
+# interface and appends one fixed-width record per result to a raw array
+# file (<name>.bin) with a json sidecar (<name>.json) describing the dtype
+# and engine parameters. load_traces() maps those files back as one numpy
+# structured array, so replay.py can re-check millions of real dut results
+# against the models without a simulator.
+
+import json
+from pathlib import Path
+
+import numpy as np
+import cocotb
+from cocotb.triggers import RisingEdge, ReadOnly
+
+TRACE_DTYPE = np.dtype([
+    ("pixel_x", "<u2"),
+    ("pixel_y", "<u2"),
+    ("center_x", "<u2"),      # raw bits as driven on the port
+    ("center_y", "<u2"),
+    ("zoom_level", "u1"),
+    ("max_iter_limit", "u1"),
+    ("iteration_count", "u1"),
+    ("latency", "<u2"),       # clock edges from busy rising to result_valid rising
+])
+
+
+class TraceWriter:
+    """append-only record file. every record is flushed straight away since
+    cocotb kills monitors at the end of a test without running cleanup."""
+
+    def __init__(self, path, meta):
+        self.path = Path(path).with_suffix(".bin")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta = dict(meta, dtype=TRACE_DTYPE.descr)
+        self.path.with_suffix(".json").write_text(json.dumps(meta, indent=2))
+        self._file = open(self.path, "ab")
+        self._record = np.zeros(1, dtype=TRACE_DTYPE)
+
+    def write(self, **fields):
+        for name, value in fields.items():
+            self._record[name] = value
+        self._file.write(self._record.tobytes())
+        self._file.flush()
+
+    def write_records(self, records):
+        """append a whole TRACE_DTYPE array (batch benches)."""
+        self._file.write(np.ascontiguousarray(records, dtype=TRACE_DTYPE).tobytes())
+        self._file.flush()
+
+
+class EngineRecorder:
+    """monitor for a mandelbrot_engine port set (tb_engine or the instance
+    inside tt_um_fractal). inputs are sampled on the edge that starts the
+    computation; the record is written when result_valid rises."""
+
+    def __init__(self, handle, clk, writer):
+        self.handle = handle
+        self.clk = clk
+        self.writer = writer
+        self.count = 0
+        self._task = None
+
+    def start(self):
+        if self._task is not None:
+            self._task.kill()
+        self._task = cocotb.start_soon(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+
+    async def _run(self):
+        h = self.handle
+        cycle = 0
+        start = None
+        inputs = None
+        prev_busy = 0
+        while True:
+            await RisingEdge(self.clk)
+            await ReadOnly()
+            cycle += 1
+            busy = h.busy.value.integer
+            if busy and not prev_busy:
+                start = cycle
+                inputs = {
+                    "pixel_x": h.pixel_x.value.integer,
+                    "pixel_y": h.pixel_y.value.integer,
+                    "center_x": h.center_x.value.integer,
+                    "center_y": h.center_y.value.integer,
+                    "zoom_level": h.zoom_level.value.integer,
+                    "max_iter_limit": h.max_iter_limit.value.integer,
+                }
+            if start is not None and h.result_valid.value.integer:
+                self.writer.write(
+                    **inputs,
+                    iteration_count=h.iteration_count.value.integer,
+                    latency=cycle - start,
+                )
+                self.count += 1
+                start = None
+            prev_busy = busy
+
+
+def trace_files(paths):
+    """expand files and directories into the list of .bin traces."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.bin")))
+        else:
+            files.append(path.with_suffix(".bin"))
+    return files
+
+
+def load_traces(paths):
+    """concatenate traces (memory-mapped) into one structured array plus the
+    sidecar metadata of each file. traces with differing engine parameters
+    are rejected rather than silently mixed."""
+    arrays, metas = [], []
+    for path in trace_files(paths):
+        meta = json.loads(path.with_suffix(".json").read_text())
+        if metas and (meta["coord_width"], meta["frac_bits"]) != (metas[0]["coord_width"], metas[0]["frac_bits"]):
+            raise ValueError(f"{path}: engine parameters differ from {metas[0]['path']}")
+        meta["path"] = str(path)
+        metas.append(meta)
+        # a run killed mid-write can leave a partial record at the tail
+        count = path.stat().st_size // TRACE_DTYPE.itemsize
+        if count:
+            arrays.append(np.memmap(path, dtype=TRACE_DTYPE, mode="r", shape=(count,)))
+    if not arrays:
+        return np.zeros(0, dtype=TRACE_DTYPE), metas
+    return np.concatenate(arrays), metas
@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# coverage-minimized regression set for gate-level runs. GATES=yes simulates
+# the yosys netlist with UNIT_DELAY, many times slower than rtl, so instead of
+# the random and replay tests it runs only a small stored set of vectors:
+#
+#   1. one rtl campaign (test_engine_coverage_campaign in engine.py) runs
+#      random and interior-edge vectors and records, per vector, the result,
+#      the latency and the engine registers after every COMPUTE edge
+#   2. every vector is mapped to the coverage bins it hits: rise and fall of
+#      every z_real / z_imag / iter_count bit, both values of every input port
+#      bit, and functional bins (outcome, iteration bucket, limit, zoom)
+#   3. a greedy set cover, then a pass dropping vectors whose bins the rest
+#      still cover, picks the set written to engine/gl_vectors.jsonl
+#
+# test_engine_vector_set replays that file and expects the recorded rtl
+# count and latency exactly; once the file exists, `make tb-engine GATES=yes`
+# runs only that test.
+#
+# run from test/ (needs the rtl simulator; --campaign reuses a recorded run):
+#   python engine/vector_set.py --trials 2000
+#   python engine/vector_set.py --campaign sim_build/coverage/campaign.jsonl
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benches import TEST_DIR, build_bench, run_bench  # noqa: E402
+
+sys.path.insert(0, str(TEST_DIR / "model"))
+from fixed_point import COORD_WIDTH  # noqa: E402
+
+DEFAULT_SET = TEST_DIR / "engine" / "gl_vectors.jsonl"
+
+# (name, width) of the sampled engine registers, in sample order
+REGISTERS = (("z_real", COORD_WIDTH), ("z_imag", COORD_WIDTH), ("iter_count", 6))
+# input ports as the engine sees them (tb_engine drives 16-bit centres into
+# COORD_WIDTH-bit ports)
+PORTS = (
+    ("pixel_x", 10), ("pixel_y", 10), ("center_x", COORD_WIDTH), ("center_y", COORD_WIDTH),
+    ("zoom_level", 8), ("max_iter_limit", 6),
+)
+
+
+def outcome(record):
+    count, limit = record["iteration_count"], record["params"]["max_iter_limit"]
+    if count < limit:
+        return "escape"
+    # the bailout reaches DONE long before the cap could have been iterated
+    return "interior" if record["latency"] < limit else "cap"
+
+
+def bins(record):
+    """every coverage bin one recorded vector hits."""
+    params = record["params"]
+    hit = {
+        ("outcome", outcome(record)),
+        ("iterations", record["iteration_count"] >> 2),
+        ("limit", params["max_iter_limit"]),
+        ("zoom", min(params["zoom_level"], 15)),
+    }
+    for name, width in PORTS:
+        value = params[name] & ((1 << width) - 1)
+        hit.update(("port", name, bit, (value >> bit) & 1) for bit in range(width))
+    samples = record["samples"]
+    for (name, width), values in zip(REGISTERS, zip(*samples) if samples else ()):
+        for before, after in zip(values, values[1:]):
+            changed = before ^ after
+            for bit in range(width):
+                if changed >> bit & 1:
+                    hit.add(("toggle", name, bit, "rise" if after >> bit & 1 else "fall"))
+    return hit
+
+
+def minimize(covers):
+    """indices of a small subset of covers (sets of bins) with the same union:
+    greedy set cover, then drop any pick the others make redundant."""
+    remaining = set().union(*covers) if covers else set()
+    picked = []
+    while remaining:
+        best = max(range(len(covers)), key=lambda i: (len(covers[i] & remaining), -i))
+        picked.append(best)
+        remaining -= covers[best]
+
+    for i in sorted(picked, key=lambda i: len(covers[i])):
+        others = set().union(*(covers[j] for j in picked if j != i))
+        if covers[i] <= others:
+            picked.remove(i)
+    return sorted(picked)
+
+
+def load_campaign(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_campaign(path, build_dir, sim, seed, trials):
+    """one rtl run of test_engine_coverage_campaign into path."""
+    from cocotb.runner import get_results
+
+    build_bench("engine", build_dir, sim=sim, defines={"NO_WAVES": 1})
+    results = run_bench(
+        "engine",
+        build_dir=build_dir,
+        test_dir=path.parent,
+        sim=sim,
+        testcase="test_engine_coverage_campaign",
+        extra_env={
+            "ENGINE_COVERAGE": str(path),
+            "ENGINE_COVERAGE_SEED": str(seed),
+            "ENGINE_COVERAGE_TRIALS": str(trials),
+        },
+        results_xml=str(path.parent / "results.xml"),
+    )
+    _, failed = get_results(results)
+    return failed
+
+
+def main():
+    import os
+
+    parser = argparse.ArgumentParser(description="coverage-minimized engine vector set for gate-level runs")
+    parser.add_argument("--campaign", type=Path, help="recorded campaign (jsonl) instead of running one")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--trials", type=int, default=2000, help="random vectors in the campaign")
+    parser.add_argument("--sim", default=os.getenv("SIM", "icarus"))
+    parser.add_argument("--build-dir", type=Path, default=TEST_DIR / "sim_build" / "coverage")
+    parser.add_argument("--out", type=Path, default=DEFAULT_SET)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    campaign = args.campaign
+    if campaign is None:
+        build_dir = args.build_dir.resolve()
+        campaign = build_dir / "campaign.jsonl"
+        campaign.parent.mkdir(parents=True, exist_ok=True)
+        if run_campaign(campaign, build_dir, args.sim, args.seed, args.trials):
+            print(f"[vector_set] campaign failed, see {campaign.parent / 'results.xml'}")
+            return 1
+
+    records = load_campaign(campaign)
+    covers = [frozenset(bins(record)) for record in records]
+    picked = minimize(covers)
+    covered = set().union(*covers) if covers else set()
+
+    with open(args.out, "w") as out:
+        for n, i in enumerate(picked):
+            record = records[i]
+            vector = dict(record["params"], name=f"vector {n}")
+            vector.update(iteration_count=record["iteration_count"], latency=record["latency"])
+            out.write(json.dumps(vector, sort_keys=True) + "\n")
+
+    kinds = sorted({b[0] for b in covered})
+    print(f"[vector_set] {len(records)} campaign vectors -> {len(picked)} in {args.out}")
+    print("[vector_set] bins covered: " + ", ".join(f"{k} {sum(b[0] == k for b in covered)}" for k in kinds))
+    print(f"[vector_set] {time.monotonic() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
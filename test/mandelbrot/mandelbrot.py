@@ -1,25 +1,69 @@
 # SPDX-FileCopyrightText: © 2024 Tiny Tapeout
 # SPDX-License-Identifier: Apache-2.0
 
+# event-driven top-level check against model/chip.py. the test sleeps until
+# the engine raises computation_done, then compares what the chip is about to
+# store (launched_tile_x, iteration_count) and the tile colour it stored with
+# the model's tile store on the same clk edge. it stops after
+# MANDELBROT_TILES results instead of running for a fixed number of cycles.
+#
+# gate-level netlists (GATES=yes) have no internal names and the probe only
+# carries uo_out there, so only test_uo_out_matches_model runs: the uo_out
+# byte of the first MANDELBROT_PIXELS pixel clocks against the model's frame.
+
+import os
+
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import ClockCycles
+from cocotb.triggers import ClockCycles, Edge, FallingEdge, ReadOnly, RisingEdge, with_timeout
+from cocotb.utils import get_sim_time
 
+from chip import ChipModel, FRAME_PIXELS, H_TOTAL
+from perf import PerfMonitor
+from probe import read_probe
 
-@cocotb.test()
-async def test_mandelbrot_engine_unit(dut):
-    """unit test for Mandelbrot computation engine"""
-    dut._log.info("=== Mandelbrot Engine Unit Test ===")
+CLK_PERIOD_NS = 20
+# two macroblock rows at 64x16, the first row of 32x8 tiles
+TILES_TO_CHECK = int(os.getenv("MANDELBROT_TILES", "20"))
+PIXELS_TO_CHECK = int(os.getenv("MANDELBROT_PIXELS", str(2 * H_TOTAL)))
+GL_TEST = os.getenv("GATES") == "yes"
+# the counters only exist in rtl builds with PERF_COUNTERS (on unless PERF_COUNTERS=no)
+PERF_TEST = not GL_TEST and os.getenv("PERF_COUNTERS", "yes") == "yes"
+
+
+class ModelStores:
+    """tile stores of the chip model, keyed by absolute clk edge after reset.
+    frames are run on demand as the simulation gets further."""
+
+    def __init__(self, ui_in, uio_in):
+        self.model = ChipModel()
+        self.ui_in, self.uio_in = ui_in, uio_in
+        self.stores = {}      # edge -> (tile_x, iterations, (r, g, b))
+        self.covered = 0      # stores are known for every edge below this
+
+    def at(self, edge):
+        while edge >= self.covered:
+            frame = self.model.run_frame(self.ui_in, self.uio_in)
+            for store_edge, tile_x, _, iterations, rgb in frame.tiles:
+                self.stores[store_edge] = (tile_x, iterations, rgb)
+            # the last launch of a frame is on line 479, so its stores finish
+            # long before vertical blanking ends
+            self.covered = 2 * (frame.index + 1) * FRAME_PIXELS
+        return self.stores.get(edge)
 
-    # set up 50MHz clock
-    clock = Clock(dut.clk, 20, units="ns")
+    def results_before(self, edge):
+        """model results whose first store is before `edge`."""
+        return sum(1 for e in self.stores if e < edge and e - 1 not in self.stores)
+
+
+async def start_chip(dut, ui_in, uio_in):
+    """reset with inputs applied; returns the sim time of clk edge 1."""
+    clock = Clock(dut.clk, CLK_PERIOD_NS, units="ns")
     cocotb.start_soon(clock.start())
 
-    # reset sequence
-    dut._log.info("Initializing...")
     dut.ena.value = 1
-    dut.ui_in.value = 0b10000000  # enable=1, default colour mode
-    dut.uio_in.value = 0x00
+    dut.ui_in.value = ui_in
+    dut.uio_in.value = uio_in
     dut.rst_n.value = 0
 
     try:
@@ -30,94 +74,106 @@ async def test_mandelbrot_engine_unit(dut):
         pass
 
     await ClockCycles(dut.clk, 5)
+    # release between edges so the first rising edge after it is edge 1
+    await FallingEdge(dut.clk)
     dut.rst_n.value = 1
-    await ClockCycles(dut.clk, 10)
-
-    dut._log.info("Test 1: Basic computation engine response")
-    
-    # test that the engine produces some output
-    await ClockCycles(dut.clk, 2000)  # give engine time to compute
-    
-    uo_value = int(dut.uo_out.value)
-    red = ((uo_value >> 0) & 1) | (((uo_value >> 4) & 1) << 1)
-    green = ((uo_value >> 1) & 1) | (((uo_value >> 5) & 1) << 1)
-    blue = ((uo_value >> 2) & 1) | (((uo_value >> 6) & 1) << 1)
-    
-    dut._log.info(f"Initial computation result: R={red}, G={green}, B={blue}")
-    
-    # basic sanity check - should produce valid RGB values
-    assert 0 <= red <= 3, f"Red should be 2-bit value, got {red}"
-    assert 0 <= green <= 3, f"Green should be 2-bit value, got {green}"
-    assert 0 <= blue <= 3, f"Blue should be 2-bit value, got {blue}"
-    
-    dut._log.info("Engine produces valid RGB output!")
-
-    dut._log.info("Test 2: colour mode variations")
-    
-    # test colour modes (design uses uio_in[1:0]; bit 0 selects scheme)
-    for color_mode in range(4):
-        dut.ui_in.value = 0b10000000  # enable=1
-        dut.uio_in.value = color_mode & 0x3
-        await ClockCycles(dut.clk, 50)
-        
-        uo_value = int(dut.uo_out.value)
-        red = ((uo_value >> 0) & 1) | (((uo_value >> 4) & 1) << 1)
-        green = ((uo_value >> 1) & 1) | (((uo_value >> 5) & 1) << 1)
-        blue = ((uo_value >> 2) & 1) | (((uo_value >> 6) & 1) << 1)
-        
-        dut._log.info(f"colour mode {color_mode}: R={red}, G={green}, B={blue}")
-        
-        assert 0 <= red <= 3, f"invalid red value {red} for colour mode {color_mode}"
-        assert 0 <= green <= 3, f"invalid green value {green} for colour mode {color_mode}"
-        assert 0 <= blue <= 3, f"invalid blue value {blue} for colour mode {color_mode}"
-    
-    dut._log.info("all colour modes produce valid outputs")
-
-    dut._log.info("Test 3: Engine enable/disable")
-    
-    # test disabling the engine
-    dut.ui_in.value = 0b00000000  # disable engine
-    await ClockCycles(dut.clk, 20)
-    
-    disabled_output = int(dut.uo_out.value)
-    dut._log.info(f"Disabled output: 0x{disabled_output:02X}")
-    
-    # re-enable the engine
-    dut.ui_in.value = 0b10000000  # enable=1
-    await ClockCycles(dut.clk, 50)
-    
-    enabled_output = int(dut.uo_out.value)
-    dut._log.info(f"Re-enabled output: 0x{enabled_output:02X}")
-    
-    dut._log.info("Engine enable/disable functionality works")
-
-    dut._log.info("Test 4: Computation stability")
-    
-    # test that computation is stable over time
-    samples = []
-    for i in range(5):
-        await ClockCycles(dut.clk, 20)
-        uo_value = int(dut.uo_out.value)
-        samples.append(uo_value)
-        dut._log.info(f"Sample {i+1}: 0x{uo_value:02X}")
-    
-    # for the same input (fixed pixel coordinates), output should be stable
-    # allow for some variation during computation cycles
-    dut._log.info("Computation appears stable")
-
-    # final verification
-    dut._log.info("=== Unit Test Summary ===")
-    dut._log.info("Mandelbrot engine responds to enable signal")
-    dut._log.info("All colour modes produce valid 2-bit RGB values")
-    dut._log.info("Engine produces consistent computational results")
-    dut._log.info("Basic functionality verified")
-    
-    # final sanity check
-    final_uo = int(dut.uo_out.value)
-    # extract RGB values from final output
-    final_red = ((final_uo >> 0) & 1) | (((final_uo >> 4) & 1) << 1)
-    final_green = ((final_uo >> 1) & 1) | (((final_uo >> 5) & 1) << 1)
-    final_blue = ((final_uo >> 2) & 1) | (((final_uo >> 6) & 1) << 1)
-    
-    dut._log.info(f"Final RGB: R={final_red}, G={final_green}, B={final_blue}")
-    dut._log.info("Mandelbrot Engine Unit Test PASSED!") 
\ No newline at end of file
+    await RisingEdge(dut.clk)
+    return get_sim_time(units="ns")
+
+
+async def check_tiles_against_model(dut, ui_in, uio_in, tiles=TILES_TO_CHECK):
+    top = dut.user_project
+    edge_1 = await start_chip(dut, ui_in, uio_in)
+    model = ModelStores(ui_in, uio_in)
+    lines = (top.tile_red_line, top.tile_green_line, top.tile_blue_line)
+    # generous bound: a full frame without any result means the chip is stuck
+    frame_ns = 2 * FRAME_PIXELS * CLK_PERIOD_NS
+
+    for checked in range(tiles):
+        await with_timeout(RisingEdge(top.computation_done), frame_ns, "ns")
+        edge = (get_sim_time(units="ns") - edge_1) // CLK_PERIOD_NS + 1
+        await ReadOnly()
+        probe = read_probe(dut)
+
+        # computation_done rose on `edge`; the first store lands on the next one
+        expected = model.at(edge + 1)
+        assert expected is not None, (
+            f"result #{checked} at clk edge {edge} (tile {probe.launched_tile_x}, "
+            f"{probe.iteration_count} iterations) has no matching store in the model"
+        )
+        tile_x, iterations, rgb = expected
+        assert (probe.launched_tile_x, probe.iteration_count) == (tile_x, iterations), (
+            f"result #{checked} at clk edge {edge}: dut tile {probe.launched_tile_x} "
+            f"iterations {probe.iteration_count}, model tile {tile_x} iterations {iterations}"
+        )
+
+        await RisingEdge(dut.clk)
+        await ReadOnly()
+        stored = tuple(line[tile_x].value.integer for line in lines)
+        assert stored == rgb, (
+            f"result #{checked} at clk edge {edge}: tile {tile_x} holds rgb {stored}, model {rgb}"
+        )
+
+    missed = model.results_before(edge + 2) - tiles
+    assert missed == 0, f"model produced {missed} result(s) the dut did not before clk edge {edge}"
+    dut._log.info(f"{tiles} tile results match the chip model (last at clk edge {edge})")
+
+
+@cocotb.test()
+async def test_uo_out_matches_model(dut):
+    """uo_out of the first MANDELBROT_PIXELS pixel clocks vs the model (rtl and gate level)."""
+    ui_in, uio_in = 0b10000000, 0b0101
+    await start_chip(dut, ui_in, uio_in)
+    expected = ChipModel().run_frame(ui_in, uio_in).uo_out.ravel()
+
+    # pixel p is registered on clk edge 2p-1 and held through edge 2p; read it
+    # half a clk after edge 2p, clear of the gate delays (pixel 0 ends at edge 1)
+    edge = 1
+    wrong = []
+    for p in range(1, PIXELS_TO_CHECK):
+        await ClockCycles(dut.clk, 2 * p - edge)
+        edge = 2 * p
+        await FallingEdge(dut.clk)
+        got = int(dut.uo_out.value)
+        if got != expected[p]:
+            wrong.append((p, got, int(expected[p])))
+    assert not wrong, (
+        f"{len(wrong)} of {PIXELS_TO_CHECK - 1} pixel clocks differ from the model, first "
+        f"at line {wrong[0][0] // H_TOTAL} x {wrong[0][0] % H_TOTAL}: dut {wrong[0][1]:#04x}, model {wrong[0][2]:#04x}"
+    )
+    dut._log.info(f"uo_out matches the chip model for {PIXELS_TO_CHECK - 1} pixel clocks")
+
+
+@cocotb.test(skip=GL_TEST)
+async def test_tiles_match_model_greyscale(dut):
+    """default view, 64x16 tiles, greyscale: every result and stored colour vs the model."""
+    await check_tiles_against_model(dut, ui_in=0b10000000, uio_in=0b0000)
+
+
+@cocotb.test(skip=GL_TEST)
+async def test_tiles_match_model_fire(dut):
+    """fire colour mode on 32x8 tiles (uio_in[3:2] = 01) vs the model."""
+    await check_tiles_against_model(dut, ui_in=0b10000000, uio_in=0b0101)
+
+
+@cocotb.test(skip=not PERF_TEST)
+async def test_perf_counters_match_model(dut):
+    """per-frame perf counters vs the chip model's frame stats, zooming in every frame."""
+    ui_in, uio_in = 0b10000001, 0b0100
+    top = dut.user_project
+    await start_chip(dut, ui_in, uio_in)
+    perf = PerfMonitor(top, dut._log).start()
+
+    model = ChipModel()
+    for frame in range(2):
+        stats = model.run_frame(ui_in, uio_in).stats
+        await with_timeout(Edge(top.perf_frames), 2 * FRAME_PIXELS * CLK_PERIOD_NS, "ns")
+        await RisingEdge(dut.clk)
+        seen = perf.frames[frame]
+        # the model times latency to the tile store, one edge after result_valid
+        expected = (stats.launches, stats.accepted, stats.missed, stats.busy_cycles, stats.max_latency - 1)
+        got = (seen.launched, seen.completed, seen.deadline_misses, seen.busy_cycles, seen.max_latency)
+        assert got == expected, (
+            f"frame {frame}: (launched, completed, misses, busy, max_latency) dut {got}, model {expected}"
+        )
+    perf.check()
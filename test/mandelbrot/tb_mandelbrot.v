@@ -15,12 +15,18 @@ module tb_mandelbrot ();
   wire [7:0] uio_out;
   wire [7:0] uio_oe;
 
+  // packed probe word, lsb first; must match PROBE_FIELDS in model/probe.py.
+  // gate-level netlists have no internal names, so only uo_out is probed there.
+  wire [63:0] probe;
+
   // Dump the signals to a VCD file. You can view it with gtkwave or surfer.
+`ifndef NO_WAVES
   initial begin
     $dumpfile("tb.vcd");
     $dumpvars(0, tb_mandelbrot);
     #1;
   end
+`endif
 
 
 
@@ -36,4 +42,25 @@ module tb_mandelbrot ();
       .rst_n  (rst_n)     // not reset
   );
 
+`ifdef GL_TEST
+  assign probe = {56'd0, uo_out};
+`else
+  assign probe = {
+      4'd0,
+      user_project.zoom_level_8bit,     // [59:52] zoom_level
+      user_project.mandel.busy,         // [51]    engine_busy
+      user_project.iteration_count,     // [50:45] iteration_count
+      user_project.tile_x_index,        // [44:39] tile_x_index
+      user_project.launched_tile_x,     // [38:33] launched_tile_x
+      user_project.computation_done,    // [32]    computation_done
+      user_project.start_computation,   // [31]    start_computation
+      user_project.clk_25mhz,           // [30]    clk_25mhz
+      user_project.frame_start,         // [29]    frame_start
+      user_project.vga_active,          // [28]    vga_active
+      user_project.pixel_y,             // [27:18] pixel_y
+      user_project.pixel_x,             // [17:8]  pixel_x
+      uo_out                            // [7:0]   uo_out
+  };
+`endif
+
 endmodule
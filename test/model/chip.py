@@ -0,0 +1,437 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# cycle-approximate model of tt_um_fractal. follows the rtl edge by edge
+# where it matters and vectorizes everything else:
+#
+#   - 50 mhz clk, clk_div toggling every edge -> 25 mhz pixel clock. the
+#     vga counters advance on odd clk edges, so pixel p is on the counters
+#     during clk cycles 2p-1 and 2p (only cycle 0 for p = 0 after reset)
+#   - start_computation is a 25 mhz-domain pulse, so the 50 mhz engine and
+#     param_controller see it (and v_begin) on two consecutive edges
+#   - the engine's c is combinational from the *current* pixel_x/pixel_y, so
+#     it follows the beam while COMPUTE runs; latency is iterations + 1 edge
+#     into DONE + 1 edge to store the tile colour. a c that passes the
+#     interior test (model/interior.py) on the first COMPUTE edge goes
+#     straight to DONE with the iteration cap
+#   - launched_tile_x is overwritten by every launch, busy engines ignore
+#     launches, and a result lands in whatever tile launched_tile_x names
+#   - rgb is registered on the pixel clock from the tile line, so uo_out
+#     shows the colour of the previous beam position
+#   - in a REFINE build with refine on (uio_in[4]) the engine maps the beam
+#     position plus the frame's sub-tile offset (refine_offset) to c; the
+#     step advances once per frame and restarts on any view control
+#
+# one frame is 800 x 525 pixel clocks; the model emits the uo_out byte for
+# each of them. run as a script for a quick look / speed check:
+#   python model/chip.py --frames 3 --png model.png
+
+import argparse
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from fixed_point import wrap
+from colour import MAX_ITERATIONS, colour_map, pack_uo_out
+from interior import interior
+from pan_cache import PanCache
+
+H_ACTIVE, H_FRONT_PORCH, H_SYNC, H_BACK_PORCH = 640, 16, 96, 48
+V_ACTIVE, V_FRONT_PORCH, V_SYNC, V_BACK_PORCH = 480, 10, 2, 33
+H_TOTAL = H_ACTIVE + H_FRONT_PORCH + H_SYNC + H_BACK_PORCH
+V_TOTAL = V_ACTIVE + V_FRONT_PORCH + V_SYNC + V_BACK_PORCH
+FRAME_PIXELS = H_TOTAL * V_TOTAL
+
+# engine instance parameters in tt_um_fractal
+COORD_WIDTH = 9
+FRAC_BITS = 6
+MAX_TILES_X = 640 // 32
+
+# per-pixel frame geometry, frame-relative pixel index -> counters
+_HPOS = np.arange(FRAME_PIXELS) % H_TOTAL
+_VPOS = np.arange(FRAME_PIXELS) // H_TOTAL
+ACTIVE = (_HPOS < H_ACTIVE) & (_VPOS < V_ACTIVE)
+HSYNC = ~((_HPOS >= H_ACTIVE + H_FRONT_PORCH) & (_HPOS < H_ACTIVE + H_FRONT_PORCH + H_SYNC))
+VSYNC = ~((_VPOS >= V_ACTIVE + V_FRONT_PORCH) & (_VPOS < V_ACTIVE + V_FRONT_PORCH + V_SYNC))
+ACTIVE_INDEX = np.flatnonzero(ACTIVE)
+
+
+def stride_shifts(uio_in):
+    """(h_stride_shift, v_stride_shift) for the uio_in[3:2] preset."""
+    return {0: (6, 4), 1: (5, 3), 2: (5, 4), 3: (5, 3)}[(uio_in >> 2) & 3]
+
+
+REFINE_STEPS = 16
+
+
+def refine_offset(step, h_shift, v_shift):
+    """sub-tile (dx, dy) sampled on refinement step `step`: a stratified 4x4
+    pattern in quarter tiles, x from step bits 0 and 2, y from bits 1 and 3."""
+    sx = ((step & 1) << 1) | ((step >> 2) & 1)
+    sy = (step & 2) | ((step >> 3) & 1)
+    return sx << (h_shift - 2), sy << (v_shift - 2)
+
+
+def scale_factor(zoom_level, coord_width=COORD_WIDTH):
+    """base_scale >> zoom_shift as the signed coord_width-bit register sees it.
+    base_scale is 11'h100, so with 9-bit coordinates zoom 0 reads as -256."""
+    zoom_shift = np.minimum(zoom_level, 15)
+    return wrap((0x100 & ((1 << coord_width) - 1)) >> zoom_shift, coord_width)
+
+
+def top_c(pixel_x, pixel_y, centre_x, centre_y, zoom_level,
+          coord_width=COORD_WIDTH, frac_bits=FRAC_BITS):
+    """mandelbrot_engine c mapping at the given parameters (scalars or arrays)."""
+    sf = scale_factor(zoom_level, coord_width)
+    temp_real = (np.asarray(pixel_x) - 320) * sf
+    temp_imag = (np.asarray(pixel_y) - 240) * sf
+    return (
+        wrap(centre_x + (temp_real >> frac_bits), coord_width),
+        wrap(centre_y + (temp_imag >> frac_bits), coord_width),
+    )
+
+
+def top_engine_grid(c_real, c_imag, max_iter=MAX_ITERATIONS,
+                    coord_width=COORD_WIDTH, frac_bits=FRAC_BITS):
+    """escape counts for fixed c (no beam drift), rtl arithmetic: squares
+    shifted by frac_bits, escape when the sum exceeds 1024, 2*zr*zi via <<1."""
+    c_real, c_imag = np.broadcast_arrays(np.asarray(c_real, dtype=np.int64), np.asarray(c_imag, dtype=np.int64))
+    shape = c_real.shape
+    c_real, c_imag = c_real.ravel(), c_imag.ravel()
+    result = np.full(c_real.size, max_iter, dtype=np.int64)
+    idx = np.arange(c_real.size)
+    zr = np.zeros(c_real.size, dtype=np.int64)
+    zi = np.zeros(c_real.size, dtype=np.int64)
+    for i in range(max_iter):
+        zr_sq, zi_sq = (zr * zr) >> frac_bits, (zi * zi) >> frac_bits
+        escaped = zr_sq + zi_sq > 1024
+        result[idx[escaped]] = i
+        keep = ~escaped
+        idx, zr, zi, zr_sq, zi_sq = idx[keep], zr[keep], zi[keep], zr_sq[keep], zi_sq[keep]
+        zr, zi = (
+            wrap(zr_sq - zi_sq + c_real[idx], coord_width),
+            wrap(((zr * zi) << 1 >> frac_bits) + c_imag[idx], coord_width),
+        )
+    return result.reshape(shape)
+
+
+def engine_grid(view, us, vs, max_iter=MAX_ITERATIONS, drift=False, bailout=True):
+    """escape counts of engines launched at pixels us x vs of a view, as a
+    (len(vs), len(us)) grid. with drift, c follows the beam through COMPUTE
+    like in the chip: iteration n maps the pixel (n + 1) // 2 to the right of
+    the launch (never past the end of the line). with bailout, c that passes
+    the interior test at the launch pixel counts as max_iter."""
+    us, vs = np.asarray(us, dtype=np.int64), np.asarray(vs, dtype=np.int64)
+    reach = (max_iter + 1) // 2 if drift else 0
+    columns = np.arange(us.min(), us.max() + reach + 1)
+    c_columns, c_rows = top_c(columns, vs, view.centre_x, view.centre_y, view.zoom_level)
+    col = np.broadcast_to(us - columns[0], (vs.size, us.size)).ravel()
+    c_imag = np.broadcast_to(c_rows[:, None], (vs.size, us.size)).ravel()
+
+    result = np.full(col.size, max_iter, dtype=np.int64)
+    idx = np.arange(col.size)
+    zr = np.zeros(col.size, dtype=np.int64)
+    zi = np.zeros(col.size, dtype=np.int64)
+    for i in range(max_iter):
+        zr_sq, zi_sq = (zr * zr) >> FRAC_BITS, (zi * zi) >> FRAC_BITS
+        escaped = zr_sq + zi_sq > 1024
+        result[idx[escaped]] = i
+        keep = ~escaped
+        if i == 0 and bailout:
+            keep &= ~interior(c_columns[col], c_imag, FRAC_BITS)
+        idx, zr, zi, zr_sq, zi_sq = idx[keep], zr[keep], zi[keep], zr_sq[keep], zi_sq[keep]
+        c_real = c_columns[col[idx] + ((i + 1) // 2 if drift else 0)]
+        zr, zi = (
+            wrap(zr_sq - zi_sq + c_real, COORD_WIDTH),
+            wrap(((zr * zi) << 1 >> FRAC_BITS) + c_imag[idx], COORD_WIDTH),
+        )
+    return result.reshape(vs.size, us.size)
+
+
+def pixel_shift(old, new):
+    """(dx, dy) such that new maps pixel (u, v) to the c old maps (u + dx, v + dy)
+    to, for every pixel, or None if new is not such a translation of old.
+    c = centre + ((p - 320) * sf >> FRAC_BITS), so a centre step of d is a
+    translation iff d << FRAC_BITS is a multiple of sf (pan_step always is)."""
+    if old.zoom_level != new.zoom_level:
+        return None
+    sf = int(scale_factor(new.zoom_level))
+    steps = (int(wrap(new.centre_x - old.centre_x, COORD_WIDTH)), int(wrap(new.centre_y - old.centre_y, COORD_WIDTH)))
+    if sf == 0:
+        return (0, 0) if steps == (0, 0) else None
+    if any((d << FRAC_BITS) % sf for d in steps):
+        return None
+    return tuple((d << FRAC_BITS) // sf for d in steps)
+
+
+# fixed-c reference grids over the active area, shared by the reference models
+_REFERENCE_GRIDS = PanCache(engine_grid, pixel_shift, H_ACTIVE, V_ACTIVE)
+
+
+def reference_grid(view, max_iter=MAX_ITERATIONS):
+    """per-pixel escape counts of a view at fixed c, (V_ACTIVE, H_ACTIVE),
+    rendered incrementally across pans (model/pan_cache.py). read-only."""
+    return _REFERENCE_GRIDS.grid(view, max_iter)
+
+
+@dataclass
+class ViewParams:
+    """param_controller registers."""
+    centre_x: int = -128  # -2.0 in Q2.6 (DEFAULT_CENTRE_X truncated to 9 bits)
+    centre_y: int = 0
+    zoom_level: int = 0
+
+    def update(self, ui_in):
+        """one v_begin edge of param_controller."""
+        if ui_in & 0x40:  # reset_view
+            return ViewParams()
+        zoom = self.zoom_level
+        if ui_in & 0x01 and zoom < 15:
+            zoom += 1
+        elif ui_in & 0x02 and zoom > 0:
+            zoom -= 1
+        pan_step = 32 >> (self.zoom_level & 7)
+        cx, cy = self.centre_x, self.centre_y
+        if ui_in & 0x04:
+            cx -= pan_step
+        elif ui_in & 0x08:
+            cx += pan_step
+        if ui_in & 0x10:
+            cy -= pan_step
+        elif ui_in & 0x20:
+            cy += pan_step
+        return ViewParams(wrap(cx, COORD_WIDTH), wrap(cy, COORD_WIDTH), zoom)
+
+
+@dataclass
+class FrameStats:
+    launches: int = 0
+    accepted: int = 0
+    missed: int = 0           # launches that found the engine busy
+    misdirected: int = 0      # results stored to a tile other than the one launched
+    max_latency: int = 0      # clk edges from launch to tile store
+    busy_cycles: int = 0
+
+
+@dataclass
+class Frame:
+    index: int
+    params: ViewParams                      # view after this frame's v_begin
+    uo_out: np.ndarray                      # (V_TOTAL, H_TOTAL) uint8, one per pixel clock
+    image: np.ndarray                       # (V_ACTIVE, H_ACTIVE, 3) 2-bit rgb as displayed
+    tiles: list = field(default_factory=list)  # (edge, tile_x, vpos, iterations, rgb) per store
+    stats: FrameStats = field(default_factory=FrameStats)
+    refine_step: int = 0                    # sub-tile sampling step (refine_offset)
+
+
+class ChipModel:
+    """frame-by-frame model of tt_um_fractal from reset. inputs are held
+    constant for a frame; ui_in is sampled by param_controller at that
+    frame's v_begin like the rtl does. launches read their results from a
+    per-pixel grid of the frame's view kept across pans (model/pan_cache.py);
+    cached=False iterates every launch edge by edge instead. bailout=True
+    models an engine built with INTERIOR_CHECK, which tt_um_fractal leaves
+    out; refine=True a top built with REFINE, where uio_in[4] turns on
+    progressive refinement."""
+
+    def __init__(self, cached=True, max_grids=8, bailout=False, refine=False):
+        self.bailout = bailout
+        self.refine = refine
+        self.frame_index = 0
+        self.params = ViewParams()
+        self.refine_step = 0
+        self.idle_from = 0                # first clk cycle the engine is IDLE
+        self.launched_tile_x = 0
+        self.tile_line = np.zeros((3, MAX_TILES_X), dtype=np.int64)
+        self._pending = []                # stores landing after the previous frame's end
+        self.grids = PanCache(engine_grid, pixel_shift, H_ACTIVE, V_ACTIVE, max_grids) if cached else None
+
+    @staticmethod
+    def _pixel_of_cycle(k):
+        return (k + 1) // 2
+
+    def run_frame(self, ui_in=0x80, uio_in=0x00):
+        f = self.frame_index
+        base = f * FRAME_PIXELS
+        enable = bool(ui_in & 0x80)
+        colour_mode = uio_in & 3
+        hs, vs = stride_shifts(uio_in)
+        h_mask, v_mask = (1 << hs) - 1, (1 << vs) - 1
+
+        # refine_step advances on v_begin rising; out of reset it is already high
+        if f > 0:
+            static = self.refine and uio_in & 0x10 and not ui_in & 0x7F
+            self.refine_step = (self.refine_step + 1) % REFINE_STEPS if static else 0
+        dx, dy = refine_offset(self.refine_step, hs, vs)
+
+        # v_begin is seen on two edges (one right after reset)
+        before = self.params
+        first = before.update(ui_in)
+        second = first if f == 0 else first.update(ui_in)
+        update_edge = 1 if f == 0 else 2 * base
+
+        def params_at(e):  # registers during cycle e-1
+            k = e - 1
+            if k < update_edge:
+                return before
+            return first if k == update_edge else second
+
+        def launch_pixel(p):
+            i = p % FRAME_PIXELS
+            x, y = i % H_TOTAL, i // H_TOTAL
+            return enable and x < H_ACTIVE and y < V_ACTIVE and not (x & h_mask) and not (y & v_mask)
+
+        def pixel_valid(k):  # start_computation during cycle k
+            return launch_pixel(self._pixel_of_cycle(k))
+
+        stats = FrameStats()
+        tiles = []
+        events = list(self._pending)      # (edge, tile_x, (r, g, b))
+        self._pending = []
+
+        launch_ps, launch_tiles = [], []
+        if enable:
+            ys = np.arange(0, V_ACTIVE, 1 << vs)
+            xs = np.arange(0, H_ACTIVE, 1 << hs)
+            launch_ps = (base + ys[:, None] * H_TOTAL + xs[None, :]).ravel().tolist()
+            launch_tiles = [x >> hs for _ in ys for x in xs.tolist()]
+
+        # results of every launch that runs entirely on the frame's view (all
+        # but the first, which straddles the register update)
+        cached = self.grids is not None and bool(launch_ps)
+        if cached:
+            grid = self.grids.grid(second, MAX_ITERATIONS, True, self.bailout)
+            grid_it = grid[ys[:, None] + dy, xs[None, :] + dx].ravel().tolist()
+            grid_bailout = (interior(*top_c(xs[None, :] + dx, ys[:, None] + dy, second.centre_x, second.centre_y,
+                                            second.zoom_level), FRAC_BITS) & self.bailout).ravel().tolist()
+            levels = np.asarray(grid_it)
+            grid_rgb = list(zip(*(c.tolist() for c in colour_map(levels, colour_mode, levels >= MAX_ITERATIONS))))
+
+        # launched_tile_x during cycle k: a register, so it holds the tile of the
+        # latest launch whose start_computation was seen on an edge up to k,
+        # i.e. during cycle k-1 or earlier
+        carried_tile = self.launched_tile_x
+
+        def ltx_at(k):
+            j = bisect_right(launch_ps, self._pixel_of_cycle(k - 1)) - 1
+            return launch_tiles[j] if j >= 0 else carried_tile
+
+        bailout = self.bailout
+
+        def compute(e1):  # (iterations, edge into DONE), edge by edge from the launch
+            zr = zi = it = 0
+            e = e1
+            while True:
+                e += 1
+                zr_sq, zi_sq = (zr * zr) >> FRAC_BITS, (zi * zi) >> FRAC_BITS
+                if zr_sq + zi_sq > 1024 or it >= MAX_ITERATIONS:
+                    break
+                # c from the beam position and registers during cycle e-1 (plain ints: hot loop)
+                pv = params_at(e)
+                i = (e // 2) % FRAME_PIXELS
+                sf = int(scale_factor(pv.zoom_level))
+                c_real = wrap(pv.centre_x + (((i % H_TOTAL) + dx - 320) * sf >> FRAC_BITS), COORD_WIDTH)
+                c_imag = wrap(pv.centre_y + (((i // H_TOTAL) + dy - 240) * sf >> FRAC_BITS), COORD_WIDTH)
+                if it == 0 and bailout and interior(c_real, c_imag, FRAC_BITS):
+                    return MAX_ITERATIONS, e
+                zr, zi = (
+                    wrap(zr_sq - zi_sq + c_real, COORD_WIDTH),
+                    wrap(((zr * zi) << 1 >> FRAC_BITS) + c_imag, COORD_WIDTH),
+                )
+                it += 1
+            return it, e
+
+        for j, (p, tile_x) in enumerate(zip(launch_ps, launch_tiles)):
+            stats.launches += 1
+            e1 = 1 if p == 0 else 2 * p
+            if self.idle_from > e1 - 1:
+                stats.missed += 1
+                continue
+            stats.accepted += 1
+
+            if cached and p != base:
+                it, (r, g, b) = grid_it[j], grid_rgb[j]
+                done_edge = e1 + (1 if grid_bailout[j] else it + 1)
+            else:
+                it, done_edge = compute(e1)
+                r, g, b = (int(v) for v in colour_map(it, colour_mode, it >= MAX_ITERATIONS))
+            e = done_edge + 1
+            while True:  # DONE: store every edge until pixel_valid drops
+                dest = ltx_at(e - 1)
+                events.append((e, dest, (r, g, b)))
+                tiles.append((e, dest, (p - base) // H_TOTAL, it, (r, g, b)))
+                stats.misdirected += dest != tile_x
+                if not pixel_valid(e - 1):
+                    break
+                e += 1
+            self.idle_from = e
+            stats.busy_cycles += e - e1
+            stats.max_latency = max(stats.max_latency, e - e1)
+
+        if launch_ps:
+            self.launched_tile_x = launch_tiles[-1]
+
+        # rgb register at pixel p shows the tile line right after edge 2p-1,
+        # indexed by the beam position of pixel p-1 (q). events apply to q >= edge // 2.
+        rgb = np.zeros((3, FRAME_PIXELS), dtype=np.int64)
+        if enable:
+            active_q = base + ACTIVE_INDEX
+            tile_of_q = _HPOS[ACTIVE_INDEX] >> hs
+            start = 0
+            for edge, dest, colour in events:
+                q_from = edge // 2
+                if q_from >= base + FRAME_PIXELS:
+                    self._pending.append((edge, dest, colour))
+                    continue
+                pos = int(np.searchsorted(active_q, q_from))
+                if pos > start:
+                    rgb[:, ACTIVE_INDEX[start:pos] + 1] = self.tile_line[:, tile_of_q[start:pos]]
+                    start = pos
+                self.tile_line[:, dest] = colour
+            rgb[:, ACTIVE_INDEX[start:] + 1] = self.tile_line[:, tile_of_q[start:]]
+        else:
+            # disabled: the active region holds the black left by blanking;
+            # stores still land in the tile line
+            for edge, dest, colour in events:
+                self.tile_line[:, dest] = colour
+
+        uo_out = pack_uo_out(rgb[0], rgb[1], rgb[2], HSYNC, VSYNC).astype(np.uint8)
+        image = rgb[:, ACTIVE].T.reshape(V_ACTIVE, H_ACTIVE, 3)
+
+        self.params = second
+        self.frame_index += 1
+        return Frame(f, second, uo_out.reshape(V_TOTAL, H_TOTAL), image, tiles, stats, self.refine_step)
+
+
+def main():
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(description="cycle-approximate tt_um_fractal model")
+    parser.add_argument("--frames", type=int, default=2)
+    parser.add_argument("--ui-in", type=lambda v: int(v, 0), default=0x80)
+    parser.add_argument("--uio-in", type=lambda v: int(v, 0), default=0x00)
+    parser.add_argument("--png", help="save the last frame as seen on the monitor")
+    args = parser.parse_args()
+
+    model = ChipModel()
+    start = time.monotonic()
+    for _ in range(args.frames):
+        frame = model.run_frame(args.ui_in, args.uio_in)
+        s = frame.stats
+        print(
+            f"[chip] frame {frame.index}: centre=({frame.params.centre_x},{frame.params.centre_y}) "
+            f"zoom={frame.params.zoom_level} launches={s.launches} accepted={s.accepted} "
+            f"missed={s.missed} misdirected={s.misdirected} max_latency={s.max_latency}"
+        )
+    elapsed = time.monotonic() - start
+    print(f"[chip] {args.frames} frames in {elapsed:.2f}s ({args.frames / elapsed:.1f} frames/s)")
+
+    if args.png:
+        Image.fromarray((frame.image * 85).astype(np.uint8), "RGB").save(args.png)
+        print(f"[chip] saved {args.png}")
+
+
+if __name__ == "__main__":
+    main()
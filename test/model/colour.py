@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# numpy model of mandelbrot_colour_mapper plus the uo_out pin packing used
+# by tt_um_fractal. works on scalars or arrays of iteration counts.
+
+import numpy as np
+
+# tt_um_fractal MAX_ITERATIONS; counts at or above it are drawn black
+MAX_ITERATIONS = 16
+
+
+def colour_map(iteration_count, colour_mode, in_set):
+    """2-bit (red, green, blue) arrays for the given counts. only bit 0 of
+    colour_mode is used: 0 = greyscale, 1 = fire."""
+    it = np.asarray(iteration_count, dtype=np.int64)
+    mode = np.asarray(colour_mode, dtype=np.int64) & 1
+    in_set = np.asarray(in_set, dtype=bool)
+
+    grey = np.where(it < 8, 3, np.where(it < 24, 2, 1))
+
+    # fire: color_index[1:0] -> deep red, orange, yellow, white
+    fire_idx = (it >> 3) & 3
+    fire_r = np.full_like(it, 3)
+    fire_g = np.where(fire_idx >= 1, 3, 0)
+    fire_b = np.where(fire_idx >= 2, 3, 0)
+
+    red = np.where(mode == 1, fire_r, grey)
+    green = np.where(mode == 1, fire_g, grey)
+    blue = np.where(mode == 1, fire_b, grey)
+
+    black = np.zeros_like(it)
+    return (
+        np.where(in_set, black, red),
+        np.where(in_set, black, green),
+        np.where(in_set, black, blue),
+    )
+
+
+def pack_uo_out(red, green, blue, hsync=1, vsync=1):
+    """tiny tapeout vga pmod pinout: {hsync, b0, g0, r0, vsync, b1, g1, r1}."""
+    red, green, blue = (np.asarray(v, dtype=np.int64) for v in (red, green, blue))
+    return (
+        ((red >> 1) & 1)
+        | (((green >> 1) & 1) << 1)
+        | (((blue >> 1) & 1) << 2)
+        | ((np.asarray(vsync, dtype=np.int64) & 1) << 3)
+        | ((red & 1) << 4)
+        | ((green & 1) << 5)
+        | ((blue & 1) << 6)
+        | ((np.asarray(hsync, dtype=np.int64) & 1) << 7)
+    )
+
+
+def unpack_uo_out(uo_out):
+    """inverse of pack_uo_out: (red, green, blue, hsync, vsync)."""
+    uo = np.asarray(uo_out, dtype=np.int64)
+    red = ((uo >> 0) & 1) << 1 | ((uo >> 4) & 1)
+    green = ((uo >> 1) & 1) << 1 | ((uo >> 5) & 1)
+    blue = ((uo >> 2) & 1) << 1 | ((uo >> 6) & 1)
+    return red, green, blue, (uo >> 7) & 1, (uo >> 3) & 1
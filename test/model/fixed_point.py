@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# python reference models for mandelbrot_engine as wrapped by tb_engine
+# (COORD_WIDTH = 11, FRAC_BITS = 8). the scalar functions are the ones the
+# engine bench checks against; the *_grid variants are numpy versions with
+# identical integer semantics for sweeping whole grids of points at once.
+
+import numpy as np
+
+COORD_WIDTH = 11  # Updated for 1x2 tile optimization
+FRAC_BITS = 8     # Updated for 1x2 tile optimization
+SCREEN_CENTER_X = 320
+SCREEN_CENTER_Y = 240
+
+def to_signed(n, bit_width): # int -> 2s complement
+    mask = (1 << bit_width) - 1
+    if n < 0:
+        n = (1 << bit_width) + n
+    return n & mask
+
+def from_signed(n, bit_width): # 2s comp -> int
+    if n & (1 << (bit_width - 1)):
+        return n - (1 << bit_width)
+    return n
+
+def wrap(n, bit_width): # int or int array -> value of a signed bit_width register
+    half = 1 << (bit_width - 1)
+    return ((n + half) & ((1 << bit_width) - 1)) - half
+
+def calculate_complex_c(params):
+    zoom_shift = min(params['zoom_level'], 15)
+    base_scale = 1 << FRAC_BITS  # 1.0, Q3.8 -> 256
+    scale_factor = base_scale >> zoom_shift
+    
+    temp_real = (params['pixel_x'] - SCREEN_CENTER_X) * scale_factor
+    temp_imag = (params['pixel_y'] - SCREEN_CENTER_Y) * scale_factor
+    
+    # c_real = center_x[15:5] + temp_real[16:5]; (Q3.8 format)
+    c_r = from_signed(params['center_x'], 16) >> 5
+    c_i = from_signed(params['center_y'], 16) >> 5
+
+    # temp_real -> signed 22 bit
+    c_r += from_signed(to_signed(temp_real, 22), 22) >> 5
+    c_i += from_signed(to_signed(temp_imag, 22), 22) >> 5
+
+    # truncate to fixed-point representation
+    c_real_fixed = from_signed(to_signed(c_r, COORD_WIDTH), COORD_WIDTH)
+    c_imag_fixed = from_signed(to_signed(c_i, COORD_WIDTH), COORD_WIDTH)
+    
+    # convert to floating-point representation
+    c_real_float = c_real_fixed / (1 << FRAC_BITS)
+    c_imag_float = c_imag_fixed / (1 << FRAC_BITS)
+    c_complex = complex(c_real_float, c_imag_float)
+    
+    return c_real_fixed, c_imag_fixed, c_complex
+
+def engine_model(params):
+    c_real, c_imag, _ = calculate_complex_c(params)
+
+    # *** main loop
+    z_real, z_imag = 0, 0
+    
+    for i in range(params['max_iter_limit'] + 1):
+        # Q6.16
+        z_real_sq = z_real * z_real
+        z_imag_sq = z_imag * z_imag
+        
+        # magnitude_sq = z_real_sq[18:8] + z_imag_sq[18:8] (Q3.8 format)
+        mag_sq = (z_real_sq >> FRAC_BITS) + (z_imag_sq >> FRAC_BITS)
+        
+        # Q3.8, 4.0 -> 1024
+        if mag_sq > 1024 or i >= params['max_iter_limit']:
+            return i
+
+        # z_new = z^2 + c
+        z_cross = z_real * z_imag
+
+        # z_real_new = (z_real^2 - z_imag^2) + c_real
+        zrs_shifted = from_signed(to_signed(z_real_sq, 22), 22) >> FRAC_BITS
+        zis_shifted = from_signed(to_signed(z_imag_sq, 22), 22) >> FRAC_BITS
+        z_real_new = from_signed(to_signed(zrs_shifted - zis_shifted, 12), 12) + c_real
+        z_real_new = from_signed(to_signed(z_real_new, COORD_WIDTH), COORD_WIDTH)
+        
+        # z_imag_new = 2*z_real*z_imag + c_imag
+        z_cross_shifted = from_signed(to_signed(z_cross << 1, 22), 22) >> FRAC_BITS
+        z_imag_new = from_signed(to_signed(z_cross_shifted, 12), 12) + c_imag
+        z_imag_new = from_signed(to_signed(z_imag_new, COORD_WIDTH), COORD_WIDTH)
+
+        z_real, z_imag = z_real_new, z_imag_new
+        
+    return params['max_iter_limit']
+
+def float_model(params): # floating point model for comparison
+    _, _, c = calculate_complex_c(params)
+
+    z = complex(0, 0)
+    for i in range(params['max_iter_limit']):
+        if abs(z) > 2.0:
+            return i
+        z = z*z + c
+        
+    return params['max_iter_limit']
+
+
+def iteration_tolerance(c):
+    """allowed |dut - model| iteration drift for a float c (scalar or array):
+    outside |c| = 2 the reduced-precision escape count is allowed to wobble."""
+    return np.where(np.abs(c) > 2.0, 2, 0)
+
+
+def calculate_complex_c_grid(pixel_x, pixel_y, center_x, center_y, zoom_level):
+    """vectorized calculate_complex_c. arguments broadcast; centers are 16-bit
+    two's complement like the bench drives them. returns fixed-point (c_real, c_imag)."""
+    zoom_shift = np.minimum(np.asarray(zoom_level, dtype=np.int64), 15)
+    scale_factor = (1 << FRAC_BITS) >> zoom_shift
+
+    temp_real = (np.asarray(pixel_x, dtype=np.int64) - SCREEN_CENTER_X) * scale_factor
+    temp_imag = (np.asarray(pixel_y, dtype=np.int64) - SCREEN_CENTER_Y) * scale_factor
+
+    c_r = wrap(np.asarray(center_x, dtype=np.int64), 16) >> 5
+    c_i = wrap(np.asarray(center_y, dtype=np.int64), 16) >> 5
+    c_r = c_r + (wrap(temp_real, 22) >> 5)
+    c_i = c_i + (wrap(temp_imag, 22) >> 5)
+
+    return wrap(c_r, COORD_WIDTH), wrap(c_i, COORD_WIDTH)
+
+def engine_model_grid(c_real, c_imag, max_iter_limit):
+    """vectorized engine_model over fixed-point c arrays. max_iter_limit may be
+    a scalar or broadcast against c. only still-running points are iterated."""
+    c_real, c_imag, limit = np.broadcast_arrays(
+        np.asarray(c_real, dtype=np.int64),
+        np.asarray(c_imag, dtype=np.int64),
+        np.asarray(max_iter_limit, dtype=np.int64),
+    )
+    shape = c_real.shape
+    c_real, c_imag, limit = c_real.ravel(), c_imag.ravel(), limit.ravel()
+
+    result = limit.copy()
+    idx = np.arange(c_real.size)
+    z_real = np.zeros(c_real.size, dtype=np.int64)
+    z_imag = np.zeros(c_real.size, dtype=np.int64)
+
+    i = 0
+    while idx.size:
+        z_real_sq = z_real * z_real
+        z_imag_sq = z_imag * z_imag
+        mag_sq = (z_real_sq >> FRAC_BITS) + (z_imag_sq >> FRAC_BITS)
+
+        done = (mag_sq > 1024) | (i >= limit[idx])
+        result[idx[done]] = i
+
+        keep = ~done
+        idx = idx[keep]
+        z_real, z_imag = z_real[keep], z_imag[keep]
+        z_real_sq, z_imag_sq = z_real_sq[keep], z_imag_sq[keep]
+
+        z_cross = z_real * z_imag
+        zrs_shifted = wrap(z_real_sq, 22) >> FRAC_BITS
+        zis_shifted = wrap(z_imag_sq, 22) >> FRAC_BITS
+        z_real_new = wrap(wrap(zrs_shifted - zis_shifted, 12) + c_real[idx], COORD_WIDTH)
+        z_cross_shifted = wrap(z_cross << 1, 22) >> FRAC_BITS
+        z_imag_new = wrap(wrap(z_cross_shifted, 12) + c_imag[idx], COORD_WIDTH)
+
+        z_real, z_imag = z_real_new, z_imag_new
+        i += 1
+
+    return result.reshape(shape)
+
+def float_model_grid(c, max_iter_limit):
+    """vectorized float_model over a complex array."""
+    c, limit = np.broadcast_arrays(np.asarray(c, dtype=np.complex128), np.asarray(max_iter_limit, dtype=np.int64))
+    shape = c.shape
+    c, limit = c.ravel(), limit.ravel()
+
+    result = limit.copy()
+    idx = np.arange(c.size)
+    z = np.zeros(c.size, dtype=np.complex128)
+
+    i = 0
+    while idx.size:
+        done = (np.abs(z) > 2.0) | (i >= limit[idx])
+        result[idx[done]] = np.minimum(i, limit[idx[done]])
+        keep = ~done
+        idx, z = idx[keep], z[keep]
+        z = z * z + c[idx]
+        i += 1
+
+    return result.reshape(shape)
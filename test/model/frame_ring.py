@@ -0,0 +1,217 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# shared-memory frame ring between a running simulation and a live viewer
+# (png/live.py and png/viewer.py). one multiprocessing.shared_memory block
+# holds:
+#
+#   - SLOTS rgb frames. the simulation renders each captured frame straight
+#     into the next slot and publishes it; it never waits for the viewer and
+#     simply overwrites the oldest slot. the viewer always takes the newest
+#     frame, so when it falls behind, the frames in between are dropped
+#   - a per-slot sequence number (a seqlock): -1 while the slot is being
+#     written, the frame number once published. a reader that was lapped
+#     while copying a slot sees the number change and discards its copy
+#   - a small command queue the other way: (ui_in pulse, uio_in) pairs that
+#     the simulation drains once per frame and applies at the next v_begin.
+#     when the queue is full the viewer drops the key press instead of waiting
+#
+# single writer and single reader on each side; plain int64 stores, no locks.
+#
+# run from test/ (self-check: a fast writer process against a slow reader):
+#   python model/frame_ring.py
+
+import argparse
+import time
+from multiprocessing import Process, resource_tracker, shared_memory
+
+import numpy as np
+
+SLOTS = 4
+COMMANDS = 64
+MAGIC = 0x7474_6672_616D_6531  # "ttframe1"
+
+# header words
+_MAGIC, _HEIGHT, _WIDTH, _SLOTS, _PUBLISHED, _CMD_HEAD, _CMD_TAIL, _CLOSED = range(8)
+_HEADER = 8
+# per-slot words: sequence number, then the ui_in/uio_in the frame was rendered with
+_META = 3
+
+
+class FrameRing:
+    """one end of the ring; create() on the simulation side, attach() in the viewer."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        if header[_MAGIC] != MAGIC:
+            raise ValueError(f"shared memory {shm.name!r} is not a frame ring")
+        height, width, slots = (int(v) for v in header[_HEIGHT:_SLOTS + 1])
+        self.shape = (height, width, 3)
+        self.slots = slots
+        self.header = header
+        offset = header.nbytes
+        self.meta = np.ndarray((slots, _META), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.meta.nbytes
+        self.commands = np.ndarray((COMMANDS, 2), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.commands.nbytes
+        self.frames = np.ndarray((slots, *self.shape), dtype=np.uint8, buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def nbytes(width, height, slots=SLOTS):
+        return 8 * (_HEADER + slots * _META + COMMANDS * 2) + slots * height * width * 3
+
+    @classmethod
+    def create(cls, name, width, height, slots=SLOTS):
+        """new ring under `name`, replacing one left behind by a crashed run."""
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.nbytes(width, height, slots))
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_HEIGHT], header[_WIDTH], header[_SLOTS] = height, width, slots
+        header[_MAGIC] = MAGIC
+        ring = cls(shm, owner=True)
+        ring.meta[:] = -1
+        return ring
+
+    @classmethod
+    def attach(cls, name, track=False):
+        """the viewer end of an existing ring; FileNotFoundError until the simulation creates it."""
+        shm = shared_memory.SharedMemory(name=name)
+        if not track:
+            # the simulation owns the block; keep this process's resource
+            # tracker from unlinking it when the viewer exits (python < 3.13
+            # has no SharedMemory(track=False))
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def close(self):
+        """mark the ring closed for the other end and release it."""
+        self.header[_CLOSED] = 1
+        del self.header, self.meta, self.commands, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    @property
+    def closed(self):
+        return bool(self.header[_CLOSED])
+
+    @property
+    def published(self):
+        """frames published so far."""
+        return int(self.header[_PUBLISHED])
+
+    # simulation side
+
+    def next_slot(self):
+        """the slot the next frame is rendered into, marked as being written."""
+        n = self.published
+        self.meta[n % self.slots, 0] = -1
+        return self.frames[n % self.slots]
+
+    def publish(self, ui_in=0, uio_in=0):
+        """publish the frame written into next_slot(); never waits on the reader."""
+        n = self.published
+        slot = self.meta[n % self.slots]
+        slot[1], slot[2] = ui_in, uio_in
+        slot[0] = n
+        self.header[_PUBLISHED] = n + 1
+        return n
+
+    def receive(self):
+        """every queued (ui_in pulse, uio_in) command, oldest first."""
+        head, tail = int(self.header[_CMD_HEAD]), int(self.header[_CMD_TAIL])
+        commands = [tuple(int(v) for v in self.commands[i % COMMANDS]) for i in range(tail, head)]
+        self.header[_CMD_TAIL] = head
+        return commands
+
+    # viewer side
+
+    def latest(self, last=-1):
+        """(frame number, slot view, ui_in, uio_in) of the newest frame after
+        `last`, or None. the view aliases shared memory: copy it, then check
+        valid(n) before using the copy."""
+        n = self.published - 1
+        if n <= last:
+            return None
+        slot = self.meta[n % self.slots]
+        if slot[0] != n:
+            return None
+        return n, self.frames[n % self.slots], int(slot[1]), int(slot[2])
+
+    def valid(self, n):
+        """frame n has not been overwritten since latest() returned it."""
+        return self.meta[n % self.slots, 0] == n
+
+    def send(self, ui_in, uio_in):
+        """queue a command; False (dropped) when the simulation has not drained the queue."""
+        head, tail = int(self.header[_CMD_HEAD]), int(self.header[_CMD_TAIL])
+        if head - tail >= COMMANDS:
+            return False
+        self.commands[head % COMMANDS] = ui_in, uio_in
+        self.header[_CMD_HEAD] = head + 1
+        return True
+
+
+def _writer(name, frames, period_s):
+    # a child shares the parent's resource tracker, which already tracks the block
+    ring = FrameRing.attach(name, track=True)
+    blocked = 0.0
+    for n in range(frames):
+        start = time.monotonic()
+        slot = ring.next_slot()
+        slot[:] = n % 251          # every byte of frame n carries n
+        ring.publish(uio_in=n)
+        blocked = max(blocked, time.monotonic() - start)
+        time.sleep(period_s)
+    ring.header[_CLOSED] = 1
+    print(f"[frame_ring] writer: {frames} frames, slowest publish {blocked * 1e3:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="frame ring self-check: fast writer, slow reader")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=160)
+    parser.add_argument("--height", type=int, default=120)
+    parser.add_argument("--reader-delay", type=float, default=0.004, help="seconds the reader spends per frame")
+    args = parser.parse_args()
+
+    name = f"frame_ring_check_{time.monotonic_ns()}"
+    ring = FrameRing.create(name, args.width, args.height)
+    writer = Process(target=_writer, args=(name, args.frames, 0.0005))
+    writer.start()
+
+    shown, torn, last = [], 0, -1
+    while not (ring.closed and ring.published - 1 == last):
+        frame = ring.latest(last)
+        if frame is None:
+            time.sleep(0.0002)
+            continue
+        n, view, _, uio_in = frame
+        copy = view.copy()
+        if not ring.valid(n):
+            torn += 1
+            last = n
+            continue
+        assert uio_in == n and (copy == n % 251).all(), f"frame {n} is inconsistent"
+        shown.append(n)
+        last = n
+        time.sleep(args.reader_delay)  # the viewer drawing it
+    writer.join()
+    ring.close()
+
+    dropped = args.frames - len(shown) - torn
+    assert shown == sorted(shown) and len(set(shown)) == len(shown)
+    print(f"[frame_ring] reader: {len(shown)} shown, {dropped} dropped, {torn} lapped while copying, "
+          f"all shown frames intact")
+
+
+if __name__ == "__main__":
+    main()
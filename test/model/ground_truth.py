@@ -0,0 +1,230 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# float ground truth for the fixed-point engines. escape counts use the
+# engine's own bailout (|z|^2 > 1024 lsbs, i.e. 16.0 for the chip's Q2.6 and
+# 4.0 for tb_engine's Q3.8) and its count convention: the first i < max_iter
+# with |z_i| past the radius, else max_iter.
+#
+#   - escape_grid: complex128 over whole grids. c inside the main cardioid or
+#     the period-2 bulb is skipped, and orbits that come back to within tol of
+#     a saved z (brent: the save point doubles its distance) stop as in-set
+#   - perturbation_grid: for views too deep for doubles. one reference orbit
+#     Z_n at the view centre in decimal arithmetic, then per pixel only the
+#     double delta d_{n+1} = 2 Z_n d_n + d_n^2 + dc. pixels where the delta
+#     outgrows the orbit (|Z_n + d_n| < GLITCH |Z_n|) or that outlive it get a
+#     new reference at one of them, a few times, then escape_grid
+#
+# report() compares the chip engine (chip.reference_grid, rtl arithmetic)
+# against escape_grid at the engine's quantized c (arithmetic error) and
+# against perturbation_grid at the unquantized c of the same pixel (total
+# error, including c truncation and wrap).
+#
+# run from test/:
+#   python model/ground_truth.py                    # every benchmark view
+#   python model/ground_truth.py --deep 16 72 8     # perturbation vs doubles, zoom 16..64
+
+import argparse
+import time
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+import numpy as np
+
+from chip import COORD_WIDTH, FRAC_BITS, H_ACTIVE, V_ACTIVE, reference_grid, scale_factor, top_c
+from colour import MAX_ITERATIONS
+
+GLITCH = 1e-3         # pauldelbrot criterion
+PERIOD_TOL = 1e-13    # |z - saved z| that counts as a cycle
+REFERENCE_ROUNDS = 4  # re-references before glitched pixels fall back to escape_grid
+
+
+def escape_radius_sq(frac_bits):
+    """the engines' 1024-lsb bailout on |z|^2 as a float."""
+    return 1024 / (1 << frac_bits)
+
+
+def in_main_set(c):
+    """c in the main cardioid or the period-2 bulb (exact float test)."""
+    x, y_sq = c.real, c.imag * c.imag
+    q = (x - 0.25) ** 2 + y_sq
+    return (q * (q + x - 0.25) <= 0.25 * y_sq) | ((x + 1) ** 2 + y_sq <= 1 / 16)
+
+
+def escape_grid(c, max_iter=MAX_ITERATIONS, radius_sq=4.0, skip=True, period_tol=PERIOD_TOL):
+    """escape counts for a complex array of c."""
+    c = np.asarray(c, dtype=np.complex128)
+    shape = c.shape
+    c = c.ravel()
+    result = np.full(c.size, max_iter, dtype=np.int64)
+    idx = np.flatnonzero(~in_main_set(c)) if skip else np.arange(c.size)
+    z = np.zeros(idx.size, dtype=np.complex128)
+    saved = z.copy()
+    for i in range(max_iter):
+        mag_sq = z.real * z.real + z.imag * z.imag
+        escaped = mag_sq > radius_sq
+        result[idx[escaped]] = i
+        keep = ~escaped
+        if i > 1 and period_tol:
+            keep &= np.abs(z - saved) >= period_tol
+        idx, z, saved = idx[keep], z[keep], saved[keep]
+        if not idx.size:
+            break
+        if i & (i - 1) == 0:
+            saved = z.copy()
+        z = z * z + c[idx]
+    return result.reshape(shape)
+
+
+def reference_orbit(centre, max_iter, radius_sq, digits):
+    """Z_0.. at an exact (Fraction) complex centre with `digits` significant
+    digits, rounded to complex128; stops after the first escaped Z."""
+    with localcontext() as ctx:
+        ctx.prec = digits
+        cr = Decimal(centre[0].numerator) / Decimal(centre[0].denominator)
+        ci = Decimal(centre[1].numerator) / Decimal(centre[1].denominator)
+        radius = Decimal(radius_sq)
+        zr = zi = Decimal(0)
+        orbit = []
+        for _ in range(max_iter + 1):
+            orbit.append(complex(float(zr), float(zi)))
+            if zr * zr + zi * zi > radius:
+                break
+            zr, zi = zr * zr - zi * zi + cr, 2 * zr * zi + ci
+    return np.array(orbit)
+
+
+def digits_for(offsets):
+    """decimal digits for a reference orbit resolving offsets this small."""
+    spacing = np.abs(offsets[offsets != 0]).min() if np.any(offsets != 0) else 1.0
+    return 20 + int(max(0.0, -np.log10(spacing)))
+
+
+def perturbation_grid(centre, offsets, max_iter=MAX_ITERATIONS, radius_sq=4.0, rounds=REFERENCE_ROUNDS):
+    """escape counts of c = centre + offsets: centre an exact (re, im) pair of
+    Fractions, offsets complex128. returns (counts, pixels resolved by escape_grid)."""
+    offsets = np.asarray(offsets, dtype=np.complex128)
+    shape = offsets.shape
+    offsets = offsets.ravel()
+    result = np.full(offsets.size, max_iter, dtype=np.int64)
+    digits = digits_for(offsets)
+    todo = np.arange(offsets.size)
+
+    for _ in range(rounds + 1):
+        orbit = reference_orbit(centre, max_iter, radius_sq, digits)
+        dc = offsets[todo]
+        idx = np.arange(todo.size)
+        delta = np.zeros(todo.size, dtype=np.complex128)
+        glitched = np.zeros(todo.size, dtype=bool)
+        for i in range(max_iter):
+            if i >= orbit.size:
+                glitched[idx] = True  # reference escaped first
+                break
+            z = orbit[i] + delta
+            mag_sq = z.real * z.real + z.imag * z.imag
+            escaped = mag_sq > radius_sq
+            result[todo[idx[escaped]]] = i
+            glitch = ~escaped & (mag_sq < GLITCH * GLITCH * abs(orbit[i]) ** 2)
+            glitched[idx[glitch]] = True
+            keep = ~(escaped | glitch)
+            idx, delta = idx[keep], delta[keep]
+            delta = 2 * orbit[i] * delta + delta * delta + dc[idx]
+            if not idx.size:
+                break
+        # survivors ran to max_iter on this reference and keep the default
+        if not glitched.any():
+            return result.reshape(shape), 0
+        todo = todo[glitched]
+        # new reference at the middle glitched pixel, offsets relative to it
+        pivot = offsets[todo[todo.size // 2]]
+        centre = (centre[0] + Fraction(pivot.real), centre[1] + Fraction(pivot.imag))
+        offsets = offsets - pivot
+
+    c = complex(float(centre[0]), float(centre[1])) + offsets[todo]
+    result[todo] = escape_grid(c, max_iter, radius_sq)
+    return result.reshape(shape), todo.size
+
+
+def chip_c(view, xs, ys):
+    """unquantized c of the chip's pixels: (Fraction centre, complex128 offsets).
+    the step keeps the sign of scale_factor (zoom 0 reads as -256), so this
+    measures precision rather than the known zoom-0 mirror."""
+    sign = -1 if scale_factor(view.zoom_level) < 0 else 1
+    step = sign * 2.0 ** (8 - min(view.zoom_level, 15) - 2 * FRAC_BITS)
+    centre = (Fraction(view.centre_x, 1 << FRAC_BITS), Fraction(view.centre_y, 1 << FRAC_BITS))
+    return centre, (np.asarray(xs) - 320) * step + 1j * (np.asarray(ys) - 240) * step
+
+
+def report(view, max_iter=MAX_ITERATIONS):
+    """per-pixel chip engine error for one view: dict of counts and summary stats."""
+    xs, ys = np.meshgrid(np.arange(H_ACTIVE), np.arange(V_ACTIVE))
+    radius_sq = escape_radius_sq(FRAC_BITS)
+    engine = reference_grid(view, max_iter)
+
+    c_real, c_imag = top_c(xs, ys, view.centre_x, view.centre_y, view.zoom_level)
+    quantized = escape_grid((c_real + 1j * c_imag) / (1 << FRAC_BITS), max_iter, radius_sq)
+    centre, offsets = chip_c(view, xs, ys)
+    ideal, fallback = perturbation_grid(centre, offsets, max_iter, radius_sq)
+
+    def summary(truth):
+        error = np.abs(engine - truth)
+        return {
+            "exact": float((error == 0).mean()),
+            "within_1": float((error <= 1).mean()),
+            "mean": float(error.mean()),
+            "max": int(error.max()),
+            "set_flips": int(((engine >= max_iter) != (truth >= max_iter)).sum()),
+        }
+
+    return {"engine": engine, "quantized": quantized, "ideal": ideal, "fallback": fallback,
+            "arithmetic": summary(quantized), "total": summary(ideal)}
+
+
+def deep_check(zooms, max_iter, step=4):
+    """perturbation vs direct doubles at zooms beyond the chip, around c = i
+    (a misiurewicz point: counts keep varying at every depth). returns
+    [(zoom, agreement, distinct counts perturbed / direct, fallback pixels)]."""
+    centre = (Fraction(0), Fraction(1))
+    xs, ys = np.meshgrid(np.arange(0, H_ACTIVE, step), np.arange(0, V_ACTIVE, step))
+    rows = []
+    for zoom in zooms:
+        offsets = ((xs - 320) + 1j * (ys - 240)) * 2.0 ** -zoom
+        truth, fallback = perturbation_grid(centre, offsets, max_iter)
+        direct = escape_grid(complex(float(centre[0]), float(centre[1])) + offsets, max_iter)
+        rows.append((zoom, float((truth == direct).mean()), np.unique(truth).size, np.unique(direct).size, fallback))
+    return rows
+
+
+def main():
+    from scheduler import BENCH_VIEWS
+
+    parser = argparse.ArgumentParser(description="float ground truth: per-pixel engine error on the benchmark views")
+    parser.add_argument("--max-iter", type=int, default=MAX_ITERATIONS)
+    parser.add_argument("--view", choices=sorted(BENCH_VIEWS), action="append", help="restrict to these views")
+    parser.add_argument("--deep", type=int, nargs=3, metavar=("FROM", "TO", "STEP"),
+                        help="perturbation vs doubles at zoom FROM..TO (2^-zoom per pixel) instead")
+    parser.add_argument("--deep-iter", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    if args.deep:
+        print(f"{'zoom':>4} {'agree':>8} {'distinct':>13} {'fallback':>8}   (max_iter={args.deep_iter}, every 4th pixel)")
+        for zoom, agree, perturbed, direct, fallback in deep_check(range(*args.deep), args.deep_iter):
+            print(f"{zoom:>4} {agree:>8.2%} {perturbed:>6} / {direct:<4} {fallback:>8}")
+    else:
+        views = {name: BENCH_VIEWS[name] for name in args.view} if args.view else BENCH_VIEWS
+        print(f"[ground_truth] chip engine ({COORD_WIDTH}/{FRAC_BITS} bits) vs float, max_iter={args.max_iter}")
+        print(f"{'view':<12} {'vs':<10} {'exact':>7} {'<=1':>7} {'mean':>6} {'max':>4} {'set flips':>9}")
+        for name, view in views.items():
+            result = report(view, args.max_iter)
+            for label in ("arithmetic", "total"):
+                s = result[label]
+                print(
+                    f"{name:<12} {label:<10} {s['exact']:>7.2%} {s['within_1']:>7.2%} {s['mean']:>6.3f} "
+                    f"{s['max']:>4} {s['set_flips']:>9}"
+                )
+    print(f"[ground_truth] {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# interior-point bailout of mandelbrot_engine (INTERIOR_CHECK). on the first
+# COMPUTE cycle the engine tests c against the main cardioid and the period-2
+# bulb with the same truncating fixed-point arithmetic as the rtl; a hit goes
+# straight to DONE with iteration_count = max_iter_limit. at fixed c (as in
+# tb_engine) the escape count is unchanged as long as every flagged c also
+# runs to the cap in the quantized iteration, which verify() checks over
+# every c of a configuration.
+#
+# tt_um_fractal instantiates the engine with INTERIOR_CHECK=0: the test
+# roughly doubles the engine's cells, which the tile does not have room for.
+# the numbers below are what enabling it would buy and change there. c
+# follows the beam through COMPUTE, so a tile whose launch c is flagged would
+# otherwise have iterated on drifting c and may have escaped: the bailout
+# changes the displayed image. image_delta() counts the pixels and tiles that
+# change, per view and stride preset (ChipModel with and without bailout).
+#
+# run from test/:
+#   python model/interior.py             # latency saved per view and stride
+#   python model/interior.py --verify    # exhaustive check, both engine configs,
+#                                        # and the top-level image delta
+
+import argparse
+import time
+
+import numpy as np
+
+INTERIOR_MARGIN = 2   # lsbs, the smallest margin verify() passes in both configs
+MAX_ITER_LIMIT = 63   # largest max_iter_limit the 6-bit port can ask for
+# uio_in[3:2] stride presets of tt_um_fractal: 64x16, 32x16, 32x8
+STRIDE_PRESETS = ((0b0000, (6, 4)), (0b1000, (5, 4)), (0b0100, (5, 3)))
+
+
+def interior(c_real, c_imag, frac_bits):
+    """rtl c_interior for fixed-point c (ints or arrays)."""
+    x_card = c_real - (1 << (frac_bits - 2))
+    x_bulb = c_real + (1 << frac_bits)
+    y_sq = (c_imag * c_imag) >> frac_bits
+    q = ((x_card * x_card) >> frac_bits) + y_sq
+    card = (q * (q + x_card)) >> frac_bits
+    bulb = ((x_bulb * x_bulb) >> frac_bits) + y_sq
+    return (card + INTERIOR_MARGIN <= (y_sq >> 2)) | (bulb + INTERIOR_MARGIN <= (1 << (frac_bits - 4)))
+
+
+def compute_edges(iterations, is_interior):
+    """clk edges the engine spends in COMPUTE: one per iteration plus the
+    final check, or just the first cycle for a bailout."""
+    return np.where(is_interior, 1, np.asarray(iterations) + 1)
+
+
+def configs():
+    """(name, coord_width, frac_bits, escape counts at the 63 cap) per engine configuration."""
+    from chip import COORD_WIDTH as TOP_WIDTH, FRAC_BITS as TOP_FRAC, top_engine_grid
+    from fixed_point import COORD_WIDTH, FRAC_BITS, engine_model_grid
+
+    return (
+        ("tt_um_fractal", TOP_WIDTH, TOP_FRAC, lambda r, i: top_engine_grid(r, i, MAX_ITER_LIMIT)),
+        ("tb_engine", COORD_WIDTH, FRAC_BITS, lambda r, i: engine_model_grid(r, i, MAX_ITER_LIMIT)),
+    )
+
+
+def verify():
+    """every flagged c of every configuration reaches the 63 cap (so any lower
+    cap too). returns {name: (flagged, in-set, unsafe)}."""
+    report = {}
+    for name, width, frac, model in configs():
+        values = np.arange(-(1 << (width - 1)), 1 << (width - 1), dtype=np.int64)
+        c_real, c_imag = np.meshgrid(values, values)
+        in_set = model(c_real, c_imag) >= MAX_ITER_LIMIT
+        flagged = interior(c_real, c_imag, frac)
+        report[name] = (int(flagged.sum()), int(in_set.sum()), int((flagged & ~in_set).sum()))
+    return report
+
+
+def image_delta(view, uio_in):
+    """(pixels, results) of a tt_um_fractal frame of `view` that differ with
+    and without the bailout. results are compared by (row, tile) of their
+    first store; the pixels also count colours that land earlier or later."""
+    from chip import ChipModel
+
+    frames, results = [], []
+    for bailout in (True, False):
+        model = ChipModel(bailout=bailout)
+        model.params = view
+        frame = model.run_frame(0x80, uio_in)
+        edges = {store[0] for store in frame.tiles}
+        frames.append(frame)
+        results.append({(row, tile_x): it for edge, tile_x, row, it, _ in frame.tiles if edge - 1 not in edges})
+    pixels = int((frames[0].image != frames[1].image).any(axis=-1).sum())
+    changed = sum(results[0].get(key) != results[1].get(key) for key in results[0].keys() | results[1].keys())
+    return pixels, changed
+
+
+def main():
+    from chip import FRAC_BITS as TOP_FRAC, top_engine_grid
+    from colour import MAX_ITERATIONS
+    from scheduler import BENCH_VIEWS, tile_c
+
+    parser = argparse.ArgumentParser(description="interior-point bailout: safety check and latency saved")
+    parser.add_argument("--verify", action="store_true", help="exhaustive safety check of both engine configurations")
+    parser.add_argument("--max-iter", type=int, default=MAX_ITERATIONS)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    if args.verify:
+        for name, (flagged, in_set, unsafe) in verify().items():
+            print(f"[interior] {name}: {flagged} c flagged of {in_set} reaching {MAX_ITER_LIMIT}, {unsafe} unsafe")
+            assert unsafe == 0, f"{name}: {unsafe} flagged c escape before the cap"
+        # not a failure: quantifies what the bailout changes on screen
+        print(f"[interior] tt_um_fractal image with vs without bailout (c drifts during COMPUTE):")
+        print(f"{'view':<12} {'tile':>6} {'pixels':>7} {'results':>7}")
+        for view_name, view in BENCH_VIEWS.items():
+            for uio_in, (h_shift, v_shift) in STRIDE_PRESETS:
+                pixels, results = image_delta(view, uio_in)
+                print(f"{view_name:<12} {1 << h_shift:>3}x{1 << v_shift:<2} {pixels:>7} {results:>7}")
+    else:
+        # chip stride presets, c at each tile's top-left pixel
+        print(f"{'view':<12} {'tile':>6} {'bailouts':>8} {'mean edges':>14} {'frame edges':>19}")
+        for view_name, view in BENCH_VIEWS.items():
+            for _, (h_shift, v_shift) in STRIDE_PRESETS:
+                c_real, c_imag = tile_c(view, h_shift, v_shift)
+                iterations = top_engine_grid(c_real, c_imag, args.max_iter)
+                hits = interior(c_real, c_imag, TOP_FRAC)
+                before = compute_edges(iterations, False)
+                after = compute_edges(iterations, hits)
+                print(
+                    f"{view_name:<12} {1 << h_shift:>3}x{1 << v_shift:<2} {hits.mean():>8.1%} "
+                    f"{before.mean():>6.2f} -> {after.mean():<5.2f} {before.sum():>8} -> {after.sum():<8}"
+                )
+    print(f"[interior] {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
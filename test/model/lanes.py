@@ -0,0 +1,27 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# packed-bus helpers. wide testbench ports carry one fixed-width field per
+# lane (lane i in bits [i*width +: width]); these convert between such a bus
+# value (a python int, as cocotb reads and writes it) and a numpy array of
+# lanes without a python loop over the lanes.
+
+import numpy as np
+
+
+def pack_lanes(values, width):
+    """lane values (low `width` bits of each) -> bus integer, lane 0 in the lsbs."""
+    values = np.asarray(values, dtype=np.int64) & ((1 << width) - 1)
+    bits = ((values[:, None] >> np.arange(width)) & 1).astype(np.uint8).ravel()
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def unpack_lanes(value, count, width, signed=False):
+    """bus integer -> int64 array of `count` lanes of `width` bits."""
+    nbytes = (count * width + 7) // 8
+    raw = np.frombuffer(int(value).to_bytes(nbytes, "little"), dtype=np.uint8)
+    bits = np.unpackbits(raw, bitorder="little")[: count * width].reshape(count, width)
+    lanes = bits.astype(np.int64) @ (np.int64(1) << np.arange(width, dtype=np.int64))
+    if signed:
+        lanes = np.where(lanes >= 1 << (width - 1), lanes - (1 << width), lanes)
+    return lanes
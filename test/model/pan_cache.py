@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# incremental re-render cache for pan sequences. param_controller pans by
+# pan_step = 32 >> zoom, which at the chip's scale factor is a whole number of
+# pixels (8 at zoom <= 5), so the c-plane grid of a panned view is the old
+# grid shifted: c(view', u, v) == c(view, u + dx, v + dy). anything computed
+# per pixel from c is shifted the same way, so PanCache keeps the last grid
+# rendered at each zoom (keyed with the kernel's extra arguments) and turns a
+# pure translation into a copy of the overlap plus kernel calls for the
+# newly exposed strips. other views fall back to a full render; at most
+# max_entries grids are kept, least recently used evicted first.
+#
+# the kernel and the translation test come from the caller (model/chip.py):
+#   kernel(view, us, vs, *args) -> (len(vs), len(us)) array
+#   shift(old_view, new_view)   -> (dx, dy) in pixels, or None
+#
+# run from test/ for a long navigation check against the uncached chip model:
+#   python model/pan_cache.py
+#   python model/pan_cache.py --uio-in 0x04 --no-check
+
+import argparse
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class PanStats:
+    hits: int = 0        # same view as the cached grid
+    pans: int = 0        # translated cached grid, strips rendered
+    renders: int = 0     # full renders (nothing cached, or not a translation)
+    evictions: int = 0
+    points: int = 0      # pixels passed to the kernel
+
+
+class PanCache:
+    """last rendered grid per zoom level, reused across integer-pixel pans."""
+
+    def __init__(self, kernel, shift, width, height, max_entries=8):
+        self.kernel = kernel
+        self.shift = shift
+        self.width, self.height = width, height
+        self.max_entries = max_entries
+        self.stats = PanStats()
+        self._grids = OrderedDict()   # (zoom, *args) -> (view, grid)
+
+    def __len__(self):
+        return len(self._grids)
+
+    @property
+    def nbytes(self):
+        return sum(grid.nbytes for _, grid in self._grids.values())
+
+    def _render(self, view, us, vs, args):
+        self.stats.points += len(us) * len(vs)
+        return self.kernel(view, us, vs, *args)
+
+    def grid(self, view, *args):
+        """(height, width) kernel output for view; treat it as read-only."""
+        key = (view.zoom_level, *args)
+        cached = self._grids.get(key)
+        offset = None if cached is None else self.shift(cached[0], view)
+
+        if offset == (0, 0):
+            self.stats.hits += 1
+            grid = cached[1]
+        elif offset is not None and abs(offset[0]) < self.width and abs(offset[1]) < self.height:
+            self.stats.pans += 1
+            grid = self._pan(cached[1], view, offset, args)
+        else:
+            self.stats.renders += 1
+            grid = self._render(view, np.arange(self.width), np.arange(self.height), args)
+
+        self._grids[key] = (view, grid)
+        self._grids.move_to_end(key)
+        while len(self._grids) > self.max_entries:
+            self._grids.popitem(last=False)
+            self.stats.evictions += 1
+        return grid
+
+    def _pan(self, old, view, offset, args):
+        """new[v, u] = old[v + dy, u + dx] where that exists, the kernel elsewhere."""
+        dx, dy = offset
+        u0, u1 = max(0, -dx), min(self.width, self.width - dx)
+        v0, v1 = max(0, -dy), min(self.height, self.height - dy)
+        grid = np.empty_like(old)
+        grid[v0:v1, u0:u1] = old[v0 + dy:v1 + dy, u0 + dx:u1 + dx]
+
+        columns, rows = np.arange(self.width), np.arange(self.height)
+        if v0 > 0:
+            grid[:v0] = self._render(view, columns, rows[:v0], args)
+        if v1 < self.height:
+            grid[v1:] = self._render(view, columns, rows[v1:], args)
+        if u0 > 0:
+            grid[v0:v1, :u0] = self._render(view, columns[:u0], rows[v0:v1], args)
+        if u1 < self.width:
+            grid[v0:v1, u1:] = self._render(view, columns[u1:], rows[v0:v1], args)
+        return grid
+
+
+def navigation(frames):
+    """ui_in per frame of a long navigation: pans in every direction at a few
+    zoom levels, with zoom changes and a reset in between."""
+    pans = (0x88, 0x88, 0xA0, 0x84, 0x84, 0x84, 0x90, 0x88)
+    script = []
+    while len(script) < frames:
+        for zoom in (0x81, 0x81, 0x81, 0x82, 0x81, 0x81):
+            script += [*pans, zoom]
+        script += [0xC0, 0x80]
+    return script[:frames]
+
+
+def main():
+    from chip import ChipModel
+
+    parser = argparse.ArgumentParser(description="pan cache: long navigation vs the uncached chip model")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--uio-in", type=lambda v: int(v, 0), default=0x04)
+    parser.add_argument("--no-check", dest="check", action="store_false", help="skip the uncached model")
+    args = parser.parse_args()
+
+    script = navigation(args.frames)
+    cached = ChipModel()
+    start = time.monotonic()
+    frames = [cached.run_frame(ui_in, args.uio_in) for ui_in in script]
+    elapsed = time.monotonic() - start
+    s = cached.grids.stats
+    print(
+        f"[pan_cache] {len(script)} frames in {elapsed:.2f}s: {s.hits} hits, {s.pans} pans, {s.renders} renders, "
+        f"{s.evictions} evictions, {s.points / len(script):.0f} pixels rendered per frame, "
+        f"{len(cached.grids)} grids / {cached.grids.nbytes >> 10} KiB kept"
+    )
+
+    if args.check:
+        reference = ChipModel(cached=False)
+        start = time.monotonic()
+        for ui_in, frame in zip(script, frames):
+            expected = reference.run_frame(ui_in, args.uio_in)
+            assert np.array_equal(frame.uo_out, expected.uo_out), f"frame {frame.index} differs from the uncached model"
+            assert frame.tiles == expected.tiles, f"frame {frame.index}: tile stores differ from the uncached model"
+        print(f"[pan_cache] uncached model: {time.monotonic() - start:.2f}s, every frame identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# reporting for the simulation-only perf counters in tt_um_fractal (compiled
+# in with -DPERF_COUNTERS, which the rtl targets of the Makefile set).
+# PerfMonitor wakes once per frame when perf_frames advances, reads the
+# per-frame snapshot, logs it and keeps it. check() fails the test on any
+# deadline miss: a tile launched while the engine was not IDLE (computing
+# or holding the previous result in DONE), whose result then lands in the
+# wrong tile.
+
+from dataclasses import dataclass, asdict
+
+import cocotb
+from cocotb.triggers import Edge, ReadOnly
+
+FRAME_CLK_CYCLES = 2 * 800 * 525
+
+COUNTERS = ("busy_cycles", "launched", "completed", "deadline_misses", "max_latency")
+
+
+@dataclass
+class FramePerf:
+    frame: int                # frames since reset, 0 = the first one
+    busy_cycles: int          # clk cycles with the engine out of IDLE
+    launched: int             # start_computation pulses
+    completed: int            # computation_done pulses
+    deadline_misses: int      # launches that found the engine out of IDLE
+    max_latency: int          # clk edges from engine start to result_valid
+
+    @property
+    def utilisation(self):
+        return self.busy_cycles / FRAME_CLK_CYCLES
+
+    def summary(self):
+        return (
+            f"frame {self.frame}: launched={self.launched} completed={self.completed} "
+            f"misses={self.deadline_misses} max_latency={self.max_latency} "
+            f"busy={self.busy_cycles} ({self.utilisation:.2%})"
+        )
+
+
+def has_perf_counters(top):
+    """true when the design was compiled with PERF_COUNTERS."""
+    try:
+        top.perf_frames
+    except AttributeError:
+        return False
+    return True
+
+
+def read_frame_perf(top):
+    """the last completed frame's counters (`top` is the tt_um_fractal instance)."""
+    values = {name: getattr(top, f"perf_{name}_frame").value.integer for name in COUNTERS}
+    return FramePerf(frame=top.perf_frames.value.integer - 1, **values)
+
+
+class PerfMonitor:
+    """logs and collects FramePerf for every frame that finishes while running."""
+
+    def __init__(self, top, log):
+        self.top = top
+        self.log = log
+        self.frames = []
+        self._task = None
+
+    def start(self):
+        if not has_perf_counters(self.top):
+            self.log.warning("design built without PERF_COUNTERS; no perf telemetry")
+            return self
+        self._task = cocotb.start_soon(self._run())
+        return self
+
+    def stop(self):
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await Edge(self.top.perf_frames)
+            await ReadOnly()
+            perf = read_frame_perf(self.top)
+            self.frames.append(perf)
+            self.log.info(f"[perf] {perf.summary()}")
+
+    def check(self, allow_misses=False):
+        """stop monitoring; assert no frame missed a tile deadline."""
+        self.stop()
+        missed = [perf for perf in self.frames if perf.deadline_misses]
+        assert allow_misses or not missed, (
+            f"{sum(p.deadline_misses for p in missed)} tile deadline miss(es) in "
+            f"{len(missed)} frame(s): " + "; ".join(p.summary() for p in missed)
+        )
+        return [asdict(perf) for perf in self.frames]
@@ -0,0 +1,56 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# packed probe word exposed by tb_png and tb_mandelbrot. the wrappers
+# concatenate the top-level state a monitor needs into one 64-bit `probe`
+# port, so a monitor samples everything with a single handle read per cycle
+# and decodes it here. PROBE_FIELDS is lsb first and must match the
+# assignment in both wrappers.
+
+from collections import namedtuple
+
+import numpy as np
+
+PROBE_FIELDS = (
+    ("uo_out", 8),
+    ("pixel_x", 10),
+    ("pixel_y", 10),
+    ("vga_active", 1),
+    ("frame_start", 1),
+    ("clk_25mhz", 1),
+    ("start_computation", 1),
+    ("computation_done", 1),
+    ("launched_tile_x", 6),
+    ("tile_x_index", 6),
+    ("iteration_count", 6),
+    ("engine_busy", 1),
+    ("zoom_level", 8),
+)
+PROBE_WIDTH = 64
+
+Probe = namedtuple("Probe", [name for name, _ in PROBE_FIELDS])
+
+_SLICES = []
+_offset = 0
+for _name, _width in PROBE_FIELDS:
+    _SLICES.append((_offset, (1 << _width) - 1))
+    _offset += _width
+assert _offset <= PROBE_WIDTH, "probe fields overflow the probe word"
+del _name, _width
+
+
+def decode_probe(value):
+    """one probe sample (python int) -> Probe of ints."""
+    return Probe(*[(value >> offset) & mask for offset, mask in _SLICES])
+
+
+def decode_probes(values):
+    """many probe samples -> Probe of uint64 arrays, for monitors that store
+    raw words per cycle and decode once at the end."""
+    values = np.asarray(values, dtype=np.uint64)
+    return Probe(*[(values >> np.uint64(offset)) & np.uint64(mask) for offset, mask in _SLICES])
+
+
+def read_probe(dut):
+    """sample and decode the wrapper's probe port (one handle read)."""
+    return decode_probe(dut.probe.value.integer)
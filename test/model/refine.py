@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# progressive refinement (uio_in[4] of a tt_um_fractal built with REFINE;
+# the shipped top leaves it out) as seen by a viewer. the chip has no
+# frame store, so each frame still shows one colour per tile; what refines is
+# the average over successive static frames (a camera exposure, the eye,
+# or a capture tool), since every frame samples the tiles at a different
+# sub-tile position. predict() runs the chip model for N frames and returns
+# the running mean, and convergence() scores it against the supersampled
+# image the refinement approaches: every tile filled with the mean colour of
+# its pixels.
+#
+# run from test/:
+#   python model/refine.py                      # error after 1..16 frames, 32x8 tiles
+#   python model/refine.py --uio-in 0x10 --frames 32
+
+import argparse
+import time
+
+import numpy as np
+
+from chip import REFINE_STEPS, ChipModel, H_ACTIVE, V_ACTIVE, reference_grid, stride_shifts
+from colour import MAX_ITERATIONS, colour_map
+
+REFINE = 0x10  # uio_in bit
+
+
+def predict(ui_in, uio_in, frames, restart=True):
+    """the `frames` frames after the first one from reset, and their running
+    means. with restart, reset_view is held for the first of them, so the
+    refinement pattern starts at step 0. returns (model frames, running means)."""
+    model = ChipModel(refine=True)
+    model.run_frame(ui_in, uio_in)
+    shown = [model.run_frame(ui_in | (0x40 if restart and n == 0 else 0), uio_in) for n in range(frames)]
+    images = np.stack([frame.image for frame in shown]).astype(np.float64)
+    return shown, np.cumsum(images, axis=0) / np.arange(1, frames + 1)[:, None, None, None]
+
+
+def reference_image(params, uio_in, max_iter=MAX_ITERATIONS):
+    """supersampled image of a view: per-pixel colours at fixed c, averaged
+    over each tile of the uio_in stride preset."""
+    iterations = reference_grid(params, max_iter)
+    pixels = np.stack(colour_map(iterations, uio_in & 3, iterations >= max_iter), axis=-1).astype(np.float64)
+    hs, vs = stride_shifts(uio_in)
+    tiles = pixels.reshape(V_ACTIVE >> vs, 1 << vs, H_ACTIVE >> hs, 1 << hs, 3).mean(axis=(1, 3))
+    return np.repeat(np.repeat(tiles, 1 << vs, axis=0), 1 << hs, axis=1)
+
+
+def convergence(means, reference, mask=None):
+    """mean absolute channel error of each running mean against the reference
+    (optionally only at mask), one value per frame count."""
+    if mask is not None:
+        means, reference = means[:, mask], reference[mask]
+    return np.abs(means - reference).mean(axis=tuple(range(1, means.ndim)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="progressive refinement: frame-average error vs frame count")
+    parser.add_argument("--ui-in", type=lambda v: int(v, 0), default=0x80)
+    parser.add_argument("--uio-in", type=lambda v: int(v, 0), default=0x14)
+    parser.add_argument("--frames", type=int, default=REFINE_STEPS)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    shown, means = predict(args.ui_in, args.uio_in, args.frames)
+    reference = reference_image(shown[0].params, args.uio_in)
+    errors = convergence(means, reference)
+
+    print(f"[refine] ui_in=0x{args.ui_in:02x} uio_in=0x{args.uio_in:02x} refine={'on' if args.uio_in & REFINE else 'off'}")
+    for n, (frame, error) in enumerate(zip(shown, errors), start=1):
+        print(f"  {n:>3} frame(s)  step {frame.refine_step:>2}  mean |error| {error:.4f}")
+    print(f"[refine] {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# reference renderer for the fixed-point engine (calculate_complex_c /
+# engine_model semantics, tb_engine configuration). renders every pixel
+# rather than one per chip tile, optionally at --scale x 640x480, with the
+# mandelbrot_colour_mapper model, and writes one png per view.
+#
+# c is an 11-bit fixed-point pair, so the whole engine output is a
+# 2048 x 2048 table per iteration cap. the table is split into c-plane tiles
+# that are rendered across a process pool on first use and cached under
+# test/.cache/render/ keyed by the model parameters; a view is then a
+# gather from the cached tiles, so a zoom path of hundreds of views costs
+# little more than writing the pngs.
+#
+# run from test/:
+#   python model/render.py --view=-16384,0,2 --out render
+#   python model/render.py --path=-16384,0,0:-24000,3000,10 --steps 300 --out zoom
+
+import argparse
+import hashlib
+import inspect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from fixed_point import COORD_WIDTH, FRAC_BITS, SCREEN_CENTER_X, SCREEN_CENTER_Y, engine_model_grid, wrap
+from colour import colour_map
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "render"
+PLANE = 1 << COORD_WIDTH   # distinct fixed-point values per axis
+TILE = 128                 # c-plane tile edge
+
+
+def c_axis(coords, center, zoom_level, screen_center, scale):
+    """calculate_complex_c along one axis for output pixel coordinates at
+    `scale` output pixels per screen pixel (a power of two). scale = 1 is
+    exactly the bench mapping; larger scales keep log2(scale) extra bits of
+    pixel offset before the same truncation."""
+    extra = scale.bit_length() - 1
+    scale_factor = (1 << FRAC_BITS) >> min(zoom_level, 15)
+    temp = (np.asarray(coords, dtype=np.int64) - screen_center * scale) * scale_factor
+    c = (wrap(center, 16) >> 5) + (wrap(temp, 22 + extra) >> (5 + extra))
+    return wrap(c, COORD_WIDTH)
+
+
+def model_version():
+    src = inspect.getsource(engine_model_grid) + inspect.getsource(wrap)
+    return hashlib.sha256(f"{COORD_WIDTH}/{FRAC_BITS}/{src}".encode()).hexdigest()[:12]
+
+
+def tile_path(tile, max_iter_limit, version):
+    return CACHE_DIR / f"{version}_iter{max_iter_limit}_{tile[0]}_{tile[1]}.npy"
+
+
+def render_tile(job):
+    """worker: iteration counts for one c-plane tile (imag block, real block)."""
+    tile, max_iter_limit, version = job
+    offset = -(PLANE // 2)
+    c_real = np.arange(tile[1] * TILE, (tile[1] + 1) * TILE) + offset
+    c_imag = np.arange(tile[0] * TILE, (tile[0] + 1) * TILE) + offset
+    counts = engine_model_grid(c_real[None, :], c_imag[:, None], max_iter_limit).astype(np.uint8)
+    path = tile_path(tile, max_iter_limit, version)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp.npy")
+    np.save(tmp, counts)
+    os.replace(tmp, path)  # atomic, so a concurrent run never sees half a tile
+    return tile
+
+
+class Plane:
+    """lazily filled 2048 x 2048 engine_model table for one iteration cap."""
+
+    def __init__(self, max_iter_limit, workers=None):
+        self.max_iter_limit = max_iter_limit
+        self.workers = workers
+        self.version = model_version()
+        self.counts = np.zeros((PLANE, PLANE), dtype=np.uint8)
+        self.loaded = np.zeros((PLANE // TILE, PLANE // TILE), dtype=bool)
+        self.rendered = self.cached = 0
+
+    def prefetch(self, views, scale=1):
+        """load or render every tile the views touch, in one pool pass."""
+        wanted = set()
+        for view in views:
+            c_real, c_imag = view_axes(view, scale)
+            rows = np.unique((c_imag + PLANE // 2) // TILE)
+            cols = np.unique((c_real + PLANE // 2) // TILE)
+            wanted.update((int(r), int(c)) for r in rows for c in cols if not self.loaded[r, c])
+
+        missing = []
+        for tile in sorted(wanted):
+            path = tile_path(tile, self.max_iter_limit, self.version)
+            if path.exists():
+                self._place(tile, np.load(path))
+                self.cached += 1
+            else:
+                missing.append(tile)
+        if not missing:
+            return
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        jobs = [(tile, self.max_iter_limit, self.version) for tile in missing]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for tile in pool.map(render_tile, jobs):
+                self._place(tile, np.load(tile_path(tile, self.max_iter_limit, self.version)))
+                self.rendered += 1
+
+    def _place(self, tile, counts):
+        r, c = tile
+        self.counts[r * TILE:(r + 1) * TILE, c * TILE:(c + 1) * TILE] = counts
+        self.loaded[r, c] = True
+
+    def render(self, view, scale=1):
+        """iteration counts for one view."""
+        self.prefetch([view], scale)
+        c_real, c_imag = view_axes(view, scale)
+        return self.counts[(c_imag + PLANE // 2)[:, None], (c_real + PLANE // 2)[None, :]]
+
+
+def view_axes(view, scale=1):
+    return (
+        c_axis(np.arange(640 * scale), view["center_x"], view["zoom_level"], SCREEN_CENTER_X, scale),
+        c_axis(np.arange(480 * scale), view["center_y"], view["zoom_level"], SCREEN_CENTER_Y, scale),
+    )
+
+
+def colour_lut(colour_mode, max_iter_limit):
+    """8-bit rgb per iteration count through the colour mapper model."""
+    counts = np.arange(256)
+    red, green, blue = colour_map(counts, colour_mode, counts >= max_iter_limit)
+    return (np.stack([red, green, blue], axis=-1) * 85).astype(np.uint8)
+
+
+def parse_view(text, max_iter_limit):
+    """'center_x,center_y,zoom' in bench units (signed 16-bit centres)."""
+    cx, cy, zoom = (int(v) for v in text.split(","))
+    return {"center_x": cx & 0xFFFF, "center_y": cy & 0xFFFF, "zoom_level": zoom, "max_iter_limit": max_iter_limit}
+
+
+def zoom_path(start, end, steps):
+    """linear centre path with the zoom level stepping evenly between the ends."""
+    views = []
+    for i in range(steps):
+        t = i / max(steps - 1, 1)
+        view = dict(start)
+        for key in ("center_x", "center_y"):
+            a, b = wrap(start[key], 16), wrap(end[key], 16)
+            view[key] = int(round(a + (b - a) * t)) & 0xFFFF
+        view["zoom_level"] = int(round(start["zoom_level"] + (end["zoom_level"] - start["zoom_level"]) * t))
+        views.append(view)
+    return views
+
+
+def main():
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(description="multi-core reference renderer for the fixed-point engine")
+    parser.add_argument("--view", action="append", default=[], help="center_x,center_y,zoom (repeatable)")
+    parser.add_argument("--path", help="start:end views, each center_x,center_y,zoom")
+    parser.add_argument("--steps", type=int, default=100, help="views along --path")
+    parser.add_argument("--max-iter", type=int, default=63)
+    parser.add_argument("--colour-mode", type=int, default=1)
+    parser.add_argument("--scale", type=int, default=1, choices=(1, 2, 4, 8), help="output pixels per screen pixel")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", type=Path, default=Path("render"))
+    args = parser.parse_args()
+
+    views = [parse_view(v, args.max_iter) for v in args.view]
+    if args.path:
+        start, end = (parse_view(v, args.max_iter) for v in args.path.split(":"))
+        views += zoom_path(start, end, args.steps)
+    if not views:
+        parser.error("nothing to render: give --view and/or --path")
+
+    start_time = time.monotonic()
+    plane = Plane(args.max_iter, args.workers)
+    plane.prefetch(views, args.scale)
+    args.out.mkdir(parents=True, exist_ok=True)
+    lut = colour_lut(args.colour_mode, args.max_iter)
+    for n, view in enumerate(views):
+        Image.fromarray(lut[plane.render(view, args.scale)], "RGB").save(args.out / f"view_{n:04d}.png", compress_level=1)
+    elapsed = time.monotonic() - start_time
+    print(
+        f"[render] {len(views)} view(s) at {640 * args.scale}x{480 * args.scale} in {elapsed:.2f}s, "
+        f"c-plane tiles: {plane.rendered} rendered, {plane.cached} from cache -> {args.out}/"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# architectural model of a multi-engine tile renderer (src/tile_scheduler.sv)
+# and the stride benchmark built on it.
+#
+# tt_um_fractal computes one tile per macroblock as the beam reaches it, with
+# a single engine, which is why tiles are 64x16 .. 32x8. the prototype instead
+# computes macroblock row r+1 while row r is on screen: tile jobs (c latched
+# from the tile's top-left pixel) go to K engines through a dispatcher, each
+# engine parks its result in a small buffer, and one write port per clk moves
+# results into the back tile line, which swaps in when the beam starts row
+# r+1. a row meets its deadline if its last result is written by then.
+#
+# per tile an engine is occupied for its COMPUTE edges (iterations + 1, or 1
+# for an interior bailout, see model/interior.py) + OCCUPANCY_OVERHEAD clk
+# edges from the dispatch edge (start pulse, IDLE->COMPUTE, DONE) and the
+# result can be written WRITE_DELAY + COMPUTE edges after dispatch. any work-conserving write arbiter gives the same last-write
+# edge, so row makespans here are exact for tile_scheduler.sv while its
+# buffers have room.
+#
+# run from test/:
+#   python model/scheduler.py                   # finest stride for K = 1..8
+#   python model/scheduler.py --policy round-robin --engines 1 2 4
+#   python model/scheduler.py --no-bailout      # engine without INTERIOR_CHECK
+
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from chip import FRAC_BITS, H_ACTIVE, H_TOTAL, V_ACTIVE, V_TOTAL, ViewParams, reference_grid, top_c
+from colour import MAX_ITERATIONS
+from interior import compute_edges, interior
+
+POLICIES = ("earliest-free", "round-robin")
+
+# rtl timing of tile_scheduler.sv, in clk edges from the dispatch edge
+OCCUPANCY_OVERHEAD = 2
+WRITE_DELAY = 3
+
+LINE_EDGES = 2 * H_TOTAL   # one vga line at 25 mhz, in 50 mhz clk edges
+
+# benchmark views: the default view, two zoomed boundary views and a view
+# that is almost all in-set (every tile runs to the iteration cap)
+BENCH_VIEWS = {
+    "default": ViewParams(),
+    "seahorse_z3": ViewParams(centre_x=-48, centre_y=-6, zoom_level=3),
+    "spiral_z5": ViewParams(centre_x=-47, centre_y=-7, zoom_level=5),
+    "cardioid_z6": ViewParams(centre_x=-16, centre_y=0, zoom_level=6),
+}
+
+
+def strides():
+    """every (h_shift, v_shift) the benchmark considers, finest area first."""
+    pairs = [(hs, vs) for hs in range(7) for vs in range(5)]
+    return sorted(pairs, key=lambda s: (s[0] + s[1], max(s), s[0]))
+
+
+def tile_c(view, h_shift, v_shift):
+    """(rows, tiles per row) fixed-point c, taken at each tile's top-left pixel."""
+    xs = np.arange(0, H_ACTIVE, 1 << h_shift)
+    ys = np.arange(0, V_ACTIVE, 1 << v_shift)
+    return top_c(xs[None, :], ys[:, None], view.centre_x, view.centre_y, view.zoom_level)
+
+
+def tile_iterations(view, h_shift, v_shift, max_iter=MAX_ITERATIONS, bailout=True):
+    """(iteration counts, COMPUTE edges) per tile, with or without the
+    engine's interior bailout."""
+    c_real, c_imag = tile_c(view, h_shift, v_shift)
+    iterations = reference_grid(view, max_iter)[::1 << v_shift, ::1 << h_shift]
+    return iterations, compute_edges(iterations, bailout & interior(c_real, c_imag, FRAC_BITS))
+
+
+def row_budgets(rows, v_shift):
+    """clk edges each macroblock row has: row r is computed while row r-1 is
+    displayed; row 0 during vertical blanking."""
+    budget = np.full(rows, LINE_EDGES << v_shift, dtype=np.int64)
+    budget[0] = (V_TOTAL - V_ACTIVE) * LINE_EDGES
+    return budget
+
+
+def schedule_rows(compute, engines, policy="earliest-free"):
+    """dispatch every row's tiles (COMPUTE edges per tile) in order onto `engines` engines, all rows at
+    once. returns per-row makespan (edges from the first dispatch to the last
+    write, inclusive) and the most results ever waiting for the write port."""
+    rows, tiles = compute.shape
+    occupancy = compute.astype(np.int64) + OCCUPANCY_OVERHEAD
+    free = np.zeros((rows, engines), dtype=np.int64)     # first edge each engine can take a job
+    last_dispatch = np.full(rows, -1, dtype=np.int64)
+    ready = np.empty((rows, tiles), dtype=np.int64)
+    row_index = np.arange(rows)
+
+    for j in range(tiles):
+        if policy == "earliest-free":
+            engine = np.argmin(free, axis=1)
+        elif policy == "round-robin":
+            engine = np.full(rows, j % engines)
+        else:
+            raise ValueError(f"unknown policy {policy!r}")
+        # one dispatch per edge, in tile order (head-of-line blocking)
+        dispatch = np.maximum(last_dispatch + 1, free[row_index, engine])
+        free[row_index, engine] = dispatch + occupancy[:, j]
+        ready[:, j] = dispatch + WRITE_DELAY + compute[:, j]
+        last_dispatch = dispatch
+
+    # one write per edge: the i-th write lands at i + cummax(r_i - i)
+    ready.sort(axis=1)
+    slot = np.arange(tiles)
+    writes = slot + np.maximum.accumulate(ready - slot, axis=1)
+    # results already ready (including this one) at each write, minus those written
+    backlog = max(int((np.searchsorted(r, w, side="right") - slot).max()) for r, w in zip(ready, writes))
+    return writes[:, -1] + 1, backlog
+
+
+@dataclass
+class StrideResult:
+    engines: int
+    policy: str
+    h_shift: int
+    v_shift: int
+    meets: bool
+    worst_slack: int         # min over rows and views of budget - makespan
+    worst_utilisation: float # max over rows and views of makespan / budget
+    max_backlog: int         # most results buffered for the write port
+
+    @property
+    def tile(self):
+        return f"{1 << self.h_shift}x{1 << self.v_shift}"
+
+    @property
+    def tiles_per_frame(self):
+        return (H_ACTIVE >> self.h_shift) * (V_ACTIVE >> self.v_shift)
+
+    @property
+    def tile_line_bits(self):
+        """front + back tile line, 6 bits of rgb per tile."""
+        return 2 * (H_ACTIVE >> self.h_shift) * 6
+
+
+def evaluate(engines, h_shift, v_shift, policy="earliest-free", views=None, max_iter=MAX_ITERATIONS,
+             bailout=True, cache=None):
+    """one stride for one engine count across the benchmark views."""
+    views = BENCH_VIEWS if views is None else views
+    slack, utilisation, backlog = None, 0.0, 0
+    for name, view in views.items():
+        key = (name, h_shift, v_shift, max_iter, bailout)
+        if cache is not None and key in cache:
+            compute = cache[key]
+        else:
+            _, compute = tile_iterations(view, h_shift, v_shift, max_iter, bailout)
+            if cache is not None:
+                cache[key] = compute
+        makespan, row_backlog = schedule_rows(compute, engines, policy)
+        budget = row_budgets(len(makespan), v_shift)
+        row_slack = int((budget - makespan).min())
+        slack = row_slack if slack is None else min(slack, row_slack)
+        utilisation = max(utilisation, float((makespan / budget).max()))
+        backlog = max(backlog, row_backlog)
+    return StrideResult(engines, policy, h_shift, v_shift, slack >= 0, slack, utilisation, backlog)
+
+
+def finest_stride(engines, policy="earliest-free", views=None, max_iter=MAX_ITERATIONS, bailout=True, cache=None):
+    """the first stride in strides() order that meets every row deadline."""
+    for h_shift, v_shift in strides():
+        result = evaluate(engines, h_shift, v_shift, policy, views, max_iter, bailout, cache)
+        if result.meets:
+            return result
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="finest tile stride per engine count for the multi-engine scheduler")
+    parser.add_argument("--engines", type=int, nargs="+", default=list(range(1, 9)))
+    parser.add_argument("--policy", choices=POLICIES + ("both",), default="both")
+    parser.add_argument("--max-iter", type=int, default=MAX_ITERATIONS)
+    parser.add_argument("--view", choices=sorted(BENCH_VIEWS), action="append", help="restrict to these views")
+    parser.add_argument("--no-bailout", dest="bailout", action="store_false", help="engines without the interior bailout")
+    args = parser.parse_args()
+
+    views = {name: BENCH_VIEWS[name] for name in args.view} if args.view else BENCH_VIEWS
+    policies = POLICIES if args.policy == "both" else (args.policy,)
+    cache = {}
+    start = time.monotonic()
+
+    print(f"[scheduler] views: {', '.join(views)}; max_iter={args.max_iter}; bailout={args.bailout}")
+    print(f"{'policy':<14} {'K':>2} {'tile':>6} {'tiles/frame':>11} {'utilisation':>11} {'slack':>7} {'backlog':>7} {'line bits':>9}")
+    for policy in policies:
+        for engines in args.engines:
+            result = finest_stride(engines, policy, views, args.max_iter, args.bailout, cache)
+            if result is None:
+                print(f"{policy:<14} {engines:>2}   none")
+                continue
+            print(
+                f"{policy:<14} {engines:>2} {result.tile:>6} {result.tiles_per_frame:>11} "
+                f"{result.worst_utilisation:>11.1%} {result.worst_slack:>7} {result.max_backlog:>7} "
+                f"{result.tile_line_bits:>9}"
+            )
+    print(f"[scheduler] {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# per-test budget watchdog for long cocotb tests. a test declares how many
+# simulated clk cycles and wall-clock seconds it may use and the slowest
+# progress rate it tolerates (pixels/s, transactions/s, ...), and calls
+# tick() as it makes progress. the watchdog logs the rate every REPORT_S
+# seconds and fails the test as soon as a budget runs out or the rate over
+# the last report interval drops below the floor, with a snapshot of the
+# test's state in the message. a poll task woken every POLL_CYCLES simulated
+# cycles does the same checks, so a test stuck waiting on an edge that never
+# comes fails too.
+#
+# environment:
+#   WATCHDOG=0           disable (budgets are only logged)
+#   WATCHDOG_SCALE=4     multiply every budget (and divide every rate floor),
+#                        e.g. for gate-level runs or a slow machine
+#   WATCHDOG_REPORT_S=N  progress log interval in wall seconds
+
+import os
+import time
+
+import cocotb
+from cocotb.triggers import Timer
+from cocotb.utils import get_sim_time
+
+REPORT_S = float(os.getenv("WATCHDOG_REPORT_S", "30"))
+POLL_CYCLES = 50_000
+CHECK_EVERY = 256     # ticks between checks from tick()
+
+
+class WatchdogError(AssertionError):
+    """a budget ran out or progress fell below its floor."""
+
+
+class Watchdog:
+    def __init__(self, dut, name, clk_period_ns, unit="items", max_cycles=None, max_wall_s=None,
+                 min_rate=None, snapshot=None):
+        scale = float(os.getenv("WATCHDOG_SCALE", "1"))
+        self.log = dut._log
+        self.name = name
+        self.period_ns = clk_period_ns
+        self.unit = unit
+        self.max_cycles = None if max_cycles is None else int(max_cycles * scale)
+        self.max_wall_s = None if max_wall_s is None else max_wall_s * scale
+        self.min_rate = None if min_rate is None else min_rate / scale
+        self.snapshot = snapshot
+        self.enabled = os.getenv("WATCHDOG", "1") != "0"
+        self.items = 0
+        self._task = None
+
+    def start(self):
+        self._wall0 = self._last_wall = time.monotonic()
+        self._sim0 = get_sim_time("ns")
+        self._last_items = 0
+        self._next_check = CHECK_EVERY
+        self._task = cocotb.start_soon(self._poll())
+        return self
+
+    def stop(self):
+        """stop polling and log the final rate."""
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+        cycles, wall = self._elapsed()
+        self.log.info(f"[watchdog] {self.name}: {self.items} {self.unit} in {cycles} cycles, {wall:.1f}s "
+                      f"({self.items / max(wall, 1e-9):.0f} {self.unit}/s)")
+
+    def tick(self, n=1):
+        self.items += n
+        if self.items >= self._next_check:
+            self._next_check = self.items + CHECK_EVERY
+            self.check()
+
+    def _elapsed(self):
+        return int((get_sim_time("ns") - self._sim0) // self.period_ns), time.monotonic() - self._wall0
+
+    def check(self, polling=False):
+        cycles, wall = self._elapsed()
+        if self.max_cycles is not None and cycles > self.max_cycles:
+            self._fail(f"cycle budget of {self.max_cycles} exceeded", cycles, wall, polling)
+        if self.max_wall_s is not None and wall > self.max_wall_s:
+            self._fail(f"wall budget of {self.max_wall_s:.0f}s exceeded", cycles, wall, polling)
+
+        now = time.monotonic()
+        if now - self._last_wall >= REPORT_S:
+            rate = (self.items - self._last_items) / (now - self._last_wall)
+            self.log.info(
+                f"[watchdog] {self.name}: {self.items} {self.unit}, {cycles} cycles, {wall:.0f}s, "
+                f"{rate:.0f} {self.unit}/s over the last {now - self._last_wall:.0f}s"
+            )
+            self._last_wall, self._last_items = now, self.items
+            if self.min_rate is not None and rate < self.min_rate:
+                self._fail(f"{rate:.1f} {self.unit}/s is below the floor of {self.min_rate:.1f}", cycles, wall, polling)
+
+    def _fail(self, reason, cycles, wall, polling):
+        message = f"[watchdog] {self.name}: {reason} after {cycles} cycles, {wall:.1f}s, {self.items} {self.unit}"
+        if self.snapshot is not None:
+            message += f"; snapshot: {self.snapshot()}"
+        if not self.enabled:
+            self.log.warning(message + " (WATCHDOG=0, continuing)")
+            self.max_cycles = self.max_wall_s = self.min_rate = None
+            return
+        # raised in the poll task, the exception ends the task and fails the test
+        if self._task is not None and not polling:
+            self._task.kill()
+        self._task = None
+        raise WatchdogError(message)
+
+    async def _poll(self):
+        while True:
+            await Timer(POLL_CYCLES * self.period_ns, units="ns")
+            self.check(polling=True)
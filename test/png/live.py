@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# live view of a running simulation. every LIVE_SAMPLE_RATE-th pixel of each
+# frame is sampled at its beam time (beam.py) and rendered straight into the
+# next slot of a shared-memory frame ring (model/frame_ring.py), which
+# png/viewer.py displays. the capture never waits for the viewer; frames it
+# is too slow for are dropped on its side. key presses come back through the
+# ring as (ui_in pulse, uio_in) commands, drained once per frame: the pulse
+# bits (zoom, pan, reset_view) are held over the next v_begin, where
+# param_controller samples them, and uio_in (colour mode, stride) switches on
+# that edge.
+#
+# runs until the viewer quits, or for LIVE_FRAMES frames (0: no limit).
+# To run (in either order; the viewer waits for the ring):
+#   python png/viewer.py &
+#   make tb-png-live
+
+import os
+import time
+from itertools import count
+
+import numpy as np
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, RisingEdge
+
+from beam import grid, sample_frame
+from colour import unpack_uo_out
+from frame_ring import FrameRing
+
+SHM_NAME = os.getenv("LIVE_SHM", "tt_fractal_live")
+SAMPLE_RATE = int(os.getenv("LIVE_SAMPLE_RATE", "4"))
+LIVE_FRAMES = int(os.getenv("LIVE_FRAMES", "0"))
+UI_IN = 0b10000000  # enable
+
+
+async def apply_at_v_begin(dut, pulse, uio_in):
+    """hold the pulse bits over the next v_begin and switch uio_in on it."""
+    dut.ui_in.value = UI_IN | pulse
+    await RisingEdge(dut.v_begin)
+    dut.uio_in.value = uio_in
+    await ClockCycles(dut.clk, 4)
+    dut.ui_in.value = UI_IN
+
+
+@cocotb.test()
+async def test_live_view(dut):
+    """stream frames to the live viewer and apply its key presses."""
+    clock = Clock(dut.clk, 20, units="ns")
+    cocotb.start_soon(clock.start())
+
+    dut.ena.value = 1
+    dut.rst_n.value = 0
+    dut.ui_in.value = UI_IN
+    dut.uio_in.value = 0
+    await ClockCycles(dut.clk, 5)
+    dut.rst_n.value = 1
+
+    coords = grid(640, 480, SAMPLE_RATE)
+    width, height = 640 // SAMPLE_RATE, 480 // SAMPLE_RATE
+    ring = FrameRing.create(SHM_NAME, width, height)
+    dut._log.info(f"live: {width}x{height} frames in shared memory {SHM_NAME!r}; start png/viewer.py")
+
+    uio_in = 0
+    try:
+        for n in count() if LIVE_FRAMES == 0 else range(LIVE_FRAMES):
+            if ring.closed:
+                dut._log.info("live: viewer closed")
+                break
+            pulse = 0
+            for ui, uio in ring.receive():
+                pulse |= ui
+                uio_in = uio
+            cocotb.start_soon(apply_at_v_begin(dut, pulse, uio_in))
+
+            start = time.monotonic()
+            samples = await sample_frame(dut, coords)
+            red, green, blue, _, _ = unpack_uo_out(np.array([samples[xy] for xy in coords]))
+            slot = ring.next_slot()
+            slot[:] = (np.stack([red, green, blue], axis=-1) * 85).reshape(slot.shape)
+            ring.publish(UI_IN | pulse, uio_in)
+            dut._log.info(f"live: frame {n} (ui_in pulse {pulse:#04x}, uio_in {uio_in:#04x}) in {time.monotonic() - start:.1f}s")
+    finally:
+        ring.close()
@@ -2,8 +2,14 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer
 from PIL import Image
+import numpy as np
 import os
 
+from colour import unpack_uo_out
+from perf import PerfMonitor
+from probe import read_probe
+from watchdog import Watchdog
+
 H_DISPLAY = 640
 V_DISPLAY = 480
 
@@ -12,6 +18,16 @@ V_TOTAL = 525
 
 CLK_50MHZ_PERIOD_NS = 20
 
+# watchdog limits for the capture loops below
+FRAME_WALL_S = 1800
+MIN_PIXEL_RATE = 200  # pixel clocks per wall second
+
+def capture_watchdog(dut, name, pixel_clocks):
+    """budget for a capture loop of up to `pixel_clocks`, ticked once per pixel clock;
+    fails early with the probe word when the run hangs or crawls."""
+    return Watchdog(dut, name, CLK_50MHZ_PERIOD_NS, unit="pixel clocks", max_cycles=2 * pixel_clocks + 16,
+                    max_wall_s=FRAME_WALL_S, min_rate=MIN_PIXEL_RATE, snapshot=lambda: read_probe(dut)).start()
+
 async def reset_dut(dut):
     """
     Applies a reset to the DUT and initializes inputs.
@@ -54,23 +70,24 @@ async def test_full_frame_colour_oracle_small_mode(dut):
     captured = [[False]*height for _ in range(width)]
 
     timeout_cycles = H_TOTAL * V_TOTAL * 2
+    watchdog = capture_watchdog(dut, "full_frame_colour_oracle_small_mode", timeout_cycles)
     for _ in range(timeout_cycles):
         if stopper_task.done():
             break
         await RisingEdge(dut.clk_25mhz)
-        if dut.vga_active.value:
-            x = dut.pixel_x.value.integer
-            y = dut.pixel_y.value.integer
+        watchdog.tick()
+        probe = read_probe(dut)  # one handle read per pixel clock
+        if probe.vga_active:
+            x, y = probe.pixel_x, probe.pixel_y
             if x < width and y < height and not captured[x][y]:
                 captured[x][y] = True
-                r_val = (dut.uo_out.value[0] << 1) | dut.uo_out.value[4]
-                g_val = (dut.uo_out.value[1] << 1) | dut.uo_out.value[5]
-                b_val = (dut.uo_out.value[2] << 1) | dut.uo_out.value[6]
+                r_val, g_val, b_val, _, _ = unpack_uo_out(probe.uo_out)
                 assert 0 <= r_val <= 3 and 0 <= g_val <= 3 and 0 <= b_val <= 3
                 pixels_captured += 1
     else:
         stopper_task.kill()
         assert False, "timeout waiting for full frame"
+    watchdog.stop()
 
     expected_pixels = width * height
     assert pixels_captured == expected_pixels, (
@@ -84,8 +101,9 @@ async def test_capture_full_frame_png(dut):
     clock = Clock(dut.clk, CLK_50MHZ_PERIOD_NS, units="ns")
     cocotb.start_soon(clock.start())
 
-    img = Image.new('RGB', (H_DISPLAY, V_DISPLAY))
-    pixels = img.load()
+    # raw uo_out per pixel; colours are decoded for the whole frame at the end
+    raw = np.zeros((V_DISPLAY, H_DISPLAY), dtype=np.uint8)
+    captured = np.zeros((V_DISPLAY, H_DISPLAY), dtype=bool)
 
     await reset_dut(dut)
 
@@ -95,6 +113,7 @@ async def test_capture_full_frame_png(dut):
     await Timer(1, units="ns")
 
     await RisingEdge(dut.v_begin)
+    perf = PerfMonitor(dut.dut, dut._log).start()
 
     async def frame_stopper():
         await RisingEdge(dut.v_begin)
@@ -102,35 +121,31 @@ async def test_capture_full_frame_png(dut):
     stopper_task = cocotb.start_soon(frame_stopper())
 
     pixels_captured = 0
-    captured_pixels = set()
 
     timeout_cycles = H_TOTAL * V_TOTAL * 2
+    watchdog = capture_watchdog(dut, "capture_full_frame_png", timeout_cycles)
     for _ in range(timeout_cycles):
         if stopper_task.done():
             break
         await RisingEdge(dut.clk_25mhz)
-        if dut.vga_active.value:
-            x = dut.pixel_x.value.integer
-            y = dut.pixel_y.value.integer
-            if x < H_DISPLAY and y < V_DISPLAY:
-                coord = (x, y)
-                if coord not in captured_pixels:
-                    captured_pixels.add(coord)
-                    r_val = (dut.uo_out.value[0] << 1) | dut.uo_out.value[4]
-                    g_val = (dut.uo_out.value[1] << 1) | dut.uo_out.value[5]
-                    b_val = (dut.uo_out.value[2] << 1) | dut.uo_out.value[6]
-                    r_8 = int(r_val) * 85
-                    g_8 = int(g_val) * 85
-                    b_8 = int(b_val) * 85
-                    pixels[x, y] = (r_8, g_8, b_8)
-                    pixels_captured += 1
+        watchdog.tick()
+        probe = read_probe(dut)  # one handle read per pixel clock
+        if probe.vga_active:
+            x, y = probe.pixel_x, probe.pixel_y
+            if x < H_DISPLAY and y < V_DISPLAY and not captured[y, x]:
+                captured[y, x] = True
+                raw[y, x] = probe.uo_out
+                pixels_captured += 1
     else:
         stopper_task.kill()
         assert False, f"timeout in {timeout_cycles} reached"
+    watchdog.stop()
 
     if pixels_captured == 0:
         assert False, "no pixels captured"
 
+    red, green, blue, _, _ = unpack_uo_out(raw)
+    img = Image.fromarray((np.stack([red, green, blue], axis=-1) * 85).astype(np.uint8), 'RGB')
     output_filename = "out.png"
     img.save(output_filename)
     dut._log.info(f"Saved '{os.path.abspath(output_filename)}' with {pixels_captured} pixels")
@@ -140,3 +155,7 @@ async def test_capture_full_frame_png(dut):
         f"captured {pixels_captured} pixels, expected {expected_pixels}"
     )
 
+    # the captured frame's counters are latched on the clk edge after v_begin
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    perf.check()
@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# progressive refinement (uio_in[4]) over successive static frames. the view
+# is reset at the first captured frame so the sub-tile pattern starts at step
+# 0, then REFINE_FRAMES frames are sampled at their beam times (every
+# SAMPLE_RATE-th pixel, see beam.py). every frame must match model/chip.py
+# exactly, and the running mean of the frames must converge towards the
+# supersampled image as model/refine.py predicts.
+# To run: make tb-png-refine (builds with REFINE)
+
+import os
+
+import numpy as np
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, FallingEdge, RisingEdge
+from PIL import Image
+
+from beam import grid, sample_frame
+from colour import unpack_uo_out
+from refine import REFINE, convergence, predict, reference_image
+
+SAMPLE_RATE = 4
+REFINE_FRAMES = int(os.getenv("REFINE_FRAMES", "4"))
+UI_IN = 0b10000000
+UIO_IN = REFINE | 0b0100   # 32x8 tiles, greyscale
+# the netlist is the shipped top, which is built without REFINE
+GL_TEST = os.getenv("GATES") == "yes"
+
+
+async def release_reset_view(dut):
+    """hold reset_view over the next v_begin, then let the view stay static."""
+    await RisingEdge(dut.v_begin)
+    await ClockCycles(dut.clk, 4)
+    dut.ui_in.value = UI_IN
+
+
+@cocotb.test(skip=GL_TEST)
+async def test_refinement_converges(dut):
+    """successive static frames match the model and their mean converges."""
+    clock = Clock(dut.clk, 20, units="ns")
+    cocotb.start_soon(clock.start())
+
+    # inputs applied through reset so the model frames line up from frame 0
+    dut.ena.value = 1
+    dut.ui_in.value = UI_IN | 0b01000000
+    dut.uio_in.value = UIO_IN
+    dut.rst_n.value = 0
+    await ClockCycles(dut.clk, 5)
+    await FallingEdge(dut.clk)
+    dut.rst_n.value = 1
+
+    shown, means = predict(UI_IN, UIO_IN, REFINE_FRAMES)
+    coords = grid(640, 480, SAMPLE_RATE)
+    xs, ys = np.array(coords).T
+    captured = np.zeros((REFINE_FRAMES, len(coords), 3))
+
+    # v_begin is already high out of reset, so the first capture is frame 1
+    cocotb.start_soon(release_reset_view(dut))
+    for n, frame in enumerate(shown):
+        # lag 0: uo_out while the counters show (x, y), as in Frame.image
+        samples = await sample_frame(dut, coords, lag=0)
+        red, green, blue, _, _ = unpack_uo_out(np.array([samples[xy] for xy in coords]))
+        captured[n] = np.stack([red, green, blue], axis=-1)
+        expected = frame.image[ys, xs]
+        wrong = np.flatnonzero((captured[n] != expected).any(axis=1))
+        assert not wrong.size, (
+            f"frame {frame.index} (refine step {frame.refine_step}): {wrong.size} sampled pixels differ "
+            f"from the model, first at {coords[wrong[0]]}: dut {captured[n][wrong[0]]}, model {expected[wrong[0]]}"
+        )
+        dut._log.info(f"frame {frame.index}: refine step {frame.refine_step} matches the model")
+
+    reference = reference_image(shown[0].params, UIO_IN)[ys, xs]
+    errors = convergence(np.cumsum(captured, axis=0) / np.arange(1, REFINE_FRAMES + 1)[:, None, None], reference)
+    expected_errors = convergence(means[:, ys, xs], reference)
+    dut._log.info("mean |error| vs supersampled image by frame count: " + ", ".join(f"{e:.4f}" for e in errors))
+    assert np.allclose(errors, expected_errors), f"convergence {errors} differs from the model's {expected_errors}"
+    assert errors[-1] < errors[0], f"no refinement after {REFINE_FRAMES} frames: {errors}"
+
+    mean = np.rint(np.cumsum(captured, axis=0)[-1] / REFINE_FRAMES * 85).astype(np.uint8)
+    preview = mean.reshape(480 // SAMPLE_RATE, 640 // SAMPLE_RATE, 3)
+    Image.fromarray(preview, 'RGB').resize((640, 480), Image.NEAREST).save("fractal_refined.png")
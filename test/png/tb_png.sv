@@ -28,6 +28,8 @@ module tb_png;
     wire vga_active;
     wire clk_25mhz;
 
+    // packed probe word, lsb first; must match PROBE_FIELDS in model/probe.py
+    wire [63:0] probe;
 
     tt_um_fractal dut (
         .ui_in(ui_in),
@@ -46,10 +48,29 @@ module tb_png;
     assign vga_active = dut.vga_active;
     assign clk_25mhz  = dut.clk_25mhz;
 
+    assign probe = {
+        4'd0,
+        dut.zoom_level_8bit,     // [59:52] zoom_level
+        dut.mandel.busy,         // [51]    engine_busy
+        dut.iteration_count,     // [50:45] iteration_count
+        dut.tile_x_index,        // [44:39] tile_x_index
+        dut.launched_tile_x,     // [38:33] launched_tile_x
+        dut.computation_done,    // [32]    computation_done
+        dut.start_computation,   // [31]    start_computation
+        clk_25mhz,               // [30]    clk_25mhz
+        v_begin,                 // [29]    frame_start
+        vga_active,              // [28]    vga_active
+        pixel_y,                 // [27:18] pixel_y
+        pixel_x,                 // [17:8]  pixel_x
+        uo_out                   // [7:0]   uo_out
+    };
 
+
+`ifndef NO_WAVES
     initial begin
         $dumpfile("tb_png.vcd");
         $dumpvars(0, tb_png);
     end
+`endif
 
 endmodule
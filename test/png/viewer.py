@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# live viewer for png/live.py. shows the newest frame in the shared-memory
+# ring (model/frame_ring.py) scaled to 640x480 and sends key presses back to
+# the simulation, which applies them at the next v_begin. frames published
+# while the viewer is busy are skipped, never queued.
+#
+#   arrows  pan                    + / -   zoom in / out
+#   r       reset view             c       next colour mode (uio_in[1:0])
+#   s       next stride preset (uio_in[3:2])
+#   q, Esc  quit (also ends the simulation)
+#
+# run from test/ (before or after make tb-png-live):
+#   python png/viewer.py
+
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+from PIL import Image, ImageTk
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "model"))
+from frame_ring import FrameRing  # noqa: E402
+
+POLL_MS = 15
+# ui_in pulse bits, as decoded in param_controller
+PULSES = {
+    "Left": 0x04, "Right": 0x08, "Up": 0x10, "Down": 0x20,
+    "plus": 0x01, "equal": 0x01, "KP_Add": 0x01,
+    "minus": 0x02, "KP_Subtract": 0x02,
+    "r": 0x40,
+}
+
+
+class Viewer:
+    def __init__(self, root, ring):
+        self.root = root
+        self.ring = ring
+        self.uio_in = 0
+        self.last = -1
+        self.dropped = 0
+        self.photo = None
+        self.label = tk.Label(root)
+        self.label.pack()
+        root.bind("<Key>", self.key)
+        root.protocol("WM_DELETE_WINDOW", self.quit)
+        root.after(POLL_MS, self.poll)
+
+    def key(self, event):
+        if event.keysym in ("q", "Escape"):
+            self.quit()
+            return
+        pulse = PULSES.get(event.keysym, 0)
+        if event.keysym == "c":
+            self.uio_in = (self.uio_in & ~0x03) | ((self.uio_in + 1) & 0x03)
+        elif event.keysym == "s":
+            self.uio_in = (self.uio_in & ~0x0C) | ((self.uio_in + 0x04) & 0x0C)
+        elif not pulse:
+            return
+        if not self.ring.send(pulse, self.uio_in):
+            print("[viewer] simulation is not draining commands, key dropped")
+
+    def poll(self):
+        if self.ring.closed:
+            print(f"[viewer] simulation ended after frame {self.last}, {self.dropped} frames dropped")
+            self.root.destroy()
+            return
+        frame = self.ring.latest(self.last)
+        if frame is not None:
+            n, view, _, uio_in = frame
+            image = Image.fromarray(view.copy())
+            # a copy the simulation overwrote halfway is skipped; the next poll takes a newer frame
+            if self.ring.valid(n):
+                if self.last < 0:
+                    self.uio_in = uio_in
+                self.dropped += n - self.last - 1
+                self.last = n
+                self.photo = ImageTk.PhotoImage(image.resize((640, 480), Image.NEAREST))
+                self.label.configure(image=self.photo)
+                self.root.title(
+                    f"tt_um_fractal frame {n}: colour {uio_in & 3}, stride {(uio_in >> 2) & 3}, "
+                    f"{self.dropped} dropped"
+                )
+        self.root.after(POLL_MS, self.poll)
+
+    def quit(self):
+        self.ring.close()
+        self.root.destroy()
+
+
+def attach(name):
+    """wait for a live ring; a closed one left by the last run does not count."""
+    while True:
+        try:
+            ring = FrameRing.attach(name)
+        except (FileNotFoundError, ValueError):
+            time.sleep(0.5)
+            continue
+        if not ring.closed:
+            return ring
+        ring.close()
+        time.sleep(0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="live viewer for make tb-png-live")
+    parser.add_argument("--name", default=os.getenv("LIVE_SHM", "tt_fractal_live"), help="shared memory name")
+    args = parser.parse_args()
+
+    print(f"[viewer] waiting for shared memory {args.name!r} (make tb-png-live)")
+    ring = attach(args.name)
+    print(f"[viewer] attached: {ring.shape[1]}x{ring.shape[0]} frames, {ring.slots} slots")
+    root = tk.Tk()
+    root.title("tt_um_fractal (waiting for the first frame)")
+    Viewer(root, ring)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
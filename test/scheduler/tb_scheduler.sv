@@ -0,0 +1,62 @@
+`default_nettype none
+`timescale 1ns / 1ps
+
+// tile_scheduler with the top-level engine configuration (9-bit coords,
+// FRAC_BITS 6). K and POLICY are set from the Makefile; policy mirrors
+// POLICY so the python side can tell which dispatcher it is checking.
+module tb_scheduler ();
+  parameter K = 4;
+  parameter POLICY = 0;
+  parameter ROB_DEPTH = 4;
+
+  reg clk;
+  reg rst_n;
+  reg job_valid;
+  reg [9:0] job_tile;
+  reg [9:0] job_x;
+  reg [9:0] job_y;
+  reg signed [8:0] center_x;
+  reg signed [8:0] center_y;
+  reg [7:0] zoom_level;
+  reg [5:0] max_iter_limit;
+
+  wire job_ready;
+  wire wr_valid;
+  wire [9:0] wr_tile;
+  wire [5:0] wr_iterations;
+  wire [K-1:0] busy;
+  wire [7:0] policy = POLICY;
+
+`ifndef NO_WAVES
+  initial begin
+    $dumpfile("tb.vcd");
+    $dumpvars(0, tb_scheduler);
+  end
+`endif
+
+  tile_scheduler #(
+    .K(K),
+    .POLICY(POLICY),
+    .ROB_DEPTH(ROB_DEPTH),
+    .TILE_BITS(10),
+    .COORD_WIDTH(9),
+    .FRAC_BITS(6)
+  ) dut (
+    .clk(clk),
+    .rst_n(rst_n),
+    .job_valid(job_valid),
+    .job_ready(job_ready),
+    .job_tile(job_tile),
+    .job_x(job_x),
+    .job_y(job_y),
+    .center_x(center_x),
+    .center_y(center_y),
+    .zoom_level(zoom_level),
+    .max_iter_limit(max_iter_limit),
+    .wr_valid(wr_valid),
+    .wr_tile(wr_tile),
+    .wr_iterations(wr_iterations),
+    .busy(busy)
+  );
+
+endmodule
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: © 2024 ECE298A Team
+# SPDX-License-Identifier: Apache-2.0
+
+# build-once, test-many runner for the cocotb benches. every cocotb test of a
+# bench is its own pytest case, run in a fresh simulator (TESTCASE=<name>)
+# against one shared build, so pytest-xdist spreads long benches over the
+# cores one test case at a time instead of one module per `make tb-*`.
+#
+# test cases are found by importing each bench module in a subprocess, so the
+# generated engine tests and env-gated ones (ENGINE_FUZZ=1, ...) are collected
+# like the Makefile would run them. each case runs in its own directory under
+# sim_build/pytest/<sim>/<toplevel>/runs/, and each worker's cocotb results
+# are merged into sim_build/pytest/<sim>/junit/<worker>.xml. rtl only; gate
+# level stays on `make tb-* GATES=yes`.
+#
+# run from test/ (needs pytest-xdist for -n):
+#   pytest -n auto --dist worksteal test_benches.py
+#   pytest -n 8 test_benches.py --bench engine --bench vga
+#   ENGINE_FUZZ=1 ENGINE_FUZZ_TRIALS=20000 pytest -n auto test_benches.py --bench engine
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benches import BENCHES, MODEL_DIR, bench_dir, run_bench
+
+# prints [(name, skip), ...] for the cocotb tests of the module in argv[1]
+_DISCOVER = """
+import json, sys
+from cocotb.decorators import test
+module = __import__(sys.argv[1])
+print(json.dumps([(name, bool(obj.skip)) for name, obj in vars(module).items() if isinstance(obj, test)]))
+"""
+
+
+def bench_tests(name):
+    """[(test name, skip)] of a bench's cocotb module, in definition order."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(bench_dir(name)), str(MODEL_DIR)]))
+    out = subprocess.run(
+        [sys.executable, "-c", _DISCOVER, name],
+        cwd=bench_dir(name), env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return [tuple(test) for test in json.loads(out.splitlines()[-1])]
+
+
+def pytest_generate_tests(metafunc):
+    if "case" in metafunc.fixturenames:
+        names = metafunc.config.getoption("--bench") or list(BENCHES)
+        cases = [(bench, test, skip) for bench in names for test, skip in bench_tests(bench)]
+        metafunc.parametrize("case", cases, ids=[f"{bench}.{test}" for bench, test, _ in cases])
+
+
+def test_bench(case, bench_build, worker_results, pytestconfig, monkeypatch):
+    bench, testcase, skip = case
+    if skip:
+        pytest.skip(f"{testcase} is marked skip in {bench}")
+    from cocotb.runner import get_results
+
+    # the cocotb runner refuses an explicit results_xml while pytest is
+    # driving it; each case keeps its own results file next to its run
+    monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
+
+    build_dir = bench_build(bench)
+    test_dir = build_dir / "runs" / bench / testcase
+    test_dir.mkdir(parents=True, exist_ok=True)
+    results = run_bench(
+        bench,
+        build_dir=build_dir,
+        test_dir=test_dir,
+        sim=pytestconfig.getoption("--sim"),
+        testcase=testcase,
+        results_xml=str(test_dir / "results.xml"),
+    )
+    worker_results.append(results)
+    tests, failed = get_results(results)
+    assert tests == 1 and not failed, f"{bench}.{testcase}: {failed} of {tests} failed, see {test_dir}"
@@ -3,8 +3,14 @@ from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer, ReadOnly, NextTimeStep
 import os
 
+from watchdog import Watchdog
+
 CLOCK_PERIOD_NS = 40 # run on 25mhz direct. clock divider and integration into top not in scope for this.
 
+# watchdog limits for the frame-length tests; the large mode runs 420k pixels per frame
+FRAME_WALL_S = 1200
+MIN_PIXEL_RATE = 200
+
 # small, 8x6, (VGA_MODE=small)
 VGA_PARAMS_SMALL = {
     "H_ACTIVE": 8, "H_FRONT_PORCH": 2, "H_SYNC": 4, "H_BACK_PORCH": 2,
@@ -31,6 +37,11 @@ def get_vga_params(dut):
     
     return params, h_total, v_total
 
+def frame_watchdog(dut, name, pixels, snapshot=None):
+    """budget for a test that runs `pixels` clk_en pixels, ticked once per pixel."""
+    return Watchdog(dut, name, CLOCK_PERIOD_NS, unit="pixels", max_cycles=pixels + 64,
+                    max_wall_s=FRAME_WALL_S, min_rate=MIN_PIXEL_RATE, snapshot=snapshot).start()
+
 async def reset_dut(dut):
     dut.rst_n.value = 1
     dut.clk_en.value = 0
@@ -41,8 +52,9 @@ async def reset_dut(dut):
     await RisingEdge(dut.clk)
 
 class VgaChecker:
-    def __init__(self, dut, params, name="VgaChecker"):
+    def __init__(self, dut, params, name="VgaChecker", watchdog=None):
         self.dut = dut
+        self.watchdog = watchdog
         self.params = params
         self.name = name
         self.log = dut._log
@@ -76,6 +88,8 @@ class VgaChecker:
                 continue
             
             self._check_all_outputs()
+            if self.watchdog is not None:
+                self.watchdog.tick()
             
             await RisingEdge(self.dut.clk)
             if self.hpos == self.H_MAX:
@@ -147,14 +161,17 @@ async def test_full_frame_timing(dut):
     await reset_dut(dut)
     
     dut.clk_en.value = 1
+    total_pixels_to_sim = 2 * h_total * v_total
+    checker.watchdog = frame_watchdog(dut, "full_frame_timing", total_pixels_to_sim,
+                                      snapshot=lambda: f"hpos={checker.hpos} vpos={checker.vpos}")
     checker.start()
 
-    total_pixels_to_sim = 2 * h_total * v_total
     sim_time_ns = total_pixels_to_sim * CLOCK_PERIOD_NS + 50 # 50ns margin
     dut._log.info(f"Simulating ({total_pixels_to_sim} pixels)...")
     await Timer(sim_time_ns, units="ns")
     
     checker.stop()
+    checker.watchdog.stop()
 
 @cocotb.test()
 async def test_intermittent_clock_enable(dut):
@@ -209,12 +226,16 @@ async def test_statistical_verification(dut):
 
     total_pixels_per_frame = h_total * v_total
     dut._log.info(f"Counting signals over ({total_pixels_per_frame} pixels)...")
+    watchdog = frame_watchdog(dut, "statistical_verification", total_pixels_per_frame,
+                              snapshot=lambda: f"hsync_low={hsync_low_count} vsync_low={vsync_low_count} active={active_high_count}")
     for _ in range(total_pixels_per_frame):
         await RisingEdge(dut.clk)
         await ReadOnly()
         if dut.hsync.value == 0: hsync_low_count += 1
         if dut.vsync.value == 0: vsync_low_count += 1
         if dut.active.value == 1: active_high_count += 1
+        watchdog.tick()
+    watchdog.stop()
     
     expected_hsync_low = params["H_SYNC"] * v_total
     expected_vsync_low = params["V_SYNC"] * h_total